@@ -109,6 +109,7 @@ def configure_vcs_author(
         placeholder: str,
         default: str | None,
         prompt: str,
+        prompt_id: str,
     ) -> None:
         # CLI arg always wins.
         if default is not None:
@@ -124,6 +125,7 @@ def configure_vcs_author(
             prompt,
             default_message=(real_default if real_default else "leave blank to skip"),
             default=real_default,
+            prompt_id=prompt_id,
         )
 
         if new_value:
@@ -133,9 +135,16 @@ def configure_vcs_author(
 
     git_keys = read_git_config_file(gitconfig_path, ["user:name", "user:email"])
 
-    try_update_key(git_keys, "user:name", VCS_MISSING_NAME, name, "Enter your git name")
     try_update_key(
-        git_keys, "user:email", VCS_MISSING_EMAIL, email, "Enter your git email"
+        git_keys, "user:name", VCS_MISSING_NAME, name, "Enter your git name", "git.name"
+    )
+    try_update_key(
+        git_keys,
+        "user:email",
+        VCS_MISSING_EMAIL,
+        email,
+        "Enter your git email",
+        "git.email",
     )
 
     update_git_config_file(gitconfig_path, git_keys)
@@ -354,7 +363,9 @@ def configure_weather_location(
     if location is not None:
         new_value: str | None = location.strip() or None
     else:
-        new_value = input_field("Enter your weather location", default=current)
+        new_value = input_field(
+            "Enter your weather location", default=current, prompt_id="weather.location"
+        )
 
     if not new_value:
         logging.info(f"{dry_text}No weather location set, skipping")
@@ -385,6 +396,11 @@ def initialize_vim_plugin_manager(dry_run: bool) -> None:
     """
     dry_text = "[DRY RUN] " if dry_run else ""
 
+    if url_map():
+        # vim-plug fetches plugins itself, past any URL map.
+        logging.info(f"{dry_text}${URL_MAP_ENV_VAR} is set - skipping vim plugin install")
+        return
+
     if not dry_run and not _has_internet():
         logging.warning("No internet connectivity detected - skipping vim plugin install")
         return
@@ -524,6 +540,7 @@ def safe_symlink(
         if not confirm(
             message=f"{Colors.BOLD}Rename {target} to {backup_path.name} before replacing with symlink?{Colors.RESET}",
             default=True,
+            prompt_id=f"backup:{target}",
         ):
             logging.info(f"{dry_text}Skipping {target} (declined backup)")
             return
@@ -562,6 +579,39 @@ def create_dirs(dry_run: bool, dirs: list[str | Path]) -> None:
             logging.info(f"{dry_text}Created dir {d}")
 
 
+# A JSON object mapping URL prefixes to replacements, applied to every
+# download and clone; `run_tests.py --hermetic` uses it to point them at local
+# stand-ins. While it is set the connectivity probe is skipped.
+URL_MAP_ENV_VAR = "DOTFILES_URL_MAP"
+
+
+def url_map() -> dict[str, str]:
+    """The `$DOTFILES_URL_MAP` prefix rewrites; empty if unset or malformed."""
+    raw = os.environ.get(URL_MAP_ENV_VAR)
+    if not raw:
+        return {}
+    try:
+        mapping = json.loads(raw)
+    except json.JSONDecodeError as e:
+        logging.warning(f"ignoring malformed ${URL_MAP_ENV_VAR}: {e}")
+        return {}
+    if not isinstance(mapping, dict) or not all(
+        isinstance(value, str) for value in mapping.values()
+    ):
+        logging.warning(f"ignoring ${URL_MAP_ENV_VAR}: expected an object of strings")
+        return {}
+    return mapping
+
+
+def map_url(url: str) -> str:
+    """`url` with its longest matching `url_map()` prefix replaced."""
+    mapping = url_map()
+    for prefix in sorted(mapping, key=len, reverse=True):
+        if url.startswith(prefix):
+            return mapping[prefix] + url[len(prefix) :]
+    return url
+
+
 def download_file(url: str, dest: Path, dry_run: bool) -> bool:
     """
     Download a file from URL to a destination path.
@@ -575,6 +625,7 @@ def download_file(url: str, dest: Path, dry_run: bool) -> bool:
     Returns:
         True if download succeeded (or was skipped under dry-run), False otherwise.
     """
+    url = map_url(url)
     if dry_run:
         logging.info(f"[DRY RUN] Would download {url} to {dest}")
         return True
@@ -633,7 +684,7 @@ def download_files(
     """
     dry_text = "[DRY RUN] " if dry_run else ""
 
-    if not dry_run and not _has_internet():
+    if not dry_run and not url_map() and not _has_internet():
         logging.warning("No internet connectivity detected - skipping downloads")
         return
 
@@ -660,6 +711,7 @@ def git_clone(url: str, dest: Path, dry_run: bool, depth: int | None = None) ->
         True if clone succeeded, False otherwise.
     """
     dry_text = "[DRY RUN] " if dry_run else ""
+    url = map_url(url)
 
     cmd = ["git", "clone"]
     if depth is not None:
@@ -695,7 +747,7 @@ def git_clone_repos(
     """
     dry_text = "[DRY RUN] " if dry_run else ""
 
-    if not dry_run and not _has_internet():
+    if not dry_run and not url_map() and not _has_internet():
         logging.warning("No internet connectivity detected - skipping git clones")
         return
 
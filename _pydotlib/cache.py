@@ -0,0 +1,432 @@
+"""Small on-disk TTL cache shared by the status-bar scripts.
+
+Each namespace (e.g. "weather", "next-meeting") is one JSON file under
+`$XDG_CACHE_HOME/dotfiles/cache/`, mapping keys to entries:
+
+    {"key": {"value": ..., "created": 1760000000.0, "expires": ...,
+             "stale_until": ..., "accessed": ...}}
+
+- Entries are fresh until `expires` and may still be served, flagged as stale,
+  until `stale_until` (stale-while-revalidate); after that they're gone.
+- Writers take an exclusive `fcntl.flock` on a sidecar `.lock` file for the
+  read-modify-write and replace the data file atomically, so readers never
+  lock and never see a torn file.
+- When a namespace outgrows `max_entries` or `max_bytes`, the least recently
+  used entries are evicted. Reads only persist their access time when it is
+  more than `ACCESS_RESOLUTION_SECS` out of date, so a hot key doesn't turn
+  every read into a write.
+
+`HotCache` adds a RAM-backed tier in `$XDG_RUNTIME_DIR` for data rewritten
+every few seconds.
+
+The cache is best-effort: unreadable, corrupt or unwritable files behave like
+an empty cache rather than raising.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Generator
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TypeGuard, TypeVar, cast
+
+from _pydotlib.xdg import xdg_dirs
+
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_BYTES = 1 << 20  # 1 MiB
+ACCESS_RESOLUTION_SECS = 60.0
+PERSIST_INTERVAL_SECS = 5 * 60.0
+
+_NAMESPACE_RE = re.compile(r"[A-Za-z0-9._-]+")
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+def cache_dir() -> Path:
+    """Directory holding one file per cache namespace."""
+    return xdg_dirs().cache_home / "dotfiles" / "cache"
+
+
+def hot_cache_dir() -> Path | None:
+    """Where `HotCache` keeps its working copies, if there's a runtime dir."""
+    runtime_dir = xdg_dirs().runtime_dir
+    return runtime_dir / "dotfiles" / "cache" if runtime_dir else None
+
+
+def persisted_cache_dir() -> Path:
+    """Where `HotCache` persists its working copies."""
+    return xdg_dirs().state_home / "dotfiles" / "cache"
+
+
+@dataclass(frozen=True)
+class CacheLookup:
+    """A cached value together with how old it is."""
+
+    value: object
+    age: float
+    fresh: bool
+
+
+@dataclass
+class CacheStats:
+    """Counters for one `Cache` object (this process only)."""
+
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / lookups if lookups else 0.0
+
+
+class Cache:
+    """A namespaced key/value cache with per-entry TTLs.
+
+    Values must be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        path: Path | None = None,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if not _NAMESPACE_RE.fullmatch(namespace):
+            raise ValueError(f"invalid cache namespace: {namespace!r}")
+        self.namespace = namespace
+        self.path = path if path is not None else cache_dir() / f"{namespace}.json"
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._clock = clock
+        self._revalidations: list[threading.Thread] = []
+
+    def lookup(self, key: str) -> CacheLookup | None:
+        """The entry for `key`, fresh or stale, or None if absent/expired."""
+        now = self._clock()
+        entry = self._read().get(key)
+        if not _valid_entry(entry) or now >= entry["stale_until"]:
+            self.stats.misses += 1
+            return None
+
+        fresh = now < entry["expires"]
+        if fresh:
+            self.stats.hits += 1
+        else:
+            self.stats.stale_hits += 1
+        if now - entry.get("accessed", entry["created"]) > ACCESS_RESOLUTION_SECS:
+            self._touch(key, now)
+        return CacheLookup(entry["value"], now - entry["created"], fresh)
+
+    def get(self, key: str, default: object = None) -> object:
+        """The value for `key` if it is fresh, else `default`."""
+        found = self.lookup(key)
+        return found.value if found is not None and found.fresh else default
+
+    def set(
+        self, key: str, value: object, ttl: float, stale_ttl: float = 0.0
+    ) -> None:
+        """Store `value`: fresh for `ttl` seconds, then stale for `stale_ttl`."""
+        now = self._clock()
+        with self._locked() as entries:
+            entries.pop(key, None)
+            entries[key] = {
+                "value": value,
+                "created": now,
+                "expires": now + ttl,
+                "stale_until": now + ttl + stale_ttl,
+                "accessed": now,
+            }
+            self.stats.writes += 1
+
+    def delete(self, key: str) -> bool:
+        """Remove `key`; returns whether it was present."""
+        with self._locked() as entries:
+            return entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        with self._locked() as entries:
+            entries.clear()
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], T],
+        ttl: float,
+        stale_ttl: float = 0.0,
+        *,
+        background: bool = False,
+    ) -> T:
+        """The cached value for `key`, calling `fetch` to fill or refresh it.
+
+        A fresh entry is returned as-is. A stale entry is returned too, and
+        revalidated: inline, unless another process is already doing so, or —
+        with `background=True` — on a (non-daemon) thread so the caller can
+        print the stale value immediately and the process exits once the
+        refresh is written. If a refresh fails with an `OSError`, `ValueError`,
+        `RuntimeError` or `subprocess.SubprocessError`, the stale value is
+        returned instead. On a miss `fetch` is called inline and its
+        exceptions propagate.
+        """
+        found = self.lookup(key)
+        if found is not None:
+            if found.fresh:
+                return cast(T, found.value)
+            if background:
+                thread = threading.Thread(
+                    target=self._revalidate,
+                    args=(key, fetch, ttl, stale_ttl),
+                    name=f"cache-revalidate-{self.namespace}",
+                )
+                thread.start()
+                self._revalidations.append(thread)
+            else:
+                refreshed = self._revalidate(key, fetch, ttl, stale_ttl)
+                if refreshed is not _NOT_REFRESHED:
+                    return cast(T, refreshed)
+            return cast(T, found.value)
+
+        value = fetch()
+        self.set(key, value, ttl, stale_ttl)
+        return value
+
+    def wait(self) -> None:
+        """Block until background revalidations started by this object finish."""
+        for thread in self._revalidations:
+            thread.join()
+        self._revalidations.clear()
+
+    def _revalidate(
+        self, key: str, fetch: Callable[[], T], ttl: float, stale_ttl: float
+    ) -> object:
+        with self._refresh_lock() as acquired:
+            if not acquired:
+                logger.debug(f"{self.namespace}: {key!r} is already being refreshed")
+                return _NOT_REFRESHED
+            try:
+                value = fetch()
+            except (OSError, ValueError, RuntimeError, subprocess.SubprocessError) as e:
+                logger.debug(f"{self.namespace}: refreshing {key!r} failed: {e}")
+                return _NOT_REFRESHED
+            self.set(key, value, ttl, stale_ttl)
+            return value
+
+    def _read(self) -> dict[str, dict]:
+        return _read_entries(self.path)
+
+    def _touch(self, key: str, now: float) -> None:
+        with self._locked() as entries:
+            if _valid_entry(entries.get(key)):
+                entries[key]["accessed"] = now
+
+    @contextmanager
+    def _locked(self) -> Generator[dict[str, dict], None, None]:
+        """Read-modify-write the namespace under an exclusive lock.
+
+        Yields the current entries; whatever they hold afterwards (minus
+        expired and over-budget entries) is written back atomically.
+        """
+        with ExitStack() as stack:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                lock_file = stack.enter_context(open(f"{self.path}.lock", "a"))
+            except OSError as e:
+                logger.debug(f"cannot lock {self.path}: {e}")
+                yield {}
+                return
+
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            entries = self._read()
+            yield entries
+            self._evict(entries)
+            self._write(entries)
+
+    @contextmanager
+    def _refresh_lock(self) -> Generator[bool, None, None]:
+        """Non-blocking lock so only one process refreshes a namespace at once."""
+        with ExitStack() as stack:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                lock_file = stack.enter_context(open(f"{self.path}.refresh", "a"))
+            except OSError:
+                yield True
+                return
+
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            yield True
+
+    def _evict(self, entries: dict[str, dict]) -> None:
+        now = self._clock()
+        for key in [
+            key
+            for key, entry in entries.items()
+            if not _valid_entry(entry) or now >= entry["stale_until"]
+        ]:
+            del entries[key]
+
+        by_access = sorted(
+            entries, key=lambda key: entries[key].get("accessed", entries[key]["created"])
+        )
+        # Serialized size of each `"key": {...}, ` pair, so the file size can be
+        # tracked without re-encoding everything after each eviction.
+        sizes = {key: len(json.dumps({key: entry})) for key, entry in entries.items()}
+        total = sum(sizes.values())
+        for key in by_access:
+            if len(entries) <= self.max_entries and total <= self.max_bytes:
+                break
+            del entries[key]
+            total -= sizes[key]
+            self.stats.evictions += 1
+
+    def _write(self, entries: dict[str, dict]) -> None:
+        _write_entries(self.path, entries)
+
+
+class HotCache(Cache):
+    """A `Cache` whose working copy lives in RAM-backed `$XDG_RUNTIME_DIR`.
+
+    Meant for status-bar data that is read and rewritten every few seconds:
+    reads and writes only touch the runtime dir (tmpfs on Linux), and the
+    entries are copied to `$XDG_STATE_HOME/dotfiles/cache/` at most once
+    every `persist_interval` seconds, so they survive a reboot without the
+    disk seeing every refresh. After a reboot the empty runtime dir is seeded
+    from that persisted copy on first read.
+
+    Without a usable runtime dir (see `xdg_runtime_dir`) it is a plain `Cache`
+    on the persisted path.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        path: Path | None = None,
+        persisted_path: Path | None = None,
+        persist_interval: float = PERSIST_INTERVAL_SECS,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if persisted_path is None:
+            persisted_path = persisted_cache_dir() / f"{namespace}.json"
+        if path is None:
+            runtime_dir = hot_cache_dir()
+            path = runtime_dir / f"{namespace}.json" if runtime_dir else persisted_path
+        super().__init__(
+            namespace,
+            path=path,
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            clock=clock,
+        )
+        self.persisted_path = persisted_path
+        self.persist_interval = persist_interval
+
+    @property
+    def tiered(self) -> bool:
+        """False when degraded to a single on-disk file."""
+        return self.path != self.persisted_path
+
+    def flush(self) -> None:
+        """Persist the hot copy now, regardless of the interval."""
+        if self.tiered:
+            with self._locked() as entries:
+                self._persist(entries)
+
+    def _read(self) -> dict[str, dict]:
+        if self.tiered and not self.path.exists():
+            return _read_entries(self.persisted_path)
+        return super()._read()
+
+    def _write(self, entries: dict[str, dict]) -> None:
+        super()._write(entries)
+        if self.tiered and self._clock() - self._persisted_at() >= self.persist_interval:
+            self._persist(entries)
+
+    def _persisted_at(self) -> float:
+        try:
+            return float(Path(f"{self.path}.persisted").read_text())
+        except (OSError, ValueError):
+            return float("-inf")
+
+    def _persist(self, entries: dict[str, dict]) -> None:
+        try:
+            self.persisted_path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.debug(f"cannot persist {self.path}: {e}")
+            return
+        _write_entries(self.persisted_path, entries)
+        try:
+            Path(f"{self.path}.persisted").write_text(str(self._clock()))
+        except OSError:
+            pass
+
+
+def _read_entries(path: Path) -> dict[str, dict]:
+    try:
+        entries = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        entries = None
+    if not isinstance(entries, dict):
+        logger.warning(f"cache file {path} is unreadable, ignoring")
+        return {}
+    return entries
+
+
+def _write_entries(path: Path, entries: dict[str, dict]) -> None:
+    """Atomically replace `path` with `entries`; failures are logged, not raised."""
+    try:
+        with tempfile.NamedTemporaryFile(
+            mode="w", delete=False, dir=path.parent, encoding="utf-8"
+        ) as temp_file:
+            temp_file.write(json.dumps(entries))
+    except OSError as e:
+        logger.debug(f"cannot write {path}: {e}")
+        return
+
+    try:
+        os.replace(temp_file.name, path)
+    except OSError:
+        try:
+            os.remove(temp_file.name)
+        except OSError:
+            pass
+
+
+_NOT_REFRESHED = object()
+
+
+def _valid_entry(entry: object) -> TypeGuard[dict]:
+    return (
+        isinstance(entry, dict)
+        and "value" in entry
+        and all(
+            isinstance(entry.get(field), (int, float))
+            for field in ("created", "expires", "stale_until")
+        )
+    )
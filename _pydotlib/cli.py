@@ -3,11 +3,30 @@
 Provides colored logging, user input prompts, and confirmation dialogs.
 """
 
+import atexit
+import contextvars
+import fnmatch
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import re
+import shutil
 import sys
+import threading
+import time
+import tomllib
+from collections.abc import Callable, Generator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Self
 
 from _pydotlib.colors import Colors
 
+logger = logging.getLogger(__name__)
+
 LOG_LEVEL_COLORS = {
     logging.DEBUG: Colors.BRIGHT_GRAY,
     logging.INFO: Colors.BRIGHT_WHITE,
@@ -35,8 +54,584 @@ class ColoredLogFormatter(logging.Formatter):
         return self.format_strs[record.levelno].format(record)
 
 
+# The step (e.g. "symlinks", "fedora") the current thread/task is working on,
+# stamped onto every record it logs. See `log_step`.
+_current_step: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "log_step", default=None
+)
+
+
+@contextmanager
+def log_step(step_id: str) -> Generator[None, None, None]:
+    """Tag records logged inside this block with `step_id`.
+
+    Context-local, so concurrent workers can each run under their own step.
+    Shows up as the `step` field of the JSON-lines sink.
+    """
+    token = _current_step.set(step_id)
+    try:
+        yield
+    finally:
+        _current_step.reset(token)
+
+
+# Whether console output for the current step is being held; see
+# `buffered_step`.
+_buffering: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "buffered_step", default=False
+)
+
+
+@contextmanager
+def buffered_step(step_id: str) -> Generator[None, None, None]:
+    """Like `log_step`, but hold the step's console output until it ends.
+
+    For concurrent workers whose interleaved lines would be unreadable: the
+    records still reach the JSON sink as they happen, but the console gets
+    them in one uninterrupted block when this exits. The release travels
+    through the same queue as the records, so none can arrive after it.
+    Without a `setup_logging` pipeline the records are simply not held.
+    """
+    with log_step(step_id):
+        token = _buffering.set(True)
+        try:
+            yield
+        finally:
+            _buffering.reset(token)
+            # A marker for the console handler only; `handle` skips the level
+            # check so it's queued whatever the root level is.
+            marker = logger.makeRecord(
+                logger.name, logging.DEBUG, __file__, 0, "release %s", (step_id,), None,
+                extra={"release_step": step_id},
+            )
+            logger.handle(marker)
+
+
+class _StepFilter(logging.Filter):
+    """Copies the emitting context's step onto the record before it's queued."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.step = _current_step.get()
+        record.buffered = _buffering.get()
+        return True
+
+
+class _HoldingHandler(logging.Handler):
+    """Passes records to `target`, holding `buffered_step` ones until released.
+
+    Only ever called from the pipeline's listener thread, so the released
+    block can't interleave with other records.
+    """
+
+    def __init__(self, target: logging.Handler) -> None:
+        super().__init__(target.level)
+        self.target = target
+        self._held: dict[str | None, list[logging.LogRecord]] = {}
+
+    def handle(self, record: logging.LogRecord) -> bool:  # type: ignore[override]
+        step = getattr(record, "release_step", None)
+        if step is not None:
+            for held in self._held.pop(step, []):
+                self.target.handle(held)
+            return True
+        if getattr(record, "buffered", False):
+            self._held.setdefault(getattr(record, "step", None), []).append(record)
+            return True
+        return bool(self.target.handle(record))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.target.emit(record)
+
+    def close(self) -> None:
+        for records in self._held.values():
+            for record in records:
+                self.target.handle(record)
+        self._held.clear()
+        self.target.close()
+        super().close()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line.
+
+    Fields: `ts` (epoch seconds), `elapsed` (seconds since logging started),
+    `level`, `logger`, `thread`, `step` (see `log_step`; null outside a step)
+    and `message`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(
+            {
+                "ts": round(record.created, 6),
+                "elapsed": round(record.relativeCreated / 1000, 6),
+                "level": record.levelname,
+                "logger": record.name,
+                "thread": record.threadName,
+                "step": getattr(record, "step", None),
+                "message": record.getMessage(),
+            },
+            ensure_ascii=False,
+        )
+
+
+class LoggingPipeline:
+    """A root-logger setup that never blocks the caller on output.
+
+    Log calls only format the message and enqueue the record (via a
+    `QueueHandler`); a single `QueueListener` thread does all terminal and
+    file writes. Call `stop()` (or use as a context manager) to flush — it is
+    also registered with `atexit`, so a plain return from `main()` still
+    drains the queue. `flush()` waits for the queue to drain without stopping.
+    """
+
+    def __init__(self, handlers: list[logging.Handler], level: int) -> None:
+        self.handlers = handlers
+        # A joinable queue: the listener marks each record done, so `flush`
+        # can wait for it.
+        self._queue: queue.Queue[logging.LogRecord] = queue.Queue()
+        self.queue_handler = logging.handlers.QueueHandler(self._queue)
+        self.queue_handler.addFilter(_StepFilter())
+        self._listener = logging.handlers.QueueListener(
+            self._queue, *handlers, respect_handler_level=True
+        )
+        self._stopped = False
+
+        root = logging.getLogger()
+        root.addHandler(self.queue_handler)
+        root.setLevel(level)
+        self._listener.start()
+        atexit.register(self.stop)
+        _pipelines.append(self)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def stop(self) -> None:
+        """Flush queued records, then detach from the root logger.  Idempotent."""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._listener.stop()
+        logging.getLogger().removeHandler(self.queue_handler)
+        for handler in self.handlers:
+            handler.close()
+        atexit.unregister(self.stop)
+        _pipelines.remove(self)
+
+    def flush(self) -> None:
+        """Block until every record queued so far has been written."""
+        if not self._stopped:
+            self._queue.join()
+
+
+_pipelines: list[LoggingPipeline] = []
+
+
+def flush_logging() -> None:
+    """Wait for running pipelines to write out queued records.
+
+    Call before writing to the terminal directly (e.g. a prompt), so log lines
+    emitted earlier don't land after it.
+    """
+    for pipeline in _pipelines:
+        pipeline.flush()
+
+
+def setup_logging(
+    level: int = logging.INFO,
+    *,
+    stream: IO[str] | None = None,
+    json_path: Path | None = None,
+) -> LoggingPipeline:
+    """Route the root logger through a non-blocking `LoggingPipeline`.
+
+    Args:
+        level: Root logger level.
+        stream: Console stream for `ColoredLogFormatter` output (default stdout).
+        json_path: If given, also append every record to this file as JSON lines
+            (see `JsonLinesFormatter`).
+    """
+    console = logging.StreamHandler(stream if stream is not None else sys.stdout)
+    console.setFormatter(ColoredLogFormatter())
+    handlers: list[logging.Handler] = [_HoldingHandler(console)]
+
+    if json_path is not None:
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        json_handler = logging.FileHandler(json_path, encoding="utf-8")
+        json_handler.setFormatter(JsonLinesFormatter())
+        json_handler.addFilter(lambda record: not hasattr(record, "release_step"))
+        handlers.append(json_handler)
+
+    return LoggingPipeline(handlers, level)
+
+
+PROGRESS_MAX_FPS = 10
+PROGRESS_SUMMARY_INTERVAL_SECS = 5.0
+
+TASK_PENDING = "pending"
+TASK_RUNNING = "running"
+TASK_DONE = "done"
+TASK_FAILED = "failed"
+
+_TASK_STATE_COLORS = {
+    TASK_PENDING: Colors.BRIGHT_GRAY,
+    TASK_RUNNING: Colors.BRIGHT_CYAN,
+    TASK_DONE: Colors.BRIGHT_GREEN,
+    TASK_FAILED: Colors.BRIGHT_RED,
+}
+
+
+def format_bytes(count: int) -> str:
+    """`count` bytes in human units, e.g. "512 B", "1.5 MiB"."""
+    if count < 1024:
+        return f"{count} B"
+    value = float(count)
+    for unit in ("KiB", "MiB", "GiB", "TiB"):
+        value /= 1024
+        if value < 1024:
+            break
+    return f"{value:.1f} {unit}"
+
+
+@dataclass
+class ProgressTask:
+    """One row of a `ProgressDisplay`."""
+
+    name: str
+    state: str = TASK_PENDING
+    done_bytes: int = 0
+    total_bytes: int | None = None
+    started: float | None = None
+    finished: float | None = None
+
+    def elapsed(self, now: float) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished if self.finished is not None else now) - self.started
+
+    def describe(self, now: float) -> str:
+        """Plain-text status, e.g. "running 1.2 MiB / 4.0 MiB 3.1s"."""
+        parts = [self.state]
+        if self.total_bytes is not None:
+            parts.append(
+                f"{format_bytes(self.done_bytes)} / {format_bytes(self.total_bytes)}"
+            )
+        elif self.done_bytes:
+            parts.append(format_bytes(self.done_bytes))
+        if self.started is not None:
+            parts.append(f"{self.elapsed(now):.1f}s")
+        return " ".join(parts)
+
+
+class ProgressDisplay:
+    """Live status of several concurrent tasks (downloads, clones, flavors…).
+
+    Updates are cheap and thread-safe: they change the task under a lock and
+    draw only if the last frame is older than `1 / fps`, so a flood of
+    updates costs at most `fps` terminal writes per second.
+
+    On a TTY the task rows are redrawn in place: each frame rewrites only the
+    rows that changed, using relative cursor movement, in a single write.
+    Otherwise (pipes, CI logs) a one-line summary is printed at most every
+    `summary_interval` seconds, plus a final one from `close()`.
+
+    Frames are only drawn from `update()`/`start()`/`finish()` and `close()`;
+    call `refresh()` periodically if elapsed times should tick while tasks
+    are idle. Avoid writing other output to `stream` while live.
+    """
+
+    def __init__(
+        self,
+        stream: IO[str] | None = None,
+        *,
+        live: bool | None = None,
+        fps: float = PROGRESS_MAX_FPS,
+        summary_interval: float = PROGRESS_SUMMARY_INTERVAL_SECS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.stream = stream if stream is not None else sys.stdout
+        self.live = self.stream.isatty() if live is None else live
+        self.tasks: dict[str, ProgressTask] = {}
+        self.frames = 0
+        self._interval = 1 / fps if self.live else summary_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_draw: float | None = None
+        self._drawn: list[str] = []
+        self._closed = False
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def add(self, name: str, total_bytes: int | None = None) -> None:
+        """Register a pending task; rows appear in the order they're added."""
+        with self._lock:
+            self.tasks[name] = ProgressTask(name, total_bytes=total_bytes)
+            self._draw_if_due()
+
+    def start(self, name: str) -> None:
+        self.update(name, state=TASK_RUNNING)
+
+    def finish(self, name: str, ok: bool = True) -> None:
+        self.update(name, state=TASK_DONE if ok else TASK_FAILED)
+
+    def update(
+        self,
+        name: str,
+        *,
+        advance: int = 0,
+        done_bytes: int | None = None,
+        total_bytes: int | None = None,
+        state: str | None = None,
+    ) -> None:
+        """Change task `name` (adding it if unknown), then draw if a frame is due."""
+        with self._lock:
+            now = self._clock()
+            task = self.tasks.get(name)
+            if task is None:
+                task = self.tasks[name] = ProgressTask(name)
+            if state is not None and state != task.state:
+                task.state = state
+                if state == TASK_RUNNING and task.started is None:
+                    task.started = now
+                elif state in (TASK_DONE, TASK_FAILED):
+                    if task.started is None:
+                        task.started = now
+                    task.finished = now
+            if total_bytes is not None:
+                task.total_bytes = total_bytes
+            if done_bytes is not None:
+                task.done_bytes = done_bytes
+            task.done_bytes += advance
+            self._draw_if_due(now)
+
+    def refresh(self) -> None:
+        """Draw a frame if one is due, e.g. from a timer to tick elapsed times."""
+        with self._lock:
+            self._draw_if_due()
+
+    def close(self) -> None:
+        """Draw the final state unconditionally.  Idempotent."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._draw(self._clock())
+
+    def summary(self, now: float | None = None) -> str:
+        """One-line overview used for non-TTY output."""
+        now = self._clock() if now is None else now
+        counts = {state: 0 for state in _TASK_STATE_COLORS}
+        for task in self.tasks.values():
+            counts[task.state] = counts.get(task.state, 0) + 1
+        line = (
+            f"progress: {counts[TASK_DONE]}/{len(self.tasks)} done, "
+            f"{counts[TASK_FAILED]} failed, {counts[TASK_RUNNING]} running"
+        )
+        running = [
+            f"{task.name} {task.describe(now).removeprefix(TASK_RUNNING + ' ')}"
+            for task in self.tasks.values()
+            if task.state == TASK_RUNNING
+        ]
+        return f"{line} ({'; '.join(running)})" if running else line
+
+    def _draw_if_due(self, now: float | None = None) -> None:
+        if self._closed:
+            return
+        now = self._clock() if now is None else now
+        if self._last_draw is None or now - self._last_draw >= self._interval:
+            self._draw(now)
+
+    def _draw(self, now: float) -> None:
+        self._last_draw = now
+        self.frames += 1
+        if self.live:
+            frame = self._frame(self._rows(now))
+        else:
+            frame = self.summary(now) + "\n"
+        if frame:
+            self.stream.write(frame)
+            self.stream.flush()
+
+    def _rows(self, now: float) -> list[str]:
+        width = shutil.get_terminal_size().columns - 1
+        name_width = max((len(name) for name in self.tasks), default=0)
+        rows = []
+        for task in self.tasks.values():
+            plain = f"{task.name:<{name_width}}  {task.describe(now)}"[:width]
+            color = _TASK_STATE_COLORS.get(task.state, "")
+            rows.append(f"{color}{plain}{Colors.RESET}" if color else plain)
+        return rows
+
+    def _frame(self, rows: list[str]) -> str:
+        """Escape sequence turning the previously drawn rows into `rows`.
+
+        Between frames the cursor rests at column 0 of the line below the
+        last row.  Unchanged rows are skipped with cursor movement.
+        """
+        out = []
+        cursor = len(self._drawn)
+        for index, row in enumerate(rows):
+            if index < len(self._drawn) and self._drawn[index] == row:
+                continue
+            if index < cursor:
+                out.append(f"\033[{cursor - index}A")
+            elif index > cursor:
+                out.append(f"\033[{index - cursor}B")
+            out.append(f"\r{row}\033[K\n")
+            cursor = index + 1
+        if cursor < len(rows):
+            out.append(f"\033[{len(rows) - cursor}B")
+        self._drawn = rows
+        return "".join(out)
+
+
+ANSWERS_ENV_VAR = "DOTFILES_ANSWERS"
+TRANSCRIPT_ENV_VAR = "DOTFILES_TRANSCRIPT"
+
+# Sources recorded in the prompt transcript.
+ANSWER_FROM_FILE = "answers"
+ANSWER_FROM_TTY = "tty"
+ANSWER_FROM_DEFAULT = "default"
+
+_ANSI_ESCAPE_RE = re.compile(r"\033\[[0-9;]*m")
+_MISSING = object()
+
+
+class Answers:
+    """Pre-recorded replies for `confirm`/`input_field`, keyed by prompt ID.
+
+    Keys are prompt IDs or `fnmatch` glob patterns over them, e.g.:
+
+        {"git.name": "Jane Doe", "backup:*/.bashrc": false, "backup:*": true}
+
+    An exact key wins; otherwise the first matching pattern in file order.
+    """
+
+    def __init__(self, answers: Mapping[str, object], source: str = "<memory>") -> None:
+        self.answers = dict(answers)
+        self.source = source
+        self._patterns = [key for key in self.answers if _is_glob(key)]
+
+    def lookup(self, prompt_id: str) -> object:
+        """The answer for `prompt_id`, or `_MISSING` if none applies."""
+        if prompt_id in self.answers:
+            return self.answers[prompt_id]
+        for pattern in self._patterns:
+            if fnmatch.fnmatchcase(prompt_id, pattern):
+                return self.answers[pattern]
+        return _MISSING
+
+
+def _is_glob(key: str) -> bool:
+    return any(c in key for c in "*?[")
+
+
+def load_answers(path: Path) -> Answers:
+    """Load an answers file: TOML if `path` ends in `.toml`, JSON otherwise.
+
+    Raises:
+        ValueError: if the file doesn't parse or isn't a table of answers.
+    """
+    try:
+        if path.suffix == ".toml":
+            with open(path, "rb") as f:
+                data = tomllib.load(f)
+        else:
+            data = json.loads(path.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, tomllib.TOMLDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f"cannot parse answers file {path}: {e}") from e
+
+    if not isinstance(data, dict):
+        raise ValueError(f"answers file {path} must contain a table of prompt IDs")
+    return Answers(data, source=str(path))
+
+
+@dataclass
+class _PromptConfig:
+    answers: Answers | None = None
+    transcript_path: Path | None = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+_prompt_config: _PromptConfig | None = None
+
+
+def configure_prompts(
+    answers_path: Path | None = None,
+    transcript_path: Path | None = None,
+    env: Mapping[str, str] | None = None,
+) -> None:
+    """Set where `confirm`/`input_field` take unattended answers from and
+    where they record what was asked.
+
+    Each argument falls back to its environment variable (`DOTFILES_ANSWERS`,
+    `DOTFILES_TRANSCRIPT`); prompts configure themselves from the environment
+    on first use if this is never called.
+
+    Raises:
+        ValueError: if the answers file is malformed.
+        OSError: if the answers file can't be read.
+    """
+    global _prompt_config
+    env = os.environ if env is None else env
+    if answers_path is None and env.get(ANSWERS_ENV_VAR):
+        answers_path = Path(env[ANSWERS_ENV_VAR])
+    if transcript_path is None and env.get(TRANSCRIPT_ENV_VAR):
+        transcript_path = Path(env[TRANSCRIPT_ENV_VAR])
+
+    _prompt_config = _PromptConfig(
+        answers=load_answers(answers_path) if answers_path is not None else None,
+        transcript_path=transcript_path,
+    )
+
+
+def _get_prompt_config() -> _PromptConfig:
+    if _prompt_config is None:
+        configure_prompts()
+    assert _prompt_config is not None
+    return _prompt_config
+
+
+def _prompt_id(prompt_id: str | None, message: str) -> str:
+    return prompt_id if prompt_id is not None else _ANSI_ESCAPE_RE.sub("", message)
+
+
+def _record_prompt(
+    config: _PromptConfig, prompt_id: str, message: str, answer: object, source: str
+) -> None:
+    """Append one JSON line describing an answered prompt to the transcript."""
+    logger.debug(f"prompt {prompt_id!r} answered {answer!r} (from {source})")
+    if config.transcript_path is None:
+        return
+    line = json.dumps(
+        {
+            "ts": round(time.time(), 3),
+            "prompt_id": prompt_id,
+            "message": _ANSI_ESCAPE_RE.sub("", message),
+            "answer": answer,
+            "source": source,
+        },
+        ensure_ascii=False,
+    )
+    with config.lock:
+        config.transcript_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(config.transcript_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
 def input_field(
-    message: str, default_message: str | None = None, default: str | None = None
+    message: str,
+    default_message: str | None = None,
+    default: str | None = None,
+    *,
+    prompt_id: str | None = None,
 ) -> str | None:
     """Prompt user for input with optional default value.
 
@@ -44,13 +639,35 @@ def input_field(
         message: Prompt message to display
         default_message: Custom default message (overrides auto-generated)
         default: Value to return if user enters nothing or stdin isn't a TTY
+        prompt_id: Key looked up in the answers file (see `configure_prompts`);
+            defaults to `message` without color codes.
 
     Returns:
-        User input string, or `default` (which may be `None`) if the input
-        is empty or stdin isn't a TTY. Never raises on closed stdin.
+        The answers-file entry if there is one (an empty string or null gives
+        `default`), else the user input string, or `default` (which may be
+        `None`) if the input is empty or stdin isn't a TTY. Never raises on
+        closed stdin.
+
+    Raises:
+        ValueError: if the answers-file entry isn't a string or null.
     """
+    config = _get_prompt_config()
+    prompt_id = _prompt_id(prompt_id, message)
+
+    answers = config.answers
+    answer = answers.lookup(prompt_id) if answers is not None else _MISSING
+    if answers is not None and answer is not _MISSING:
+        if answer is not None and not isinstance(answer, str):
+            raise ValueError(
+                f"answer for prompt {prompt_id!r} in {answers.source} "
+                f"must be a string, got {answer!r}"
+            )
+        result = answer if answer else default
+        _record_prompt(config, prompt_id, message, result, ANSWER_FROM_FILE)
+        return result
 
     if not sys.stdin.isatty():
+        _record_prompt(config, prompt_id, message, default, ANSWER_FROM_DEFAULT)
         return default
 
     if default_message is None:
@@ -62,54 +679,92 @@ def input_field(
     else:
         default_message = f"({default_message})"
 
+    flush_logging()
     print(f"{message} {default_message}: ", end="", file=sys.stderr)
     input_result = input()
 
     if len(input_result.strip()) == 0:
+        _record_prompt(config, prompt_id, message, default, ANSWER_FROM_DEFAULT)
         return default
     else:
+        _record_prompt(config, prompt_id, message, input_result, ANSWER_FROM_TTY)
         return input_result
 
 
-def confirm(message: str, default: bool | None = None) -> bool:
+def _parse_yes_no(reply: str) -> bool | None:
+    reply = reply.strip().lower()
+    if not reply:
+        return None
+    if "yes".startswith(reply) or reply == "true":
+        return True
+    if "no".startswith(reply) or reply == "false":
+        return False
+    return None
+
+
+def confirm(
+    message: str, default: bool | None = None, *, prompt_id: str | None = None
+) -> bool:
     """Prompt user for yes/no confirmation.
 
     Args:
         message: Question to ask the user.
         default: Answer to return if the user enters nothing.  None means the
             user must give a yes/no response — empty input re-prompts.
+        prompt_id: Key looked up in the answers file (see `configure_prompts`);
+            defaults to `message` without color codes.
 
     Returns:
-        True for yes, False for no.
+        True for yes, False for no.  An answers-file entry (a boolean or a
+        yes/no string) takes precedence over asking.
 
     Raises:
-        RuntimeError: if called in a non-interactive session with no default.
+        ValueError: if the answers-file entry isn't a boolean or yes/no.
+        RuntimeError: if called in a non-interactive session with no default
+            and no answers-file entry.
     """
+    config = _get_prompt_config()
+    prompt_id = _prompt_id(prompt_id, message)
+
+    answers = config.answers
+    answer = answers.lookup(prompt_id) if answers is not None else _MISSING
+    if answers is not None and answer is not _MISSING:
+        result = answer if isinstance(answer, bool) else None
+        if isinstance(answer, str):
+            result = _parse_yes_no(answer)
+        if result is None:
+            raise ValueError(
+                f"answer for prompt {prompt_id!r} in {answers.source} "
+                f"must be yes/no, got {answer!r}"
+            )
+        _record_prompt(config, prompt_id, message, result, ANSWER_FROM_FILE)
+        return result
 
     if not sys.stdin.isatty():
         if default is None:
             raise RuntimeError(
-                "confirm() called without a default in a non-interactive session"
+                f"confirm() called without a default in a non-interactive session "
+                f"(prompt {prompt_id!r}; answer it via ${ANSWERS_ENV_VAR})"
             )
+        _record_prompt(config, prompt_id, message, default, ANSWER_FROM_DEFAULT)
         return default
 
+    flush_logging()
     while True:
         print(
             f"{message} [{'Y' if default is True else 'y'}/{'N' if default is False else 'n'}] ",
             end="",
             file=sys.stderr,
         )
-        reply = input().strip().lower()
+        reply = input()
 
-        if not reply:
-            if default is not None:
-                return default
-            print("Please answer yes or no.", file=sys.stderr)
-            continue
+        if not reply.strip() and default is not None:
+            _record_prompt(config, prompt_id, message, default, ANSWER_FROM_DEFAULT)
+            return default
 
-        if "yes".startswith(reply):
-            return True
-        if "no".startswith(reply):
-            return False
+        result = _parse_yes_no(reply)
+        if result is not None:
+            _record_prompt(config, prompt_id, message, result, ANSWER_FROM_TTY)
+            return result
 
         print("Please answer yes or no.", file=sys.stderr)
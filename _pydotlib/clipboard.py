@@ -10,23 +10,50 @@ clipboard.
 Copy works well over SSH; paste (OSC 52 read) is best-effort — it is disabled by
 default on most terminals and never forwarded through tmux, so remote paste fails
 fast rather than hanging. See ``docs/plans/2026-06-15-clipboard-osc52-design.md``.
+
+Inside tmux, copies too large for OSC 52 go through ``tmux load-buffer -w``
+instead: tmux stores the raw bytes (no base64, no 75 KB cap) and forwards them to
+the outer terminal's clipboard itself. The ``tmux`` backend can also be forced,
+and ``cpaste --tmux`` reads the tmux buffer back.
+
+Over SSH with ``$CLIPBOARD_RELAY_SOCK`` set, both directions go through the
+clipboard relay instead (see ``_pydotlib.clipboard_relay``), which has no size
+limit and makes remote paste work; if nothing answers on the socket, copy and
+paste fall back to the paths above.
 """
 
 from __future__ import annotations
 
 import base64
 import binascii
+import hashlib
+import io
+import itertools
+import mmap
 import os
 import platform
 import select
 import shutil
+import stat
 import subprocess
 import sys
 import time
-from collections.abc import Callable, Mapping
-from dataclasses import dataclass
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import asdict, dataclass
 from typing import IO
 
+from _pydotlib.cache import Cache, hot_cache_dir
+from _pydotlib.clipboard_relay import (
+    RELAY_CHUNK,
+    RELAY_SOCK_ENV_VAR,
+    RelayError,
+    RelayUnreachable,
+    file_chunks,
+    relay_copy,
+    relay_paste,
+)
+from _pydotlib.escapes import Reply, ReplyParser
+
 # --- OSC 52 wire constants ---------------------------------------------------
 ESC = b"\x1b"
 BEL = b"\x07"
@@ -37,6 +64,9 @@ OSC52_PREFIX = ESC + b"]52;"
 # erroring; the de-facto limit is 75000 raw bytes (100000 base64 chars, from
 # hterm's OSC_52_MAX_SEQUENCE). Terminal-dependent — some are smaller.
 OSC52_MAX_RAW = 75000
+# Raw bytes base64-encoded per write when streaming a copy; a multiple of 3 so
+# each chunk encodes without padding and the pieces concatenate cleanly.
+OSC52_CHUNK_RAW = 3 * 4096
 # Hard ceiling on an OSC 52 paste reply. The reply is untrusted (anything that
 # can write to the tty can answer the clipboard query), so bound it.
 OSC52_READ_CEILING = 1 << 20  # 1 MiB
@@ -52,12 +82,41 @@ EXIT_NO_FILE = 3
 EXIT_NO_BACKEND = 4
 EXIT_PASTE_UNSUPPORTED = 5
 EXIT_TOO_LARGE = 6
+EXIT_NO_ENTRY = 7  # cpaste --pick/--grep: no such history entry
+
+# --- detection cache -----------------------------------------------------------
+# Detection results are reused for this long within one session (same
+# fingerprint), so a tool installed or a tmux option changed mid-session is
+# picked up within DETECT_CACHE_TTL.
+DETECT_CACHE_NAMESPACE = "clipboard-detect"
+DETECT_CACHE_TTL = 10 * 60.0
+# Everything `detect` and the probes read; a change to any is a new session.
+_FINGERPRINT_VARS = (
+    "PATH",
+    "DISPLAY",
+    "WAYLAND_DISPLAY",
+    "TMUX",
+    "STY",
+    "SSH_TTY",
+    "SSH_CONNECTION",
+    "SSH_CLIENT",
+    "MOSH_CONNECTION",
+    "TERM",
+    "TERM_PROGRAM",
+    RELAY_SOCK_ENV_VAR,
+)
 
 # --- backend selection results ----------------------------------------------
 BACKEND_NATIVE = "native"
 BACKEND_OSC52 = "osc52"
+BACKEND_TMUX = "tmux"
+BACKEND_RELAY = "relay"
 BACKEND_NATIVE_UNREACHABLE = "native-unreachable"
 
+# `-w` (tmux 3.2+) also sends the buffer to the outer terminal's clipboard.
+TMUX_LOAD_BUFFER = ["tmux", "load-buffer", "-w", "-"]
+TMUX_SAVE_BUFFER = ["tmux", "save-buffer", "-"]
+
 
 def warn(message: str) -> None:
     """Print a single advisory line to stderr."""
@@ -77,6 +136,7 @@ class Environment:
     term_program: str
     native_copy: list[str] | None  # argv to copy via native tool, or None
     native_paste: list[str] | None  # argv to paste via native tool, or None
+    relay_socket: str | None = None  # forwarded clipboard relay socket, if any
 
 
 def _detect_os(system: str, release: str) -> str:
@@ -158,11 +218,52 @@ def detect(
         term_program=env.get("TERM_PROGRAM", ""),
         native_copy=_native_copy_cmd(os_name, env, which),
         native_paste=_native_paste_cmd(os_name, env, which),
+        relay_socket=env.get(RELAY_SOCK_ENV_VAR) or None,
+    )
+
+
+def session_fingerprint(env: Mapping[str, str], *, system: str, release: str) -> str:
+    """A short hash of every ambient fact that detection depends on."""
+    parts = [system, release] + [f"{name}={env.get(name, '')}" for name in _FINGERPRINT_VARS]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()[:32]
+
+
+def detection_cache() -> Cache | None:
+    """The runtime-dir cache for detection results; None without a runtime dir."""
+    runtime_dir = hot_cache_dir()
+    if runtime_dir is None:
+        return None
+    return Cache(DETECT_CACHE_NAMESPACE, path=runtime_dir / f"{DETECT_CACHE_NAMESPACE}.json")
+
+
+def _current_fingerprint() -> str:
+    return session_fingerprint(
+        os.environ, system=platform.system(), release=platform.uname().release
     )
 
 
-def default_environment() -> Environment:
-    """Detect the :class:`Environment` from the real process/OS state."""
+def default_environment(*, cache: Cache | None = None) -> Environment:
+    """Detect the :class:`Environment` from the real process/OS state.
+
+    The result is cached under the session fingerprint in ``cache`` (default:
+    ``detection_cache()``), so repeated calls skip the ``which`` lookups.
+    """
+    cache = cache if cache is not None else detection_cache()
+    if cache is None:
+        return _detect_now()
+    key = f"env:{_current_fingerprint()}"
+    cached = cache.get(key)
+    if isinstance(cached, dict):
+        try:
+            return Environment(**cached)
+        except TypeError:
+            pass  # written by a version with different fields
+    env = _detect_now()
+    cache.set(key, asdict(env), DETECT_CACHE_TTL)
+    return env
+
+
+def _detect_now() -> Environment:
     return detect(
         os.environ,
         system=platform.system(),
@@ -171,22 +272,46 @@ def default_environment() -> Environment:
     )
 
 
+def cached_run(
+    run: Callable[[list[str]], str | None] | None = None, *, cache: Cache | None = None
+) -> Callable[[list[str]], str | None]:
+    """Wrap ``run`` (default ``_run_cmd``) to reuse outputs within a session.
+
+    For the ``run`` argument of ``copy``/``copy_file``: their probes (``tmux
+    show -gv set-clipboard``) then fork once per session and TTL rather than
+    once per copy. Without a cache ``run`` is returned unwrapped.
+    """
+    inner = run if run is not None else _run_cmd
+    cache = cache if cache is not None else detection_cache()
+    if cache is None:
+        return inner
+    store = cache
+    fingerprint = _current_fingerprint()
+
+    def run_cached(cmd: list[str]) -> str | None:
+        key = f"run:{fingerprint}:" + "\0".join(cmd)
+        return store.get_or_fetch(key, lambda: inner(cmd), DETECT_CACHE_TTL)
+
+    return run_cached
+
+
 def choose_backend(env: Environment, verb: str, prefer: str | None) -> str:
     """Decide the backend for ``verb`` ("copy"/"paste"); see module docs.
 
-    Returns one of ``BACKEND_NATIVE``, ``BACKEND_OSC52``, or
-    ``BACKEND_NATIVE_UNREACHABLE`` (only when native was forced but no tool
-    resolves).
+    Returns one of ``BACKEND_NATIVE``, ``BACKEND_OSC52``, ``BACKEND_RELAY``,
+    ``BACKEND_TMUX`` (only when forced), or ``BACKEND_NATIVE_UNREACHABLE`` (only
+    when native was forced but no tool resolves). Auto-selecting tmux for oversized copies
+    happens in ``copy``/``copy_file``, which know the payload size.
     """
     native = env.native_copy if verb == "copy" else env.native_paste
-    if prefer == BACKEND_OSC52:
-        return BACKEND_OSC52
+    if prefer in (BACKEND_OSC52, BACKEND_TMUX, BACKEND_RELAY):
+        return prefer
     if prefer == BACKEND_NATIVE:
         return BACKEND_NATIVE if native is not None else BACKEND_NATIVE_UNREACHABLE
     # auto: over SSH the native tool would target the wrong machine (the remote
     # host), so OSC 52 wins even when xclip/$DISPLAY resolve (incl. X11 fwd).
     if env.is_ssh:
-        return BACKEND_OSC52
+        return BACKEND_RELAY if env.relay_socket else BACKEND_OSC52
     return BACKEND_NATIVE if native is not None else BACKEND_OSC52
 
 
@@ -203,10 +328,13 @@ def resolve_prefer(cli_value: str | None) -> str | None:
     if raw is None:
         return None
     value = raw.lower()
-    if value in (BACKEND_NATIVE, BACKEND_OSC52):
+    if value in (BACKEND_NATIVE, BACKEND_OSC52, BACKEND_TMUX, BACKEND_RELAY):
         return value
     if value != "auto":
-        warn(f"ignoring invalid CLIPBOARD_BACKEND={raw!r}; expected native, osc52, or auto")
+        warn(
+            f"ignoring invalid CLIPBOARD_BACKEND={raw!r}; "
+            "expected native, osc52, tmux, relay, or auto"
+        )
     return None
 
 
@@ -232,9 +360,34 @@ def encode_osc52(data: bytes, *, target: bytes = b"c", terminator: bytes = BEL)
     return OSC52_PREFIX + target + b";" + payload + terminator
 
 
-def _find_terminator(payload: bytes) -> int | None:
-    candidates = [i for i in (payload.find(BEL), payload.find(ST)) if i != -1]
-    return min(candidates) if candidates else None
+def _write_all(tty: IO[bytes], data: bytes | memoryview) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[tty.write(view) :]
+
+
+def write_osc52(
+    tty: IO[bytes], data: bytes | memoryview, *, target: bytes = b"c", terminator: bytes = BEL
+) -> None:
+    """Stream the OSC 52 sequence for ``data`` to ``tty``, chunk by chunk.
+
+    Writes the same bytes as ``encode_osc52`` but base64-encodes slices of
+    ``data`` (which may be a memoryview over an mmap) as it goes, so memory use
+    stays at one chunk however large the payload is.
+    """
+    view = memoryview(data)
+    _write_all(tty, OSC52_PREFIX + target + b";")
+    for start in range(0, len(view), OSC52_CHUNK_RAW):
+        chunk = view[start : start + OSC52_CHUNK_RAW]
+        _write_all(tty, binascii.b2a_base64(chunk, newline=False))
+    _write_all(tty, terminator)
+
+
+def _osc52_reply(parser: ReplyParser, chunk: bytes) -> Reply | None:
+    for reply in parser.feed(chunk):
+        if reply.osc_command == 52:
+            return reply
+    return None
 
 
 def parse_osc52_reply(buf: bytes) -> bytes | None:
@@ -245,26 +398,8 @@ def parse_osc52_reply(buf: bytes) -> bytes | None:
     untrusted, so base64 is validated strictly and anything malformed is
     rejected as "no reply".
     """
-    start = buf.find(OSC52_PREFIX)
-    if start < 0:
-        return None
-    body = buf[start + len(OSC52_PREFIX) :]
-    semi = body.find(b";")  # end of the selection field (e.g. "c")
-    if semi < 0:
-        return None
-    payload = body[semi + 1 :]
-    end = _find_terminator(payload)
-    if end is None:
-        return None
-    try:
-        return base64.b64decode(payload[:end], validate=True)
-    except (binascii.Error, ValueError):
-        return None
-
-
-def _reply_complete(buf: bytes) -> bool:
-    start = buf.find(OSC52_PREFIX)
-    return start >= 0 and _find_terminator(buf[start:]) is not None
+    reply = _osc52_reply(ReplyParser(OSC52_READ_CEILING), buf)
+    return reply.payload if reply is not None else None
 
 
 def _run_cmd(cmd: list[str]) -> str | None:
@@ -301,9 +436,13 @@ def _open_tty_rw_fd() -> int:
     return os.open("/dev/tty", os.O_RDWR | os.O_NOCTTY)
 
 
-def _native_copy(cmd: list[str], data: bytes) -> int:
+def _native_copy(cmd: list[str], data: bytes | io.BufferedIOBase) -> int:
     try:
-        proc = subprocess.run(cmd, input=data, check=False)
+        if isinstance(data, bytes):
+            proc = subprocess.run(cmd, input=data, check=False)
+        else:
+            # A file is handed to the tool as its stdin rather than read in here.
+            proc = subprocess.run(cmd, stdin=data.fileno(), check=False)
     except OSError as exc:
         warn(f"native clipboard command failed: {exc}")
         return EXIT_NO_BACKEND
@@ -355,7 +494,10 @@ def _osc52_paste(timeout: float, tty_fd_opener: Callable[[], int]) -> bytes | No
         tty_mod.setraw(fd)
         os.write(fd, OSC52_PREFIX + b"c;?" + BEL)
 
-        buf = bytearray()
+        # Each chunk is parsed once as it arrives (and its base64 decoded),
+        # rather than rescanning the whole buffer after every read.
+        parser = ReplyParser(OSC52_READ_CEILING)
+        received = 0
         deadline = time.monotonic() + timeout
         while True:
             remaining = deadline - time.monotonic()
@@ -367,12 +509,13 @@ def _osc52_paste(timeout: float, tty_fd_opener: Callable[[], int]) -> bytes | No
             chunk = os.read(fd, 4096)
             if not chunk:
                 break
-            buf.extend(chunk)
-            if len(buf) > OSC52_READ_CEILING:
+            received += len(chunk)
+            if received > OSC52_READ_CEILING:
                 return None
-            if _reply_complete(bytes(buf)):
-                break
-        return parse_osc52_reply(bytes(buf))
+            reply = _osc52_reply(parser, chunk)
+            if reply is not None:
+                return reply.payload
+        return None
     finally:
         if saved is not None:
             try:
@@ -401,11 +544,210 @@ def copy(
     if backend == BACKEND_NATIVE:
         assert env.native_copy is not None
         return _native_copy(env.native_copy, data)
+    if backend == BACKEND_RELAY:
+        code = _relay_copy(env, prefer, [data])
+        if code is not None:
+            return code
+    if backend == BACKEND_TMUX or (
+        len(data) > OSC52_MAX_RAW and _tmux_takes_oversized(env, prefer, run)
+    ):
+        return _tmux_copy(env, data)
 
-    # OSC 52 path.
+    return _osc52_copy(data, env, tty_writer, run)
+
+
+def copy_file(
+    handle: io.BufferedIOBase,
+    env: Environment,
+    *,
+    prefer: str | None = None,
+    tty_writer: Callable[[], IO[bytes]] = _open_tty_write,
+    run: Callable[[list[str]], str | None] = _run_cmd,
+) -> int:
+    """Copy the rest of an open file (or pipe) to the clipboard; return an exit code.
+
+    Unlike ``copy`` this never holds the whole input as ``bytes``. A regular
+    file is size-checked with ``fstat`` before anything is read, then either
+    handed to the native tool as its stdin or mmapped and streamed through
+    ``write_osc52``. A pipe can't be sized up front and a truncated OSC 52
+    sequence would still set the clipboard, so for OSC 52 it is read into a
+    buffer of at most ``OSC52_MAX_RAW + 1`` bytes first. Input too large for
+    OSC 52 is streamed to tmux instead when ``copy`` would do the same.
+    """
+    backend = choose_backend(env, "copy", prefer)
+    if backend == BACKEND_NATIVE_UNREACHABLE:
+        warn("forced native clipboard is unavailable on this host")
+        return EXIT_NO_BACKEND
+    # Input read before falling back from the relay; only the pipe path below
+    # can start from it.
+    read_ahead = b""
+    if backend == BACKEND_RELAY:
+        # Empty input would clear the remote clipboard, so look before sending.
+        read_ahead = handle.read(RELAY_CHUNK)
+        if not read_ahead:
+            return _refuse_empty()
+        code = _relay_copy(env, prefer, itertools.chain([read_ahead], file_chunks(handle)))
+        if code is not None:
+            return code
+        backend = BACKEND_OSC52
+
+    st = os.fstat(handle.fileno())
+    regular = stat.S_ISREG(st.st_mode)
+    size = st.st_size - handle.tell() if regular else 0
+    # Some regular files (/proc, sysfs) report size 0; read those like pipes.
+    if regular and size > 0 and not read_ahead:
+        if backend == BACKEND_NATIVE:
+            assert env.native_copy is not None
+            return _native_copy(env.native_copy, handle)
+        if backend == BACKEND_TMUX or (
+            size > OSC52_MAX_RAW and _tmux_takes_oversized(env, prefer, run)
+        ):
+            return _tmux_copy(env, handle)
+        if size > OSC52_MAX_RAW:
+            return _refuse_too_large(size)
+        offset = handle.tell()
+        with (
+            mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+            memoryview(mapped)[offset:] as view,
+        ):
+            return _osc52_copy(view, env, tty_writer, run)
+
+    if backend == BACKEND_NATIVE:
+        assert env.native_copy is not None
+        data = handle.read()
+        return _native_copy(env.native_copy, data) if data else _refuse_empty()
+
+    buf = bytearray(OSC52_MAX_RAW + 1)
+    with memoryview(buf) as view:
+        filled = len(read_ahead)
+        view[:filled] = read_ahead
+        while filled < len(buf):
+            count = handle.readinto(view[filled:])
+            if not count:
+                break
+            filled += count
+        if filled == 0:
+            return _refuse_empty()
+        if backend == BACKEND_TMUX or (
+            filled > OSC52_MAX_RAW and _tmux_takes_oversized(env, prefer, run)
+        ):
+            # Send what was read so far, then the rest of the pipe.
+            return _tmux_copy(env, view[:filled], rest=handle)
+        if filled > OSC52_MAX_RAW:
+            return _refuse_too_large(filled, at_least=True)
+        return _osc52_copy(view[:filled], env, tty_writer, run)
+
+
+def _refuse_empty() -> int:
+    warn("refusing to copy empty input (would clear the clipboard); use --clear")
+    return EXIT_USAGE
+
+
+def _refuse_too_large(size: int, *, at_least: bool = False) -> int:
+    size_text = f"over {size - 1}" if at_least else str(size)
+    warn(f"payload too large for OSC 52: {size_text} bytes (cap {OSC52_MAX_RAW}); not copied")
+    return EXIT_TOO_LARGE
+
+
+def _relay_copy(
+    env: Environment, prefer: str | None, chunks: Iterable[bytes | memoryview]
+) -> int | None:
+    """Copy through the relay; None means "unreachable, use OSC 52 instead"."""
+    if not env.relay_socket:
+        warn(f"no clipboard relay configured; set ${RELAY_SOCK_ENV_VAR}")
+        return EXIT_NO_BACKEND
+    try:
+        relay_copy(env.relay_socket, chunks)
+    except RelayUnreachable as exc:
+        if prefer is not None:
+            warn(str(exc))
+            return EXIT_NO_BACKEND
+        warn(f"{exc}; falling back to OSC 52")
+        return None
+    except RelayError as exc:
+        warn(str(exc))
+        return EXIT_NO_BACKEND
+    return EXIT_OK
+
+
+def _tmux_takes_oversized(
+    env: Environment, prefer: str | None, run: Callable[[list[str]], str | None]
+) -> bool:
+    """Whether a copy too large for OSC 52 should go through tmux instead.
+
+    Only when the backend wasn't forced, and only if tmux will forward the
+    buffer: with ``set-clipboard off`` the text would just sit in tmux.
+    """
+    if prefer is not None or not env.is_tmux:
+        return False
+    setting = run(["tmux", "show", "-gv", "set-clipboard"])
+    return setting is not None and setting.strip() != "off"
+
+
+def _tmux_copy(
+    env: Environment,
+    source: bytes | memoryview | io.BufferedIOBase,
+    *,
+    rest: io.BufferedIOBase | None = None,
+) -> int:
+    """Stream ``source`` (then ``rest``, if given) into ``tmux load-buffer -w``.
+
+    A file ``source`` becomes tmux's stdin directly; bytes are written through
+    a pipe, followed by ``rest`` in ``shutil.copyfileobj`` chunks.
+    """
+    if not env.is_tmux:
+        warn("not inside tmux; the tmux clipboard backend needs $TMUX")
+        return EXIT_NO_BACKEND
+
+    if isinstance(source, (bytes, memoryview)):
+        data, stdin = source, subprocess.PIPE
+    else:
+        data, stdin = None, source.fileno()
+    try:
+        proc = subprocess.Popen(TMUX_LOAD_BUFFER, stdin=stdin)
+    except OSError as exc:
+        warn(f"tmux load-buffer failed: {exc}")
+        return EXIT_NO_BACKEND
+    try:
+        if data is not None and proc.stdin is not None:
+            with proc.stdin:
+                proc.stdin.write(data)
+                if rest is not None:
+                    shutil.copyfileobj(rest, proc.stdin)
+    except OSError as exc:
+        warn(f"tmux load-buffer failed: {exc}")
+        proc.kill()
+        proc.wait()
+        return EXIT_NO_BACKEND
+    if proc.wait() != 0:
+        warn("tmux load-buffer failed (copying to the clipboard needs tmux 3.2+)")
+        return EXIT_NO_BACKEND
+    return EXIT_OK
+
+
+def _tmux_paste(env: Environment) -> tuple[int, bytes]:
+    if not env.is_tmux:
+        warn("not inside tmux; the tmux clipboard backend needs $TMUX")
+        return EXIT_NO_BACKEND, b""
+    try:
+        proc = subprocess.run(TMUX_SAVE_BUFFER, capture_output=True, check=False)
+    except OSError as exc:
+        warn(f"tmux save-buffer failed: {exc}")
+        return EXIT_NO_BACKEND, b""
+    if proc.returncode != 0:
+        warn("tmux has no paste buffer")
+        return EXIT_NO_BACKEND, b""
+    return EXIT_OK, proc.stdout
+
+
+def _osc52_copy(
+    data: bytes | memoryview,
+    env: Environment,
+    tty_writer: Callable[[], IO[bytes]],
+    run: Callable[[list[str]], str | None],
+) -> int:
     if len(data) > OSC52_MAX_RAW:
-        warn(f"payload too large for OSC 52: {len(data)} bytes (cap {OSC52_MAX_RAW}); not copied")
-        return EXIT_TOO_LARGE
+        return _refuse_too_large(len(data))
     if env.is_screen:
         warn("screen does not support OSC 52; use tmux or a native clipboard tool")
         return EXIT_NO_BACKEND
@@ -413,7 +755,7 @@ def copy(
         warn(message)
     try:
         with tty_writer() as tty:
-            tty.write(encode_osc52(data))
+            write_osc52(tty, data)
             tty.flush()
     except OSError:
         warn("no controlling terminal; cannot emit OSC 52")
@@ -436,12 +778,28 @@ def paste(
     if backend == BACKEND_NATIVE:
         assert env.native_paste is not None
         return _native_paste(env.native_paste, env.os)
+    if backend == BACKEND_TMUX:
+        return _tmux_paste(env)
+    if backend == BACKEND_RELAY:
+        if not env.relay_socket:
+            warn(f"no clipboard relay configured; set ${RELAY_SOCK_ENV_VAR}")
+            return EXIT_NO_BACKEND, b""
+        try:
+            return EXIT_OK, relay_paste(env.relay_socket)
+        except RelayUnreachable as exc:
+            if prefer is not None:
+                warn(str(exc))
+                return EXIT_NO_BACKEND, b""
+            warn(f"{exc}; falling back to OSC 52")
+        except RelayError as exc:
+            warn(str(exc))
+            return EXIT_NO_BACKEND, b""
 
     # OSC 52 read is only attempted where it has a chance.
     if env.is_tmux:
         warn(
             "remote paste isn't supported through tmux; "
-            "use Ctrl/Cmd-Shift-V or a tmux paste-buffer"
+            "use Ctrl/Cmd-Shift-V, or `cpaste --tmux` for the tmux paste buffer"
         )
         return EXIT_PASTE_UNSUPPORTED, b""
     if env.is_screen:
@@ -0,0 +1,326 @@
+"""Fixed-size, memory-mapped history of everything copied with `ccopy`.
+
+The history is one file, `$XDG_STATE_HOME/dotfiles/clipboard-history`, with
+three parts:
+
+    header   magic, geometry, the write position and the entry count
+    slots    `slots` fixed-size records: sequence number, data offset,
+             length and timestamp of one entry
+    data     a `data_bytes` ring buffer of entry contents
+
+Appending writes the bytes at the current position (wrapping around), fills
+the next slot and bumps the header, so it costs O(entry size) however long
+the history is, and the file never grows. Old entries drop out when their
+slot is reused or their bytes are overwritten. Readers map the file and
+touch only the slots and the entries they need; `grep` looks at one entry at
+a time.
+
+Writers take an exclusive `fcntl.flock` on the file, readers a shared one.
+The file is mode 0600 (it can hold passwords); a file with the wrong magic
+or geometry is reinitialized.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import io
+import logging
+import mmap
+import os
+import re
+import stat
+import struct
+import time
+from collections.abc import Callable, Generator, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from _pydotlib.xdg import xdg_dirs
+
+if TYPE_CHECKING:
+    from _typeshed import WriteableBuffer
+
+HISTORY_SLOTS = 256
+HISTORY_DATA_BYTES = 16 << 20  # 16 MiB
+# Larger copies aren't recorded, so one huge paste can't flush the history.
+HISTORY_MAX_ENTRY_FRACTION = 4
+
+_MAGIC = b"CLIPHIS1"
+# magic, slots, data_bytes, head (total bytes ever written), count (entries)
+_HEADER = struct.Struct("<8sIQQQ")
+_HEADER_SIZE = 64
+# seq (1-based, 0 = empty), offset (logical, into the ring), length, timestamp
+_SLOT = struct.Struct("<QQQd")
+
+logger = logging.getLogger(__name__)
+
+
+def history_path() -> Path:
+    return xdg_dirs().state_home / "dotfiles" / "clipboard-history"
+
+
+@dataclass(frozen=True)
+class HistoryEntry:
+    """One remembered copy. `number` counts back from 1 (the newest)."""
+
+    number: int
+    timestamp: float
+    size: int
+
+
+@dataclass(frozen=True)
+class _Geometry:
+    slots: int
+    data_bytes: int
+
+    @property
+    def data_start(self) -> int:
+        return _HEADER_SIZE + self.slots * _SLOT.size
+
+    @property
+    def file_size(self) -> int:
+        return self.data_start + self.data_bytes
+
+
+def format_entry(entry: HistoryEntry, preview: bytes, *, width: int = 60) -> str:
+    """One `cpaste --history` line: number, time, size and the first line."""
+    when = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.timestamp))
+    first, _, rest = preview.partition(b"\n")
+    text = "".join(
+        ch if ch.isprintable() else "?" for ch in first.decode("utf-8", "replace")
+    )
+    if len(text) > width:
+        text = text[: width - 3] + "..."
+    elif rest or len(first) + 1 < entry.size:
+        text += " ..."  # more lines follow
+    return f"{entry.number:4}  {when}  {entry.size:>9}  {text}"
+
+
+class CopyRecorder(io.BufferedIOBase):
+    """A binary input wrapper that keeps the first `limit` bytes read through it.
+
+    `ccopy` streams its input straight to a backend; wrapping the input lets
+    it add the same bytes to the history afterwards without reading twice.
+    `kept` is None once more than `limit` bytes went past. Closing the
+    recorder leaves `handle` open.
+    """
+
+    def __init__(self, handle: io.BufferedIOBase, limit: int) -> None:
+        super().__init__()
+        self._handle = handle
+        self._limit = limit
+        self._kept: bytearray | None = bytearray()
+        fd = handle.fileno()
+        self.start = handle.tell() if stat.S_ISREG(os.fstat(fd).st_mode) else None
+
+    @property
+    def kept(self) -> bytes | None:
+        return None if self._kept is None else bytes(self._kept)
+
+    def fileno(self) -> int:
+        return self._handle.fileno()
+
+    def tell(self) -> int:
+        return self._handle.tell()
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int | None = -1, /) -> bytes:
+        data = self._handle.read(size)
+        self._keep(data)
+        return data
+
+    def readinto(self, buf: WriteableBuffer, /) -> int:
+        count = self._handle.readinto(buf)
+        if count:
+            with memoryview(buf) as view:
+                self._keep(view[:count])
+        return count
+
+    def _keep(self, data: bytes | memoryview) -> None:
+        if self._kept is None:
+            return
+        if len(self._kept) + len(data) > self._limit:
+            self._kept = None
+        else:
+            self._kept += data
+
+
+class ClipboardHistory:
+    """A bounded ring of past clipboard contents, newest first."""
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        *,
+        slots: int = HISTORY_SLOTS,
+        data_bytes: int = HISTORY_DATA_BYTES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if slots < 1 or data_bytes < 1:
+            raise ValueError("history needs at least one slot and one data byte")
+        self.path = path if path is not None else history_path()
+        self.max_entry = data_bytes // HISTORY_MAX_ENTRY_FRACTION
+        self._geometry = _Geometry(slots, data_bytes)
+        self._clock = clock
+
+    def append(self, data: bytes | memoryview) -> bool:
+        """Record `data`; returns False if it is empty or too large to keep."""
+        size = len(data)
+        if not 0 < size <= self.max_entry:
+            return False
+
+        geo = self._geometry
+        with self._mapped(write=True) as mapped:
+            assert mapped is not None
+            _, _, _, head, count = _HEADER.unpack_from(mapped, 0)
+            start = head % geo.data_bytes
+            first = min(size, geo.data_bytes - start)
+            view = memoryview(data)
+            base = geo.data_start
+            mapped[base + start : base + start + first] = view[:first]
+            if first < size:
+                mapped[base : base + size - first] = view[first:]
+
+            _SLOT.pack_into(
+                mapped,
+                _HEADER_SIZE + (count % geo.slots) * _SLOT.size,
+                count + 1,
+                head,
+                size,
+                self._clock(),
+            )
+            _HEADER.pack_into(
+                mapped, 0, _MAGIC, geo.slots, geo.data_bytes, head + size, count + 1
+            )
+        return True
+
+    def record(self, recorder: CopyRecorder) -> bool:
+        """Record what a `CopyRecorder` saw, or re-read its regular file.
+
+        Backends that take a regular file by fd or mmap never read through
+        the recorder; the file is still there, so its bytes are mapped again
+        from where the copy started.
+        """
+        kept = recorder.kept
+        if kept is None:
+            return False
+        if kept or recorder.start is None:
+            return self.append(kept)
+        fd = recorder.fileno()
+        if not 0 < os.fstat(fd).st_size - recorder.start <= self.max_entry:
+            return False
+        with (
+            mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped,
+            memoryview(mapped)[recorder.start :] as view,
+        ):
+            return self.append(view)
+
+    def entries(self) -> list[HistoryEntry]:
+        """All entries still held, newest first."""
+        with self._mapped() as mapped:
+            return [entry for entry, _ in self._scan(mapped)]
+
+    def read(self, number: int) -> bytes | None:
+        """The contents of entry `number` (1 = newest), or None if it is gone."""
+        with self._mapped() as mapped:
+            for entry, offset in self._scan(mapped):
+                if entry.number == number:
+                    assert mapped is not None
+                    return self._slice(mapped, offset, entry.size)
+        return None
+
+    def listing(
+        self, limit: int, pattern: re.Pattern[bytes] | None = None
+    ) -> list[tuple[HistoryEntry, bytes]]:
+        """Entries (matching `pattern`, if given) with their first `limit` bytes.
+
+        Entries are sliced out of the mapping one at a time, so searching
+        never holds more than one entry in memory.
+        """
+        found = []
+        with self._mapped() as mapped:
+            for entry, offset in self._scan(mapped):
+                assert mapped is not None
+                if pattern is None or pattern.search(self._slice(mapped, offset, entry.size)):
+                    found.append((entry, self._slice(mapped, offset, min(entry.size, limit))))
+        return found
+
+    def grep(self, pattern: bytes | re.Pattern[bytes]) -> list[HistoryEntry]:
+        """Entries whose contents match the regex `pattern`, newest first."""
+        regex = re.compile(pattern) if isinstance(pattern, bytes) else pattern
+        return [entry for entry, _ in self.listing(0, regex)]
+
+    def _scan(self, mapped: mmap.mmap | None) -> Iterator[tuple[HistoryEntry, int]]:
+        if mapped is None:
+            return
+        geo = self._geometry
+        _, _, _, head, count = _HEADER.unpack_from(mapped, 0)
+        number = 0
+        for seq in range(count, max(count - geo.slots, 0), -1):
+            slot_seq, offset, size, timestamp = _SLOT.unpack_from(
+                mapped, _HEADER_SIZE + ((seq - 1) % geo.slots) * _SLOT.size
+            )
+            # Skip torn slots, and stop at the first entry whose bytes have
+            # been overwritten: every older one has been too.
+            if slot_seq != seq:
+                continue
+            if offset < head - geo.data_bytes:
+                return
+            number += 1
+            yield HistoryEntry(number, timestamp, size), offset
+
+    def _slice(self, mapped: mmap.mmap, offset: int, size: int) -> bytes:
+        geo = self._geometry
+        start = geo.data_start + offset % geo.data_bytes
+        first = min(size, geo.data_start + geo.data_bytes - start)
+        if first == size:
+            return mapped[start : start + size]
+        wrapped = mapped[geo.data_start : geo.data_start + size - first]
+        return mapped[start : start + first] + wrapped
+
+    @contextmanager
+    def _mapped(self, *, write: bool = False) -> Generator[mmap.mmap | None, None, None]:
+        """Lock and map the file; yields None to readers if there's no history."""
+        geo = self._geometry
+        if write:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        else:
+            try:
+                fd = os.open(self.path, os.O_RDONLY)
+            except FileNotFoundError:
+                fd = -1
+        if fd < 0:
+            yield None
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if write else fcntl.LOCK_SH)
+            if not self._valid(fd):
+                if not write:
+                    yield None
+                    return
+                self._initialize(fd)
+            access = mmap.ACCESS_WRITE if write else mmap.ACCESS_READ
+            with mmap.mmap(fd, geo.file_size, access=access) as mapped:
+                yield mapped
+        finally:
+            os.close(fd)
+
+    def _valid(self, fd: int) -> bool:
+        geo = self._geometry
+        if os.fstat(fd).st_size != geo.file_size:
+            return False
+        magic, slots, data_bytes, _, _ = _HEADER.unpack(os.pread(fd, _HEADER.size, 0))
+        return (magic, slots, data_bytes) == (_MAGIC, geo.slots, geo.data_bytes)
+
+    def _initialize(self, fd: int) -> None:
+        if os.fstat(fd).st_size:
+            logger.warning(f"reinitializing unrecognized clipboard history {self.path}")
+        geo = self._geometry
+        os.ftruncate(fd, 0)
+        os.ftruncate(fd, geo.file_size)  # sparse: untouched data costs no disk
+        os.pwrite(fd, _HEADER.pack(_MAGIC, geo.slots, geo.data_bytes, 0, 0), 0)
@@ -0,0 +1,239 @@
+"""Serve the local clipboard on a Unix socket so remote shells can reach it.
+
+OSC 52 can't carry more than ~75 KB and paste through it rarely works. The
+relay avoids the terminal entirely: `bin/clipboard-relay` runs on the machine
+with the real clipboard and listens on a Unix socket, `ssh -R` forwards that
+socket to the remote host, and `ccopy`/`cpaste` there find it through
+``$CLIPBOARD_RELAY_SOCK`` and talk to it directly::
+
+    clipboard-relay --socket ~/.clipboard.sock &
+    ssh -R /tmp/clip-$USER.sock:$HOME/.clipboard.sock host \\
+        -o SetEnv=CLIPBOARD_RELAY_SOCK=/tmp/clip-$USER.sock
+
+Anyone who can connect to the socket can read and set the clipboard, so the
+server creates it mode 0600 (sshd applies ``StreamLocalBindMask`` to the
+forwarded end).
+
+Wire format: a request is one op byte (``c`` copy, ``p`` paste) followed by a
+*stream*; the reply is two streams, the data and then an error message that
+is empty on success. A stream is a sequence of frames, each a 4-byte
+big-endian length and that many bytes, ended by a zero-length frame. Frames
+let either side send a payload of any size without knowing it up front, and
+neither side ever holds more than one frame of it.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+import socket
+import socketserver
+import stat
+import struct
+import subprocess
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import IO, cast
+
+logger = logging.getLogger(__name__)
+
+RELAY_SOCK_ENV_VAR = "CLIPBOARD_RELAY_SOCK"
+RELAY_TIMEOUT_SECS = 10.0  # per socket operation, not per transfer
+RELAY_CHUNK = 64 * 1024
+RELAY_MAX_FRAME = 1 << 20  # reject frames claiming more than this
+
+OP_COPY = b"c"
+OP_PASTE = b"p"
+
+_FRAME_HEADER = struct.Struct("!I")
+
+
+class RelayError(Exception):
+    """The relay could not be reached, broke the protocol, or reported failure."""
+
+
+class RelayUnreachable(RelayError):
+    """Nothing is listening on the socket; no data was sent or consumed."""
+
+
+def write_stream(wfile: io.BufferedIOBase, chunks: Iterable[bytes | memoryview]) -> None:
+    """Write `chunks` as one framed stream, at most `RELAY_CHUNK` per frame."""
+    for chunk in chunks:
+        view = memoryview(chunk)
+        for start in range(0, len(view), RELAY_CHUNK):
+            frame = view[start : start + RELAY_CHUNK]
+            wfile.write(_FRAME_HEADER.pack(len(frame)))
+            wfile.write(frame)
+    wfile.write(_FRAME_HEADER.pack(0))
+
+
+def read_stream(rfile: io.BufferedIOBase) -> Iterator[bytes]:
+    """Yield the frames of one stream; raises `RelayError` if it is cut short."""
+    while True:
+        header = rfile.read(_FRAME_HEADER.size)
+        if len(header) != _FRAME_HEADER.size:
+            raise RelayError("relay connection closed mid-stream")
+        (size,) = _FRAME_HEADER.unpack(header)
+        if size == 0:
+            return
+        if size > RELAY_MAX_FRAME:
+            raise RelayError(f"relay frame too large: {size} bytes")
+        data = rfile.read(size)
+        if len(data) != size:
+            raise RelayError("relay connection closed mid-frame")
+        yield data
+
+
+def file_chunks(
+    handle: IO[bytes] | io.BufferedIOBase, size: int = RELAY_CHUNK
+) -> Iterator[bytes]:
+    """Read `handle` to EOF in `size`-byte pieces."""
+    while chunk := handle.read(size):
+        yield chunk
+
+
+def _connect(path: str | Path) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(RELAY_TIMEOUT_SECS)
+    try:
+        sock.connect(os.fspath(path))
+    except OSError as exc:
+        sock.close()
+        raise RelayUnreachable(f"cannot reach clipboard relay at {path}: {exc}") from exc
+    return sock
+
+
+def _request(path: str | Path, op: bytes, chunks: Iterable[bytes | memoryview]) -> bytes:
+    # Connect before touching `chunks`, so that on RelayUnreachable the
+    # caller can still send the same input some other way.
+    sock = _connect(path)
+    try:
+        with sock:
+            with sock.makefile("wb") as wfile:
+                wfile.write(op)
+                write_stream(wfile, chunks)
+            sock.shutdown(socket.SHUT_WR)
+            with sock.makefile("rb") as rfile:
+                data = b"".join(read_stream(rfile))
+                error = b"".join(read_stream(rfile))
+    except OSError as exc:
+        raise RelayError(f"clipboard relay failed: {exc}") from exc
+    if error:
+        raise RelayError(error.decode("utf-8", "replace"))
+    return data
+
+
+def relay_copy(path: str | Path, chunks: Iterable[bytes | memoryview]) -> None:
+    """Set the relay's clipboard to the concatenation of `chunks`."""
+    _request(path, OP_COPY, chunks)
+
+
+def relay_paste(path: str | Path) -> bytes:
+    """Return the relay's clipboard contents."""
+    return _request(path, OP_PASTE, ())
+
+
+class _RelayHandler(socketserver.StreamRequestHandler):
+    @property
+    def relay(self) -> RelayServer:
+        return cast(RelayServer, self.server)
+
+    def handle(self) -> None:
+        op = self.rfile.read(1)
+        try:
+            if op == OP_COPY:
+                error = self._copy()
+                write_stream(self.wfile, ())
+            elif op == OP_PASTE:
+                # Drain the (empty) request stream before answering.
+                for _ in read_stream(self.rfile):
+                    pass
+                error = self._paste()
+            else:
+                logger.warning(f"ignoring relay request with op {op!r}")
+                return
+            write_stream(self.wfile, [error.encode()])
+        except (OSError, RelayError) as exc:
+            logger.warning(f"relay request failed: {exc}")
+
+    def _copy(self) -> str:
+        try:
+            proc = subprocess.Popen(self.relay.copy_cmd, stdin=subprocess.PIPE, bufsize=0)
+        except OSError as exc:
+            for _ in read_stream(self.rfile):
+                pass
+            return f"cannot run {self.relay.copy_cmd[0]}: {exc}"
+        assert proc.stdin is not None
+        broken = False
+        with proc.stdin:
+            for frame in read_stream(self.rfile):
+                if broken:
+                    continue  # keep reading so the client isn't left blocked
+                try:
+                    proc.stdin.write(frame)
+                except BrokenPipeError:
+                    broken = True
+        if proc.wait() != 0 or broken:
+            return f"{self.relay.copy_cmd[0]} failed (exit {proc.returncode})"
+        logger.info("relay copy done")
+        return ""
+
+    def _paste(self) -> str:
+        try:
+            proc = subprocess.Popen(self.relay.paste_cmd, stdout=subprocess.PIPE)
+        except OSError as exc:
+            write_stream(self.wfile, ())
+            return f"cannot run {self.relay.paste_cmd[0]}: {exc}"
+        assert proc.stdout is not None
+        with proc.stdout:
+            write_stream(self.wfile, file_chunks(proc.stdout))
+        if proc.wait() != 0:
+            return f"{self.relay.paste_cmd[0]} failed (exit {proc.returncode})"
+        logger.info("relay paste done")
+        return ""
+
+
+class RelayServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves `copy_cmd`/`paste_cmd` (native clipboard argv) on a Unix socket.
+
+    A stale socket file left by a dead server is replaced; a live one raises
+    `RelayError`. The socket is created mode 0600 and removed by
+    `server_close()`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str | Path, copy_cmd: list[str], paste_cmd: list[str]):
+        self.copy_cmd = copy_cmd
+        self.paste_cmd = paste_cmd
+        self.path = Path(path)
+        _remove_stale_socket(self.path)
+
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(os.fspath(self.path), _RelayHandler)
+        finally:
+            os.umask(old_umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(path: Path) -> None:
+    try:
+        st = path.lstat()
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise RelayError(f"{path} exists and is not a socket")
+    try:
+        _connect(path).close()
+    except RelayUnreachable:
+        path.unlink()  # nobody listening
+        return
+    raise RelayError(f"a clipboard relay is already listening on {path}")
@@ -1,8 +1,147 @@
+import json
 import os
-import subprocess
 import sys
-from dataclasses import dataclass
+import tempfile
+from collections.abc import Iterable, Mapping
+from dataclasses import asdict, dataclass, field
 from functools import lru_cache
+from pathlib import Path
+
+from _pydotlib.quantize import PALETTE_256, RGB, rgb_escape
+from _pydotlib.terminfo import Terminfo, find_terminfo, parse_terminfo
+from _pydotlib.xdg import xdg_cache_dir, xdg_runtime_dir
+
+# Keep the capability cache tiny: one entry per distinct terminal setup, and
+# only the most recently written ones.
+CAPABILITY_CACHE_MAX_ENTRIES = 16
+
+# OSC 8 hyperlinks have no terminfo capability, so support is inferred from
+# the terminal's identity (both of these are part of the cache key).
+_HYPERLINK_TERM_PROGRAMS = frozenset({"iTerm.app", "WezTerm", "vscode", "ghostty"})
+_HYPERLINK_TERMS = frozenset({"xterm-kitty", "xterm-ghostty", "wezterm", "foot", "alacritty"})
+
+
+@dataclass(frozen=True)
+class TerminalCapabilities:
+    """What the terminal named by $TERM can render."""
+
+    colors: int
+    truecolor: bool
+    hyperlinks: bool
+
+
+def detect_capabilities(
+    terminfo: Terminfo | None, env: Mapping[str, str]
+) -> TerminalCapabilities:
+    """Derive `TerminalCapabilities` from a terminfo entry and the env (pure).
+
+    COLORTERM=truecolor/24bit upgrades to truecolor even when the terminfo
+    entry predates the `RGB` capability, which is the common case.
+    """
+    truecolor = env.get("COLORTERM", "") in ("truecolor", "24bit") or (
+        terminfo is not None and terminfo.truecolor
+    )
+    colors = terminfo.colors if terminfo is not None else 0
+    return TerminalCapabilities(
+        colors=max(colors, 1 << 24) if truecolor else colors,
+        truecolor=truecolor,
+        hyperlinks=env.get("TERM_PROGRAM", "") in _HYPERLINK_TERM_PROGRAMS
+        or env.get("TERM", "") in _HYPERLINK_TERMS,
+    )
+
+
+def capability_cache_path() -> Path:
+    """Where `terminal_capabilities` caches results.
+
+    Prefers $XDG_RUNTIME_DIR (tmpfs, per-login) and falls back to the XDG cache
+    dir when there is no runtime dir.
+    """
+    base = xdg_runtime_dir() or xdg_cache_dir()
+    return base / "dotfiles" / "terminal-capabilities.json"
+
+
+def terminal_capabilities(
+    env: Mapping[str, str] | None = None, cache_path: Path | None = None
+) -> TerminalCapabilities:
+    """Capabilities for the current terminal, cached across processes.
+
+    Entries are keyed by TERM, TERM_PROGRAM, COLORTERM and the path + mtime of
+    the terminfo entry, so a hit costs one small file read and recompiling or
+    replacing the entry invalidates it automatically. Terminals with no
+    terminfo entry are not cached — there's nothing to parse for them anyway.
+    The cache is best-effort: unreadable or unwritable files are ignored.
+    """
+    if env is None:
+        env = os.environ
+    path = find_terminfo(env.get("TERM", ""), env)
+    if path is None:
+        return detect_capabilities(None, env)
+
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
+        return detect_capabilities(None, env)
+
+    key = "|".join(
+        [
+            env.get("TERM", ""),
+            env.get("TERM_PROGRAM", ""),
+            env.get("COLORTERM", ""),
+            str(path),
+            str(mtime_ns),
+        ]
+    )
+    if cache_path is None:
+        cache_path = capability_cache_path()
+
+    entries = _read_capability_cache(cache_path)
+    cached = entries.get(key)
+    if isinstance(cached, dict):
+        try:
+            return TerminalCapabilities(**cached)
+        except TypeError:
+            pass  # Written by an older/newer version; recompute below.
+
+    try:
+        terminfo: Terminfo | None = parse_terminfo(path.read_bytes())
+    except (OSError, ValueError):
+        terminfo = None
+    caps = detect_capabilities(terminfo, env)
+
+    entries.pop(key, None)
+    entries[key] = asdict(caps)
+    _write_capability_cache(cache_path, entries)
+    return caps
+
+
+def _read_capability_cache(cache_path: Path) -> dict[str, object]:
+    try:
+        entries = json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return entries if isinstance(entries, dict) else {}
+
+
+def _write_capability_cache(cache_path: Path, entries: dict[str, object]) -> None:
+    # dicts keep insertion order, so the oldest entries are at the front.
+    while len(entries) > CAPABILITY_CACHE_MAX_ENTRIES:
+        del entries[next(iter(entries))]
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            mode="w", delete=False, dir=cache_path.parent, encoding="utf-8"
+        ) as temp_file:
+            temp_file.write(json.dumps(entries))
+    except OSError:
+        return
+
+    try:
+        os.replace(temp_file.name, cache_path)
+    except OSError:
+        try:
+            os.remove(temp_file.name)
+        except OSError:
+            pass
 
 
 @lru_cache(maxsize=1)
@@ -11,8 +150,10 @@ def should_use_colors() -> bool:
 
     Honors the standard environment knobs in priority order: NO_COLOR and
     CLICOLOR=0 force off; CLICOLOR=1, CLICOLOR_FORCE, and FORCE_COLOR force
-    on; otherwise, color is enabled only if stdout is a tty AND `tput colors`
-    reports >= 8.  Result is cached for the lifetime of the process.
+    on; otherwise, color is enabled only if stdout is a tty AND the terminal
+    supports >= 8 colors per `terminal_capabilities()` (no `tput` fork, and
+    usually a single cache-file read).  Result is cached for the lifetime of
+    the process.
     """
     if os.getenv("NO_COLOR") or os.getenv("CLICOLOR") == "0":
         return False
@@ -23,11 +164,7 @@ def should_use_colors() -> bool:
     ):
         return True
     elif sys.stdout.isatty():
-        try:
-            colors_supported = subprocess.check_output(["tput", "colors"]).decode()
-            return int(colors_supported) >= 8
-        except (ValueError, FileNotFoundError, subprocess.CalledProcessError):
-            return False
+        return terminal_capabilities().colors >= 8
     else:
         return False
 
@@ -141,3 +278,243 @@ def _get_colors() -> ColorCodes:
 
 
 Colors: ColorCodes = _get_colors()
+
+
+# --- compiled styles ---------------------------------------------------------
+
+# Names accepted for `Style.fg`/`Style.bg`, mapped to ANSI palette indices.
+ANSI_COLOR_NAMES = {
+    name: index
+    for index, name in enumerate(
+        [
+            "black", "red", "green", "yellow", "blue", "magenta", "cyan", "white",
+            "bright_black", "bright_red", "bright_green", "bright_yellow",
+            "bright_blue", "bright_magenta", "bright_cyan", "bright_white",
+        ]
+    )
+}
+ANSI_COLOR_NAMES["gray"] = ANSI_COLOR_NAMES["bright_black"]
+
+# A palette index (0-255), an ANSI color name, or a 24-bit RGB triple.
+Color = int | str | RGB
+
+# (attribute, SGR on, SGR off). Bold and dim share their "off" code.
+_ATTRIBUTES = (
+    ("bold", 1, 22),
+    ("dim", 2, 22),
+    ("italic", 3, 23),
+    ("underline", 4, 24),
+    ("inverse", 7, 27),
+    ("hidden", 8, 28),
+    ("strike", 9, 29),
+)
+
+
+@dataclass(frozen=True)
+class Style:
+    """A combination of text attributes and colors.
+
+    Styles are plain immutable values: hashable, comparable, and combinable
+    with `+` (attributes combine; the right-hand side's colors win). Rendering
+    is done by a `StyleRenderer`, which compiles each style to SGR once.
+    """
+
+    fg: Color | None = None
+    bg: Color | None = None
+    bold: bool = False
+    dim: bool = False
+    italic: bool = False
+    underline: bool = False
+    inverse: bool = False
+    hidden: bool = False
+    strike: bool = False
+    # Styles are dict keys for the transition cache; hash the fields only once.
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        attributes = tuple(getattr(self, name) for name, _, _ in _ATTRIBUTES)
+        object.__setattr__(self, "_hash", hash((self.fg, self.bg, attributes)))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __add__(self, other: "Style") -> "Style":
+        return Style(
+            fg=other.fg if other.fg is not None else self.fg,
+            bg=other.bg if other.bg is not None else self.bg,
+            **{
+                name: getattr(self, name) or getattr(other, name)
+                for name, _, _ in _ATTRIBUTES
+            },
+        )
+
+
+PLAIN = Style()
+
+# One piece of output text and the style it's drawn in (None = plain).
+Span = tuple[Style | None, str]
+
+
+# Most entries each of StyleRenderer's caches holds before it is dropped.
+TRANSITION_CACHE_MAX_ENTRIES = 256
+
+
+class StyleRenderer:
+    """Renders styled spans to text with the fewest escape sequences.
+
+    Each style's parameters, and each (previous style, next style) transition,
+    are computed once and cached (up to `TRANSITION_CACHE_MAX_ENTRIES` of each,
+    so a gradient of fresh colors can't grow them forever). Adjacent spans with the same style are
+    merged, and moving between styles emits only what changed (e.g. `22` to
+    drop bold, `39` to reset the foreground) unless a full reset is shorter.
+    Output always ends in the default style.
+
+    When colors are disabled `render` is a plain `"".join` of the text.
+    """
+
+    def __init__(self, enabled: bool | None = None, colors: int | None = None) -> None:
+        """
+        Args:
+            enabled: Whether to emit escapes at all (default: `should_use_colors()`).
+            colors: Color depth used to degrade RGB and 256-color styles (default:
+                the terminal's, or 256 if color is forced onto an unknown
+                terminal).
+        """
+        self.enabled = should_use_colors() if enabled is None else enabled
+        if colors is None:
+            colors = terminal_capabilities().colors if self.enabled else 0
+            if self.enabled and colors < 8:
+                colors = 256
+        self.colors = colors
+        self._params: dict[Style, tuple[str, ...]] = {}
+        self._transitions: dict[tuple[Style, Style], str] = {}
+        # Same cache keyed by object identity: callers reuse a handful of style
+        # objects, and int-pair lookups skip hashing/comparing the dataclass.
+        # Callers that build a fresh Style per span would churn it, so like the
+        # others it is dropped whenever it fills up.
+        self._transitions_by_identity: dict[tuple[int, int], tuple[str, Style, Style]] = {}
+
+    def sgr(self, style: Style | None) -> str:
+        """The full escape sequence that selects `style` from any state."""
+        if not self.enabled:
+            return ""
+        return self.transition(None, style) if style is not None else "\033[0m"
+
+    def transition(self, prev: Style | None, style: Style | None) -> str:
+        """The shortest escape sequence that moves from `prev` to `style`."""
+        if not self.enabled:
+            return ""
+        prev = prev or PLAIN
+        style = style or PLAIN
+        key = (prev, style)
+        cached = self._transitions.get(key)
+        if cached is None:
+            if len(self._transitions) >= TRANSITION_CACHE_MAX_ENTRIES:
+                self._transitions.clear()
+            cached = self._transitions[key] = self._compile_transition(prev, style)
+        return cached
+
+    def render(self, spans: Iterable[Span]) -> str:
+        """Render `spans` to one string, ending in the default style."""
+        if not self.enabled:
+            return "".join(text for _, text in spans)
+
+        out: list[str] = []
+        by_identity = self._transitions_by_identity
+        current = PLAIN
+        for style, text in spans:
+            if not text:
+                continue
+            if style is None:
+                style = PLAIN
+            if style is not current:
+                cached = by_identity.get((id(current), id(style)))
+                if cached is None:
+                    if len(by_identity) >= TRANSITION_CACHE_MAX_ENTRIES:
+                        by_identity.clear()
+                    # Holding both styles keeps their ids from being reused.
+                    cached = (self.transition(current, style), current, style)
+                    by_identity[(id(current), id(style))] = cached
+                if cached[0]:
+                    out.append(cached[0])
+                current = style
+            out.append(text)
+        if current != PLAIN:
+            out.append(self.transition(current, PLAIN))
+        return "".join(out)
+
+    def style(self, text: str, style: Style | None) -> str:
+        """Render a single span."""
+        if not self.enabled:
+            return text
+        return self.render(((style, text),))
+
+    def _compile_transition(self, prev: Style, style: Style) -> str:
+        if style == prev:
+            return ""
+        if style == PLAIN:
+            return "\033[0m"
+        full = ("0", *self._style_params(style))
+        if prev == PLAIN:
+            return f"\033[{';'.join(full[1:])}m"
+
+        delta: list[str] = []
+        for name, _, off in _ATTRIBUTES:
+            if getattr(prev, name) and not getattr(style, name) and str(off) not in delta:
+                delta.append(str(off))
+        # `22` turns off bold *and* dim; turn back on whichever should stay.
+        cleared_intensity = "22" in delta
+        for name, on, _ in _ATTRIBUTES:
+            if not getattr(style, name):
+                continue
+            if not getattr(prev, name) or (cleared_intensity and name in ("bold", "dim")):
+                delta.append(str(on))
+        if style.fg != prev.fg:
+            delta.append(self._color_param(style.fg, background=False) or "39")
+        if style.bg != prev.bg:
+            delta.append(self._color_param(style.bg, background=True) or "49")
+
+        params = delta if len(";".join(delta)) <= len(";".join(full)) else list(full)
+        return f"\033[{';'.join(params)}m" if params else ""
+
+    def _style_params(self, style: Style) -> tuple[str, ...]:
+        params = self._params.get(style)
+        if params is None:
+            built = [str(on) for name, on, _ in _ATTRIBUTES if getattr(style, name)]
+            for color, background in ((style.fg, False), (style.bg, True)):
+                param = self._color_param(color, background=background)
+                if param:
+                    built.append(param)
+            if len(self._params) >= TRANSITION_CACHE_MAX_ENTRIES:
+                self._params.clear()
+            params = self._params[style] = tuple(built)
+        return params
+
+    def _color_param(self, color: Color | None, *, background: bool) -> str:
+        """SGR parameter(s) for `color`, degraded to the renderer's depth."""
+        if color is None:
+            return ""
+        if isinstance(color, str):
+            try:
+                color = ANSI_COLOR_NAMES[color]
+            except KeyError:
+                raise ValueError(f"unknown color name {color!r}") from None
+        if isinstance(color, int):
+            if not 0 <= color <= 255:
+                raise ValueError(f"palette index out of range: {color}")
+            if color < 8:
+                return str((40 if background else 30) + color)
+            if color < 16:
+                return str((100 if background else 90) + color - 8)
+            if self.colors >= 256:
+                return f"{48 if background else 38};5;{color}"
+            # A 256-color index on a 16-color terminal: degrade via its RGB.
+            color = PALETTE_256[color]
+        escape = rgb_escape(color, self.colors, background=background)
+        return escape[2:-1]  # strip the CSI and final "m"
+
+
+@lru_cache(maxsize=1)
+def default_renderer() -> StyleRenderer:
+    """A `StyleRenderer` for stdout, configured once per process."""
+    return StyleRenderer()
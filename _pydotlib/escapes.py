@@ -0,0 +1,216 @@
+"""Incremental parser for the escape sequences terminals send back as replies.
+
+Query replies arrive on the tty as CSI (`ESC [ ... final`), OSC
+(`ESC ] ... BEL|ST`) or DCS (`ESC P ... ST`) sequences, possibly split
+across reads and mixed with whatever the user typed meanwhile.
+`ReplyParser.feed()` consumes each chunk once and keeps its state (including
+an `ESC` that might be the first half of an `ST`) across chunk boundaries, so
+parsing N bytes costs O(N) however they are split. Bytes outside a sequence
+are skipped with `bytes.find`, and string bodies are copied once, in slices,
+rather than byte by byte.
+
+OSC 52 (clipboard) replies can be up to a megabyte of base64; their payload
+is decoded as it streams in, so the encoded text is never buffered whole.
+Malformed base64 yields a reply whose `payload` is None.
+
+Only 7-bit sequences are recognized; 8-bit C1 controls are treated as plain
+bytes since they collide with UTF-8 text.
+"""
+
+from __future__ import annotations
+
+import binascii
+from dataclasses import dataclass
+
+ESC = 0x1B
+BEL = 0x07
+_ST_FINAL = 0x5C  # "\" — ESC \ is the String Terminator
+
+KIND_CSI = "csi"
+KIND_OSC = "osc"
+KIND_DCS = "dcs"
+
+# Default bound on one OSC/DCS string; longer strings are dropped.
+MAX_STRING_BYTES = 1 << 20  # 1 MiB
+# CSI replies are a few dozen bytes; anything longer is garbage.
+MAX_CSI_BYTES = 256
+
+_GROUND, _ESCAPE, _CSI, _STRING, _STRING_ESCAPE = range(5)
+
+_INTRODUCERS = {ord("["): KIND_CSI, ord("]"): KIND_OSC, ord("P"): KIND_DCS}
+
+
+@dataclass(frozen=True)
+class Reply:
+    """One complete sequence from the terminal.
+
+    `data` is the sequence body: the parameter and intermediate bytes of a
+    CSI (with the final byte in `final`), or the string of an OSC/DCS
+    without its terminator. For OSC 52, `data` is only the `52;<selection>;`
+    prefix and `payload` holds the decoded clipboard bytes (None if the
+    base64 was malformed).
+    """
+
+    kind: str
+    data: bytes
+    final: bytes = b""
+    payload: bytes | None = None
+
+    @property
+    def osc_command(self) -> int | None:
+        """The numeric command of an OSC reply (e.g. 11 for `ESC]11;...`)."""
+        if self.kind != KIND_OSC:
+            return None
+        head = self.data.split(b";", 1)[0]
+        return int(head) if head.isdigit() else None
+
+
+class _Base64Decoder:
+    """Decodes base64 incrementally, 4-character groups at a time."""
+
+    def __init__(self) -> None:
+        self.out = bytearray()
+        self.valid = True
+        self._pending = b""
+
+    def feed(self, text: bytes) -> None:
+        if not self.valid:
+            return
+        text = self._pending + text
+        usable = len(text) - len(text) % 4
+        self._pending = text[usable:]
+        if usable:
+            try:
+                self.out += binascii.a2b_base64(text[:usable], strict_mode=True)
+            except binascii.Error:
+                self.valid = False
+
+    def finish(self) -> bytes | None:
+        if not self.valid or self._pending:
+            return None
+        return bytes(self.out)
+
+
+class ReplyParser:
+    """Resumable state machine turning tty input chunks into `Reply`s."""
+
+    def __init__(self, max_string_bytes: int = MAX_STRING_BYTES) -> None:
+        self.max_string_bytes = max_string_bytes
+        self._state = _GROUND
+        self._kind = ""
+        self._body = bytearray()
+        self._string_len = 0
+        self._overflow = False
+        self._decoder: _Base64Decoder | None = None
+
+    def feed(self, chunk: bytes) -> list[Reply]:
+        """Consume `chunk` and return the sequences it completed."""
+        replies: list[Reply] = []
+        pos, end = 0, len(chunk)
+        while pos < end:
+            state = self._state
+            if state == _GROUND:
+                pos = chunk.find(b"\x1b", pos)
+                if pos < 0:
+                    break
+                self._state = _ESCAPE
+                pos += 1
+            elif state == _ESCAPE:
+                self._begin(chunk[pos])
+                pos += 1
+            elif state == _CSI:
+                pos = self._feed_csi(chunk, pos, replies)
+            elif state == _STRING:
+                pos = self._feed_string(chunk, pos, replies)
+            else:  # _STRING_ESCAPE: saw ESC inside a string.
+                if chunk[pos] == _ST_FINAL:
+                    self._finish_string(replies)
+                    pos += 1
+                else:
+                    # ESC + anything else aborts the string and starts a
+                    # new sequence (ECMA-48); reprocess this byte as such.
+                    self._reset()
+                    self._state = _ESCAPE
+        return replies
+
+    def _reset(self) -> None:
+        self._state = _GROUND
+        self._body = bytearray()
+        self._string_len = 0
+        self._overflow = False
+        self._decoder = None
+
+    def _begin(self, introducer: int) -> None:
+        kind = _INTRODUCERS.get(introducer)
+        if kind is None:
+            # A two-byte escape or stray ST; nothing we report.
+            self._state = _GROUND
+            return
+        self._kind = kind
+        self._state = _CSI if kind == KIND_CSI else _STRING
+
+    def _feed_csi(self, chunk: bytes, pos: int, replies: list[Reply]) -> int:
+        for index in range(pos, len(chunk)):
+            byte = chunk[index]
+            if 0x40 <= byte <= 0x7E:
+                replies.append(Reply(KIND_CSI, bytes(self._body), bytes([byte])))
+                self._reset()
+                return index + 1
+            if byte == ESC or not 0x20 <= byte <= 0x3F:
+                # Not a valid CSI byte: drop the sequence. ESC may start the
+                # next one, so leave it to the ground state.
+                self._reset()
+                return index
+            self._body.append(byte)
+            if len(self._body) > MAX_CSI_BYTES:
+                self._reset()
+                return index + 1
+        return len(chunk)
+
+    def _feed_string(self, chunk: bytes, pos: int, replies: list[Reply]) -> int:
+        stop = chunk.find(b"\x1b", pos)
+        if self._kind == KIND_OSC:
+            bel = chunk.find(b"\x07", pos, stop if stop >= 0 else len(chunk))
+            if bel >= 0:
+                self._append(chunk[pos:bel])
+                self._finish_string(replies)
+                return bel + 1
+        if stop < 0:
+            self._append(chunk[pos:])
+            return len(chunk)
+        self._append(chunk[pos:stop])
+        self._state = _STRING_ESCAPE
+        return stop + 1
+
+    def _append(self, segment: bytes) -> None:
+        if not segment or self._overflow:
+            return
+        self._string_len += len(segment)
+        if self._string_len > self.max_string_bytes:
+            self._overflow = True
+            self._body = bytearray()
+            self._decoder = None
+            return
+        if self._decoder is not None:
+            self._decoder.feed(segment)
+            return
+
+        self._body += segment
+        if self._kind == KIND_OSC and self._body.startswith(b"52;"):
+            # `52;<selection>;<base64>`: stream the base64 from here on.
+            split = self._body.find(b";", 3)
+            if split >= 0:
+                self._decoder = _Base64Decoder()
+                self._decoder.feed(bytes(self._body[split + 1 :]))
+                del self._body[split + 1 :]
+
+    def _finish_string(self, replies: list[Reply]) -> None:
+        if not self._overflow:
+            payload = self._decoder.finish() if self._decoder is not None else None
+            replies.append(Reply(self._kind, bytes(self._body), payload=payload))
+        self._reset()
+
+
+def parse_replies(data: bytes) -> list[Reply]:
+    """All complete sequences in `data` (convenience for one-shot input)."""
+    return ReplyParser().feed(data)
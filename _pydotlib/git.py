@@ -1,9 +1,14 @@
 import os
+import queue
 import re
 import subprocess
 import tempfile
-from collections.abc import Mapping
+import threading
+from collections.abc import Iterable, Mapping
+from concurrent.futures import Future
+from dataclasses import dataclass
 from pathlib import Path
+from typing import IO, Self
 
 
 def get_repo_root(path: Path) -> Path | None:
@@ -152,3 +157,242 @@ def update_git_config_file(path: Path, keys: Mapping[str, str | None]) -> None:
         except OSError:
             pass
         raise
+
+
+@dataclass(frozen=True)
+class GitObject:
+    """One object resolved by `git cat-file`.
+
+    `data` holds the raw object content for `GitBatch.read` lookups and is
+    `None` for header-only `GitBatch.info` lookups.
+    """
+
+    oid: str
+    type: str
+    size: int
+    data: bytes | None = None
+
+
+# Requests drained from the queue and written to git in one go. git only reads
+# stdin as fast as we consume its stdout, so the pipelined requests must fit in
+# the stdin pipe buffer (64 KiB on Linux, 16 KiB on older macOS) or the write
+# could block while git is blocked writing a reply we haven't read yet.
+_PIPELINE_MAX_REQUESTS = 128
+_PIPELINE_MAX_BYTES = 8 * 1024
+
+# How long `close()` waits for a cat-file process to exit after its stdin is
+# closed before killing it.
+_SHUTDOWN_TIMEOUT_SECS = 5
+
+
+class _CatFileWorker:
+    """A single long-lived `git cat-file --batch[-check]` process.
+
+    Requests are queued by any thread and served in FIFO order by a dedicated
+    reader thread, which drains whatever is queued, writes it to git's stdin in
+    one pipelined write, then reads the replies back in order.
+    """
+
+    def __init__(self, repo: Path, with_content: bool) -> None:
+        self.repo = repo
+        self.with_content = with_content
+        mode = "--batch" if with_content else "--batch-check"
+        try:
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", mode],
+                cwd=repo,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError as e:
+            raise RuntimeError("`git` is not installed or not on PATH") from e
+
+        self._requests: queue.SimpleQueue[tuple[bytes, Future[GitObject | None]] | None] = (
+            queue.SimpleQueue()
+        )
+        # Guards the submit/shutdown race: once `_stopped` is set nothing new
+        # is queued, so every accepted future is guaranteed to be resolved.
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._serve, name=f"git cat-file {mode} ({repo})", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def alive(self) -> bool:
+        return not self._stopped
+
+    def submit(self, rev: str) -> "Future[GitObject | None]":
+        if "\n" in rev:
+            raise ValueError(f"object name may not contain a newline: {rev!r}")
+        future: Future[GitObject | None] = Future()
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError(f"git cat-file for {self.repo} is shut down")
+            self._requests.put((rev.encode() + b"\n", future))
+        return future
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._stopped:
+                self._stopped = True
+                self._requests.put(None)
+        self._thread.join()
+
+    def _serve(self) -> None:
+        assert self._proc.stdin is not None and self._proc.stdout is not None
+        stdin, stdout = self._proc.stdin, self._proc.stdout
+        error: BaseException | None = None
+        stopping = False
+
+        while not stopping:
+            item = self._requests.get()
+            if item is None:
+                break
+            batch = [item]
+            pending_bytes = len(item[0])
+            while (
+                len(batch) < _PIPELINE_MAX_REQUESTS
+                and pending_bytes < _PIPELINE_MAX_BYTES
+            ):
+                try:
+                    item = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                pending_bytes += len(item[0])
+
+            try:
+                stdin.write(b"".join(request for request, _ in batch))
+                stdin.flush()
+                for _, future in batch:
+                    future.set_result(self._read_reply(stdout))
+            except (OSError, ValueError, RuntimeError) as e:
+                error = e
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(_worker_error(self.repo, e))
+                break
+
+        with self._lock:
+            self._stopped = True
+        # Fail anything still queued so no caller waits forever.
+        while True:
+            try:
+                item = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[1].set_exception(
+                    _worker_error(self.repo, error)
+                    if error is not None
+                    else RuntimeError(f"git cat-file for {self.repo} is shut down")
+                )
+
+        try:
+            stdin.close()
+        except OSError:
+            pass
+        try:
+            self._proc.wait(timeout=_SHUTDOWN_TIMEOUT_SECS)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+        stdout.close()
+
+    def _read_reply(self, stdout: IO[bytes]) -> GitObject | None:
+        header = stdout.readline()
+        if not header.endswith(b"\n"):
+            raise RuntimeError("git cat-file exited unexpectedly")
+        fields = header.decode(errors="replace").split()
+        # "<name> missing" / "<name> ambiguous" — the name itself may contain
+        # spaces, so only the last field is meaningful.
+        if fields and fields[-1] in ("missing", "ambiguous"):
+            return None
+        if len(fields) != 3:
+            raise RuntimeError(f"unexpected git cat-file header: {header!r}")
+        oid, obj_type, size_text = fields
+        size = int(size_text)
+        if not self.with_content:
+            return GitObject(oid, obj_type, size)
+
+        data = stdout.read(size + 1)  # content + trailing LF
+        if len(data) != size + 1:
+            raise RuntimeError("git cat-file exited unexpectedly")
+        return GitObject(oid, obj_type, size, data[:-1])
+
+
+def _worker_error(repo: Path, cause: BaseException | None) -> RuntimeError:
+    error = RuntimeError(f"git cat-file for {repo} failed: {cause}")
+    error.__cause__ = cause
+    return error
+
+
+class GitBatch:
+    """Object lookups served by long-lived `git cat-file` processes.
+
+    Spawning `git` per lookup costs a fork+exec each; `GitBatch` instead keeps
+    one `git cat-file --batch` (content) and one `--batch-check` (header only)
+    process per repository, started on first use, and multiplexes every query
+    over their pipes. It is safe to share across threads: requests go through a
+    per-process queue and are answered in order.
+
+    Lookups return `None` for missing or ambiguous names.  A process that dies
+    fails its pending lookups with `RuntimeError` and is transparently replaced
+    on the next query.  Use as a context manager, or call `close()`, to shut the
+    processes down.
+    """
+
+    def __init__(self) -> None:
+        self._workers: dict[tuple[Path, bool], _CatFileWorker] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def info(self, repo: Path, rev: str) -> GitObject | None:
+        """Return the type and size of `rev` in `repo` (no content)."""
+        return self._worker(repo, with_content=False).submit(rev).result()
+
+    def read(self, repo: Path, rev: str) -> GitObject | None:
+        """Return the type, size and content of `rev` in `repo`."""
+        return self._worker(repo, with_content=True).submit(rev).result()
+
+    def info_many(self, repo: Path, revs: Iterable[str]) -> list[GitObject | None]:
+        """`info` for many names at once, pipelined; results follow `revs` order."""
+        worker = self._worker(repo, with_content=False)
+        return [future.result() for future in [worker.submit(rev) for rev in revs]]
+
+    def read_many(self, repo: Path, revs: Iterable[str]) -> list[GitObject | None]:
+        """`read` for many names at once, pipelined; results follow `revs` order."""
+        worker = self._worker(repo, with_content=True)
+        return [future.result() for future in [worker.submit(rev) for rev in revs]]
+
+    def close(self) -> None:
+        """Shut down every cat-file process.  Idempotent."""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.close()
+
+    def _worker(self, repo: Path, with_content: bool) -> _CatFileWorker:
+        key = (Path(repo).resolve(), with_content)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("GitBatch is closed")
+            worker = self._workers.get(key)
+            if worker is None or not worker.alive:
+                worker = _CatFileWorker(key[0], with_content)
+                self._workers[key] = worker
+            return worker
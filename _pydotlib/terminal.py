@@ -0,0 +1,251 @@
+"""Ask the terminal what it supports instead of guessing from the environment.
+
+`probe()` puts /dev/tty into raw mode once, writes every query in a single
+`write()`, and reads the replies within one timeout. The last query is
+Primary Device Attributes (DA1), which every terminal answers, and answers in
+order: once its reply arrives every earlier query has either been answered
+or is unsupported, so a capable terminal costs one round-trip rather than
+one timeout per query.
+
+Queries sent (see https://invisible-island.net/xterm/ctlseqs/ctlseqs.html):
+
+- XTVERSION (`CSI > q`): terminal name and version.
+- XTGETTCAP (`DCS + q <hex> ST`): terminfo capabilities as the terminal
+  itself sees them, e.g. `RGB`, `Ms` (clipboard) and `Smulx` (styled
+  underlines).
+- OSC 10/11: default foreground/background colors.
+- DECRQSS: the cursor style, and the SGR state right after setting a 24-bit
+  color, which shows whether truecolor is really supported.
+- DA1 (`CSI c`): the sentinel; its attributes include 4 (sixel) and 52
+  (OSC 52 clipboard) on terminals that advertise them.
+
+Inside tmux or screen the multiplexer answers for itself, not for the
+terminal outside it.
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import time
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+
+from _pydotlib.escapes import KIND_CSI, KIND_DCS, KIND_OSC, Reply, ReplyParser
+from _pydotlib.quantize import RGB
+
+DEFAULT_PROBE_TIMEOUT = 0.5  # seconds; generous for a local terminal
+DEFAULT_CAPABILITIES = ("TN", "Co", "RGB", "Ms", "Smulx")
+
+DA1 = b"\x1b[c"
+XTVERSION = b"\x1b[>0q"
+OSC_FOREGROUND = b"\x1b]10;?\x1b\\"
+OSC_BACKGROUND = b"\x1b]11;?\x1b\\"
+DECRQSS_SGR = b"\x1bP$qm\x1b\\"
+DECRQSS_CURSOR_STYLE = b"\x1bP$q q\x1b\\"
+
+# Set an unusual 24-bit foreground, ask for the SGR state, then reset. A
+# terminal that quantizes to its palette reports a different color.
+_TRUECOLOR_PROBE = b"\x1b[38;2;1;2;3m" + DECRQSS_SGR + b"\x1b[0m"
+_TRUECOLOR_PARAMS = ("38;2;1;2;3", "38;2;;1;2;3")
+
+DA1_SIXEL = 4
+DA1_CLIPBOARD = 52
+
+
+@dataclass(frozen=True)
+class TerminalReport:
+    """What the terminal said about itself.
+
+    `responded` is False when not even DA1 came back within the timeout; the
+    other fields are then whatever partial replies did arrive. Fields stay
+    None (or empty) for queries the terminal ignored.
+    """
+
+    responded: bool
+    attributes: tuple[int, ...] = ()
+    version: str | None = None
+    capabilities: Mapping[str, str] = field(default_factory=dict)
+    foreground: RGB | None = None
+    background: RGB | None = None
+    cursor_style: int | None = None
+    truecolor: bool | None = None
+    elapsed: float = 0.0
+
+    @property
+    def dark_background(self) -> bool | None:
+        """Whether the default background is dark, if it was reported."""
+        if self.background is None:
+            return None
+        r, g, b = self.background
+        return 0.2126 * r + 0.7152 * g + 0.0722 * b < 128
+
+    @property
+    def clipboard(self) -> bool:
+        """Whether the terminal advertises OSC 52 clipboard support."""
+        return "Ms" in self.capabilities or DA1_CLIPBOARD in self.attributes
+
+    @property
+    def sixel(self) -> bool:
+        return DA1_SIXEL in self.attributes
+
+
+def build_query(capabilities: Iterable[str] = DEFAULT_CAPABILITIES) -> bytes:
+    """All queries as one write, ending with the DA1 sentinel."""
+    tcap = b"".join(
+        b"\x1bP+q" + name.encode().hex().upper().encode() + b"\x1b\\"
+        for name in capabilities
+    )
+    return (
+        _TRUECOLOR_PROBE
+        + XTVERSION
+        + tcap
+        + OSC_FOREGROUND
+        + OSC_BACKGROUND
+        + DECRQSS_CURSOR_STYLE
+        + DA1
+    )
+
+
+def _is_da1(reply: Reply) -> bool:
+    return reply.kind == KIND_CSI and reply.final == b"c" and reply.data[:1] == b"?"
+
+
+def parse_color(spec: str) -> RGB | None:
+    """Parse an X11 `rgb:R/G/B` color (1-4 hex digits per channel) to 8 bits."""
+    if not spec.startswith("rgb:"):
+        return None
+    parts = spec[4:].split("/")
+    if len(parts) != 3:
+        return None
+    channels = []
+    for part in parts:
+        if not 1 <= len(part) <= 4:
+            return None
+        try:
+            value = int(part, 16)
+        except ValueError:
+            return None
+        channels.append(value * 255 // (16 ** len(part) - 1))
+    return (channels[0], channels[1], channels[2])
+
+
+def _parse_tcap(body: str, capabilities: dict[str, str]) -> None:
+    # `1+r<hex name>=<hex value>` per capability, `;`-separated by some
+    # terminals; boolean capabilities may omit the value.
+    for item in body.split(";"):
+        name_hex, _, value_hex = item.partition("=")
+        try:
+            name = bytes.fromhex(name_hex).decode()
+            capabilities[name] = bytes.fromhex(value_hex).decode()
+        except (ValueError, UnicodeDecodeError):
+            continue
+
+
+def parse_report(replies: Iterable[Reply], *, elapsed: float = 0.0) -> TerminalReport:
+    """Build a report from the replies to `build_query()` (pure)."""
+    responded = False
+    attributes: tuple[int, ...] = ()
+    version = None
+    capabilities: dict[str, str] = {}
+    colors: dict[int, RGB | None] = {}
+    cursor_style = None
+    truecolor = None
+
+    for reply in replies:
+        text = reply.data.decode("utf-8", "replace")
+        if _is_da1(reply):
+            responded = True
+            attributes = tuple(int(p) for p in text[1:].split(";") if p.isdigit())
+        elif reply.kind == KIND_OSC and reply.osc_command in (10, 11):
+            colors[reply.osc_command] = parse_color(text.split(";", 1)[-1])
+        elif reply.kind != KIND_DCS:
+            continue
+        elif text.startswith(">|"):
+            version = text[2:]
+        elif text.startswith("1+r"):
+            _parse_tcap(text[3:], capabilities)
+        elif text[1:3] == "$r":
+            # DECRQSS: `1$r<setting>` when valid. Older xterms swapped 0
+            # and 1, so go by the setting rather than the flag.
+            setting = text[3:]
+            if setting.endswith(" q") and setting[:-2].isdigit():
+                cursor_style = int(setting[:-2])
+            elif setting.endswith("m"):
+                sgr = setting[:-1].replace(":", ";")
+                truecolor = any(p in sgr for p in _TRUECOLOR_PARAMS)
+
+    return TerminalReport(
+        responded=responded,
+        attributes=attributes,
+        version=version,
+        capabilities=capabilities,
+        foreground=colors.get(10),
+        background=colors.get(11),
+        cursor_style=cursor_style,
+        truecolor=truecolor,
+        elapsed=elapsed,
+    )
+
+
+def _open_tty_rw_fd() -> int:
+    """Open /dev/tty read-write and return the raw fd."""
+    return os.open("/dev/tty", os.O_RDWR | os.O_NOCTTY)
+
+
+def probe(
+    timeout: float = DEFAULT_PROBE_TIMEOUT,
+    *,
+    capabilities: Iterable[str] = DEFAULT_CAPABILITIES,
+    tty_fd_opener: Callable[[], int] = _open_tty_rw_fd,
+) -> TerminalReport | None:
+    """Query the controlling terminal; None if there isn't one.
+
+    The tty is in raw/no-echo mode only for the duration of the probe and is
+    restored on every exit path. Reading stops at the DA1 reply or the
+    timeout, whichever comes first.
+    """
+    import termios
+    import tty as tty_mod
+
+    try:
+        fd = tty_fd_opener()
+    except OSError:
+        return None
+
+    saved = None
+    try:
+        try:
+            saved = termios.tcgetattr(fd)
+        except termios.error:
+            return None
+        tty_mod.setraw(fd)
+
+        start = time.monotonic()
+        deadline = start + timeout
+        os.write(fd, build_query(capabilities))
+
+        parser = ReplyParser()
+        replies: list[Reply] = []
+        while not any(_is_da1(r) for r in replies):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                break
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                break
+            replies += parser.feed(chunk)
+        return parse_report(replies, elapsed=time.monotonic() - start)
+    finally:
+        if saved is not None:
+            try:
+                termios.tcsetattr(fd, termios.TCSANOW, saved)
+            except termios.error:
+                pass
+        try:
+            os.close(fd)
+        except OSError:
+            pass
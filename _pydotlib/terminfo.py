@@ -0,0 +1,323 @@
+"""Pure-Python reader for compiled terminfo entries.
+
+Answers capability queries (``colors``, the ``RGB``/``Tc`` truecolor flags,
+escape strings, ...) by parsing the compiled entry that ``tic`` writes, instead
+of forking ``tput`` or linking curses. Both the legacy format (16-bit numbers)
+and the ncurses 6.1+ extended-number format (32-bit numbers) are supported,
+including the user-defined (extended) capability section where ``RGB`` and
+``Tc`` live. See term(5).
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+# Magic numbers from term(5): 0432 for 16-bit numbers, 01036 for 32-bit.
+MAGIC_LEGACY = 0o432
+MAGIC_32BIT = 0o1036
+
+# Searched after $TERMINFO, ~/.terminfo and $TERMINFO_DIRS. ncurses compiles
+# its own default list in; this is the union of the usual distro, macOS and
+# Homebrew locations.
+SYSTEM_TERMINFO_DIRS = (
+    "/etc/terminfo",
+    "/lib/terminfo",
+    "/usr/share/terminfo",
+    "/usr/lib/terminfo",
+    "/usr/local/share/terminfo",
+    "/opt/homebrew/share/terminfo",
+)
+
+# Predefined capability names in compiled-entry order (ncurses `boolnames`,
+# `numnames` and `strnames`). Entries only store the values positionally.
+BOOLEAN_NAMES = (
+    "bw", "am", "xsb", "xhp", "xenl", "eo", "gn", "hc", "km", "hs", "in", "da", "db",
+    "mir", "msgr", "os", "eslok", "xt", "hz", "ul", "xon", "nxon", "mc5i", "chts",
+    "nrrmc", "npc", "ndscr", "ccc", "bce", "hls", "xhpa", "crxm", "daisy", "xvpa",
+    "sam", "cpix", "lpix", "OTbs", "OTns", "OTnc", "OTMT", "OTNL", "OTpt", "OTxr",
+)
+
+NUMBER_NAMES = (
+    "cols", "it", "lines", "lm", "xmc", "pb", "vt", "wsl", "nlab", "lh", "lw", "ma",
+    "wnum", "colors", "pairs", "ncv", "bufsz", "spinv", "spinh", "maddr", "mjump",
+    "mcs", "mls", "npins", "orc", "orl", "orhi", "orvi", "cps", "widcs", "btns",
+    "bitwin", "bitype", "OTug", "OTdC", "OTdN", "OTdB", "OTdT", "OTkn",
+)
+
+STRING_NAMES = (
+    "cbt", "bel", "cr", "csr", "tbc", "clear", "el", "ed", "hpa", "cmdch", "cup",
+    "cud1", "home", "civis", "cub1", "mrcup", "cnorm", "cuf1", "ll", "cuu1", "cvvis",
+    "dch1", "dl1", "dsl", "hd", "smacs", "blink", "bold", "smcup", "smdc", "dim",
+    "smir", "invis", "prot", "rev", "smso", "smul", "ech", "rmacs", "sgr0", "rmcup",
+    "rmdc", "rmir", "rmso", "rmul", "flash", "ff", "fsl", "is1", "is2", "is3", "if",
+    "ich1", "il1", "ip", "kbs", "ktbc", "kclr", "kctab", "kdch1", "kdl1", "kcud1",
+    "krmir", "kel", "ked", "kf0", "kf1", "kf10", "kf2", "kf3", "kf4", "kf5", "kf6",
+    "kf7", "kf8", "kf9", "khome", "kich1", "kil1", "kcub1", "kll", "knp", "kpp",
+    "kcuf1", "kind", "kri", "khts", "kcuu1", "rmkx", "smkx", "lf0", "lf1", "lf10",
+    "lf2", "lf3", "lf4", "lf5", "lf6", "lf7", "lf8", "lf9", "rmm", "smm", "nel", "pad",
+    "dch", "dl", "cud", "ich", "indn", "il", "cub", "cuf", "rin", "cuu", "pfkey",
+    "pfloc", "pfx", "mc0", "mc4", "mc5", "rep", "rs1", "rs2", "rs3", "rf", "rc", "vpa",
+    "sc", "ind", "ri", "sgr", "hts", "wind", "ht", "tsl", "uc", "hu", "iprog", "ka1",
+    "ka3", "kb2", "kc1", "kc3", "mc5p", "rmp", "acsc", "pln", "kcbt", "smxon", "rmxon",
+    "smam", "rmam", "xonc", "xoffc", "enacs", "smln", "rmln", "kbeg", "kcan", "kclo",
+    "kcmd", "kcpy", "kcrt", "kend", "kent", "kext", "kfnd", "khlp", "kmrk", "kmsg",
+    "kmov", "knxt", "kopn", "kopt", "kprv", "kprt", "krdo", "kref", "krfr", "krpl",
+    "krst", "kres", "ksav", "kspd", "kund", "kBEG", "kCAN", "kCMD", "kCPY", "kCRT",
+    "kDC", "kDL", "kslt", "kEND", "kEOL", "kEXT", "kFND", "kHLP", "kHOM", "kIC", "kLFT",
+    "kMSG", "kMOV", "kNXT", "kOPT", "kPRV", "kPRT", "kRDO", "kRPL", "kRIT", "kRES",
+    "kSAV", "kSPD", "kUND", "rfi", "kf11", "kf12", "kf13", "kf14", "kf15", "kf16",
+    "kf17", "kf18", "kf19", "kf20", "kf21", "kf22", "kf23", "kf24", "kf25", "kf26",
+    "kf27", "kf28", "kf29", "kf30", "kf31", "kf32", "kf33", "kf34", "kf35", "kf36",
+    "kf37", "kf38", "kf39", "kf40", "kf41", "kf42", "kf43", "kf44", "kf45", "kf46",
+    "kf47", "kf48", "kf49", "kf50", "kf51", "kf52", "kf53", "kf54", "kf55", "kf56",
+    "kf57", "kf58", "kf59", "kf60", "kf61", "kf62", "kf63", "el1", "mgc", "smgl",
+    "smgr", "fln", "sclk", "dclk", "rmclk", "cwin", "wingo", "hup", "dial", "qdial",
+    "tone", "pulse", "hook", "pause", "wait", "u0", "u1", "u2", "u3", "u4", "u5", "u6",
+    "u7", "u8", "u9", "op", "oc", "initc", "initp", "scp", "setf", "setb", "cpi", "lpi",
+    "chr", "cvr", "defc", "swidm", "sdrfq", "sitm", "slm", "smicm", "snlq", "snrmq",
+    "sshm", "ssubm", "ssupm", "sum", "rwidm", "ritm", "rlm", "rmicm", "rshm", "rsubm",
+    "rsupm", "rum", "mhpa", "mcud1", "mcub1", "mcuf1", "mvpa", "mcuu1", "porder",
+    "mcud", "mcub", "mcuf", "mcuu", "scs", "smgb", "smgbp", "smglp", "smgrp", "smgt",
+    "smgtp", "sbim", "scsd", "rbim", "rcsd", "subcs", "supcs", "docr", "zerom", "csnm",
+    "kmous", "minfo", "reqmp", "getm", "setaf", "setab", "pfxl", "devt", "csin", "s0ds",
+    "s1ds", "s2ds", "s3ds", "smglr", "smgtb", "birep", "binel", "bicr", "colornm",
+    "defbi", "endbi", "setcolor", "slines", "dispc", "smpch", "rmpch", "smsc", "rmsc",
+    "pctrm", "scesc", "scesa", "ehhlm", "elhlm", "elohlm", "erhlm", "ethlm", "evhlm",
+    "sgr1", "slength", "OTi2", "OTrs", "OTnl", "OTbc", "OTko", "OTma", "OTG2", "OTG3",
+    "OTG1", "OTG4", "OTGR", "OTGL", "OTGU", "OTGD", "OTGH", "OTGV", "OTGC", "meml",
+    "memu", "box1",
+)
+
+
+_ABSENT = -1
+_CANCELLED = -2
+
+
+@dataclass(frozen=True)
+class Terminfo:
+    """A parsed terminfo entry.
+
+    Predefined and extended capabilities share one namespace per type; absent
+    and cancelled capabilities are simply missing from the maps.
+    """
+
+    names: tuple[str, ...]
+    booleans: frozenset[str]
+    numbers: Mapping[str, int]
+    strings: Mapping[str, bytes]
+
+    def flag(self, name: str) -> bool:
+        return name in self.booleans
+
+    def number(self, name: str) -> int | None:
+        return self.numbers.get(name)
+
+    def string(self, name: str) -> bytes | None:
+        return self.strings.get(name)
+
+    @property
+    def colors(self) -> int:
+        """Number of colors, or 0 when the entry doesn't declare any."""
+        return max(self.numbers.get("colors", 0), 0)
+
+    @property
+    def truecolor(self) -> bool:
+        """True if the entry advertises 24-bit color via `RGB` or `Tc`.
+
+        ncurses defines `RGB` as a flag, a number, or a string depending on
+        the entry, so any of the three forms counts.
+        """
+        return (
+            "Tc" in self.booleans
+            or "RGB" in self.booleans
+            or "RGB" in self.numbers
+            or "RGB" in self.strings
+        )
+
+
+class _Reader:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.pos = 0
+
+    def take(self, size: int) -> bytes:
+        if self.pos + size > len(self.data):
+            raise ValueError("truncated terminfo entry")
+        chunk = self.data[self.pos : self.pos + size]
+        self.pos += size
+        return chunk
+
+    def shorts(self, count: int) -> tuple[int, ...]:
+        return struct.unpack(f"<{count}h", self.take(2 * count))
+
+    def numbers(self, count: int, width: int) -> tuple[int, ...]:
+        fmt = f"<{count}{'i' if width == 4 else 'h'}"
+        return struct.unpack(fmt, self.take(width * count))
+
+    def align(self) -> None:
+        if self.pos % 2:
+            self.pos += 1
+
+
+def _c_string(table: bytes, offset: int) -> bytes:
+    end = table.find(b"\0", offset)
+    if end < 0:
+        raise ValueError("unterminated string in terminfo entry")
+    return table[offset:end]
+
+
+def parse_terminfo(data: bytes) -> Terminfo:
+    """Parse a compiled terminfo entry (pure).
+
+    :raises ValueError: if `data` is not a well-formed compiled entry.
+    """
+    reader = _Reader(data)
+    magic, names_size, bool_count, num_count, str_count, table_size = reader.shorts(6)
+    if magic == MAGIC_LEGACY:
+        width = 2
+    elif magic == MAGIC_32BIT:
+        width = 4
+    else:
+        raise ValueError(f"bad terminfo magic {magic:#o}")
+    if min(names_size, bool_count, num_count, str_count, table_size) < 0:
+        raise ValueError("negative section size in terminfo entry")
+
+    names = tuple(_c_string(reader.take(names_size), 0).decode("ascii", "replace").split("|"))
+
+    booleans: set[str] = set()
+    for name, value in zip(BOOLEAN_NAMES, reader.take(bool_count)):
+        if value == 1:
+            booleans.add(name)
+    reader.align()
+
+    numbers: dict[str, int] = {}
+    for name, value in zip(NUMBER_NAMES, reader.numbers(num_count, width)):
+        if value >= 0:
+            numbers[name] = value
+
+    offsets = reader.shorts(str_count)
+    table = reader.take(table_size)
+    strings: dict[str, bytes] = {}
+    for name, offset in zip(STRING_NAMES, offsets):
+        if offset >= 0:
+            strings[name] = _c_string(table, offset)
+
+    # Extended (user-defined) capabilities, if present.
+    reader.align()
+    if reader.pos + 10 <= len(data):
+        _parse_extended(reader, width, booleans, numbers, strings)
+
+    return Terminfo(names, frozenset(booleans), numbers, strings)
+
+
+def _parse_extended(
+    reader: _Reader,
+    width: int,
+    booleans: set[str],
+    numbers: dict[str, int],
+    strings: dict[str, bytes],
+) -> None:
+    ext_bools, ext_nums, ext_strs, _items, table_size = reader.shorts(5)
+    if min(ext_bools, ext_nums, ext_strs, table_size) < 0:
+        raise ValueError("negative section size in terminfo extended header")
+
+    bool_values = reader.take(ext_bools)
+    reader.align()
+    num_values = reader.numbers(ext_nums, width)
+    str_offsets = reader.shorts(ext_strs)
+    name_offsets = reader.shorts(ext_bools + ext_nums + ext_strs)
+    table = reader.take(table_size)
+
+    # The names follow the last string value in the table; name offsets are
+    # relative to that point.
+    names_base = 0
+    values: list[bytes | None] = []
+    for offset in str_offsets:
+        if offset < 0:
+            values.append(None)
+            continue
+        value = _c_string(table, offset)
+        values.append(value)
+        names_base = max(names_base, offset + len(value) + 1)
+
+    cap_names = [
+        _c_string(table, names_base + offset).decode("ascii", "replace")
+        for offset in name_offsets
+    ]
+    bool_names = cap_names[:ext_bools]
+    num_names = cap_names[ext_bools : ext_bools + ext_nums]
+    str_names = cap_names[ext_bools + ext_nums :]
+
+    for name, flag in zip(bool_names, bool_values):
+        if flag == 1:
+            booleans.add(name)
+    for name, number in zip(num_names, num_values):
+        if number >= 0:
+            numbers[name] = number
+    for name, string in zip(str_names, values):
+        if string is not None:
+            strings[name] = string
+
+
+def terminfo_dirs(env: Mapping[str, str]) -> list[Path]:
+    """The directories searched for compiled entries, in ncurses order.
+
+    $TERMINFO, then ~/.terminfo, then each $TERMINFO_DIRS element (an empty
+    element stands for the system directories), then the system directories.
+    """
+    dirs: list[Path] = []
+    if env.get("TERMINFO"):
+        dirs.append(Path(env["TERMINFO"]))
+    if env.get("HOME"):
+        dirs.append(Path(env["HOME"]) / ".terminfo")
+    if env.get("TERMINFO_DIRS"):
+        for element in env["TERMINFO_DIRS"].split(":"):
+            if element:
+                dirs.append(Path(element))
+            else:
+                dirs.extend(Path(d) for d in SYSTEM_TERMINFO_DIRS)
+    dirs.extend(Path(d) for d in SYSTEM_TERMINFO_DIRS)
+
+    # Drop duplicates (an empty TERMINFO_DIRS element repeats the system dirs).
+    return list(dict.fromkeys(dirs))
+
+
+def find_terminfo(term: str, env: Mapping[str, str]) -> Path | None:
+    """Return the compiled entry for `term`, or None if no directory has one.
+
+    Checks both directory layouts: the first letter (`x/xterm`, Linux) and its
+    hex code (`78/xterm`, macOS and case-insensitive filesystems).
+    """
+    if not term or "/" in term or term.startswith("."):
+        return None
+    for directory in terminfo_dirs(env):
+        for subdir in (term[0], f"{ord(term[0]):x}"):
+            path = directory / subdir / term
+            if path.is_file():
+                return path
+    return None
+
+
+def load_terminfo(
+    term: str | None = None, env: Mapping[str, str] | None = None
+) -> Terminfo | None:
+    """Find and parse the entry for `term` (default: $TERM).
+
+    Returns None if TERM is unset, no entry exists, or the entry can't be read
+    or parsed — callers treat all of those as "capabilities unknown".
+    """
+    if env is None:
+        env = os.environ
+    if term is None:
+        term = env.get("TERM", "")
+    path = find_terminfo(term, env)
+    if path is None:
+        return None
+    try:
+        return parse_terminfo(path.read_bytes())
+    except (OSError, ValueError, struct.error):
+        return None
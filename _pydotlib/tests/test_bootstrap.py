@@ -26,6 +26,7 @@ from _pydotlib.bootstrap import (
     find_dotfiles_root,
     initialize_vim_plugin_manager,
     is_dotfiles_root,
+    map_url,
     safe_symlink,
 )
 
@@ -442,6 +443,50 @@ class TestDownloadFiles(unittest.TestCase):
             mock_download.assert_not_called()
 
 
+class TestUrlMap(unittest.TestCase):
+    MAP = json.dumps(
+        {
+            "https://github.com/": "file:///srv/git/",
+            "https://github.com/romkatv/": "file:///srv/p10k/",
+        }
+    )
+
+    def test_longest_prefix_wins(self):
+        with patch.dict(os.environ, {"DOTFILES_URL_MAP": self.MAP}):
+            self.assertEqual(
+                map_url("https://github.com/romkatv/powerlevel10k.git"),
+                "file:///srv/p10k/powerlevel10k.git",
+            )
+            self.assertEqual(map_url("https://github.com/x/y.git"), "file:///srv/git/x/y.git")
+            self.assertEqual(map_url("https://example.com/z"), "https://example.com/z")
+
+    def test_malformed_map_is_ignored(self):
+        for raw in ("{not json", '["a"]', '{"a": 1}'):
+            with patch.dict(os.environ, {"DOTFILES_URL_MAP": raw}), self.assertLogs(
+                level="WARNING"
+            ):
+                self.assertEqual(map_url("https://github.com/x"), "https://github.com/x")
+
+    @patch("_pydotlib.bootstrap._has_internet", return_value=False)
+    @patch("subprocess.run")
+    def test_clones_mapped_url_without_probing(self, mock_run, mock_probe):
+        mock_run.return_value = MagicMock(returncode=0)
+        with tempfile.TemporaryDirectory() as tmpdir, patch.dict(
+            os.environ, {"DOTFILES_URL_MAP": self.MAP}
+        ):
+            git_clone_repos(
+                [("https://github.com/x/y.git", Path(tmpdir) / "y")], dry_run=False
+            )
+        mock_probe.assert_not_called()
+        self.assertIn("file:///srv/git/x/y.git", mock_run.call_args.args[0])
+
+    @patch("subprocess.check_call")
+    def test_skips_vim_plugins(self, mock_call):
+        with patch.dict(os.environ, {"DOTFILES_URL_MAP": self.MAP}):
+            initialize_vim_plugin_manager(dry_run=False)
+        mock_call.assert_not_called()
+
+
 class TestGitClone(unittest.TestCase):
     @patch("subprocess.run")
     def test_clones_repo_to_dest(self, mock_run):
@@ -1000,7 +1045,7 @@ class TestConfigureWeatherLocation(unittest.TestCase):
 
             # input_field returns the default when input is blank — simulate that
             # by returning whatever default was passed.
-            mock_input.side_effect = lambda message, default=None: default
+            mock_input.side_effect = lambda message, default=None, prompt_id=None: default
 
             configure_weather_location(path, dry_run=False)
 
@@ -1025,7 +1070,7 @@ class TestConfigureWeatherLocation(unittest.TestCase):
     def test_falls_back_to_env_var_when_no_file(self, mock_input):
         captured = {}
 
-        def capture_default(message, default=None):
+        def capture_default(message, default=None, prompt_id=None):
             captured["default"] = default
             return default
 
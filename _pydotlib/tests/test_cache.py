@@ -0,0 +1,313 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from _pydotlib.cache import (
+    ACCESS_RESOLUTION_SECS,
+    Cache,
+    HotCache,
+    cache_dir,
+    hot_cache_dir,
+    persisted_cache_dir,
+    _write_entries,
+)
+from _pydotlib.xdg import xdg_dirs
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "cache" / "test.json"
+        self.clock = FakeClock()
+
+    def _cache(self, **kwargs) -> Cache:
+        return Cache("test", path=self.path, clock=self.clock, **kwargs)
+
+    def test_default_path_is_under_xdg_cache_home(self):
+        self.addCleanup(xdg_dirs.cache_clear)
+        with patch.dict("os.environ", {"XDG_CACHE_HOME": self.tmp.name}):
+            xdg_dirs.cache_clear()
+            self.assertEqual(cache_dir(), Path(self.tmp.name) / "dotfiles" / "cache")
+            self.assertEqual(Cache("weather").path, cache_dir() / "weather.json")
+
+    def test_rejects_bad_namespace(self):
+        for namespace in ("", "../x", "a/b"):
+            with self.assertRaises(ValueError):
+                Cache(namespace)
+
+    def test_set_then_get(self):
+        cache = self._cache()
+        cache.set("seattle", {"temp": 55}, ttl=60)
+        self.assertEqual(cache.get("seattle"), {"temp": 55})
+        self.assertEqual(self._cache().get("seattle"), {"temp": 55})
+
+    def test_entries_go_stale_then_expire(self):
+        cache = self._cache()
+        cache.set("k", "v", ttl=60, stale_ttl=30)
+
+        self.clock.now += 59
+        self.assertTrue(cache.lookup("k").fresh)
+
+        self.clock.now += 2
+        found = cache.lookup("k")
+        self.assertFalse(found.fresh)
+        self.assertEqual(found.value, "v")
+        self.assertEqual(found.age, 61)
+        self.assertIsNone(cache.get("k"))
+
+        self.clock.now += 30
+        self.assertIsNone(cache.lookup("k"))
+
+    def test_stats(self):
+        cache = self._cache()
+        cache.get("missing")
+        cache.set("k", 1, ttl=10, stale_ttl=10)
+        cache.get("k")
+        self.clock.now += 15
+        cache.lookup("k")
+        self.assertEqual(
+            (cache.stats.hits, cache.stats.stale_hits, cache.stats.misses), (1, 1, 1)
+        )
+        self.assertEqual(cache.stats.writes, 1)
+        self.assertAlmostEqual(cache.stats.hit_ratio, 2 / 3)
+
+    def test_delete_and_clear(self):
+        cache = self._cache()
+        cache.set("a", 1, ttl=10)
+        cache.set("b", 2, ttl=10)
+        self.assertTrue(cache.delete("a"))
+        self.assertFalse(cache.delete("a"))
+        self.assertEqual(cache.get("b"), 2)
+        cache.clear()
+        self.assertIsNone(cache.get("b"))
+
+    def test_evicts_least_recently_used(self):
+        cache = self._cache(max_entries=2)
+        cache.set("a", 1, ttl=1000)
+        self.clock.now += 1
+        cache.set("b", 2, ttl=1000)
+        # Reading "a" after the access resolution bumps it above "b".
+        self.clock.now += ACCESS_RESOLUTION_SECS + 1
+        cache.get("a")
+        cache.set("c", 3, ttl=1000)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_recent_reads_do_not_rewrite_the_file(self):
+        cache = self._cache()
+        cache.set("a", 1, ttl=1000)
+        mtime = self.path.stat().st_mtime_ns
+        with patch.object(Cache, "_write") as write:
+            for _ in range(10):
+                cache.get("a")
+            write.assert_not_called()
+        self.assertEqual(self.path.stat().st_mtime_ns, mtime)
+
+    def test_evicts_to_fit_max_bytes(self):
+        cache = self._cache(max_bytes=300)
+        for i in range(10):
+            self.clock.now += 1
+            cache.set(f"k{i}", "x" * 50, ttl=1000)
+        self.assertLessEqual(self.path.stat().st_size, 300)
+        self.assertEqual(cache.get("k9"), "x" * 50)
+        self.assertIsNone(cache.get("k0"))
+
+    def test_expired_entries_are_dropped_on_write(self):
+        cache = self._cache()
+        cache.set("old", 1, ttl=10)
+        self.clock.now += 20
+        cache.set("new", 2, ttl=10)
+        self.assertEqual(list(json.loads(self.path.read_text())), ["new"])
+
+    def test_corrupt_file_acts_empty(self):
+        self.path.parent.mkdir(parents=True)
+        for content in ("{not json", "[1, 2]"):
+            self.path.write_text(content)
+            cache = self._cache()
+            with self.assertLogs("_pydotlib.cache", level="WARNING"):
+                self.assertIsNone(cache.get("k"))
+            cache.set("k", 2, ttl=10)
+            self.assertEqual(cache.get("k"), 2)
+
+        # Entries missing their timestamps are misses, and dropped on write.
+        self.path.write_text('{"k": {"value": 1}}')
+        cache = self._cache()
+        self.assertIsNone(cache.get("k"))
+        cache.set("other", 2, ttl=10)
+        self.assertEqual(list(json.loads(self.path.read_text())), ["other"])
+
+    def test_concurrent_writers_lose_no_updates(self):
+        def writer(n):
+            cache = self._cache()
+            for i in range(20):
+                cache.set(f"{n}-{i}", i, ttl=1000)
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(json.loads(self.path.read_text())), 80)
+
+
+class TestGetOrFetch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.clock = FakeClock()
+        self.cache = Cache(
+            "test", path=Path(self.tmp.name) / "test.json", clock=self.clock
+        )
+        self.calls = 0
+
+    def _fetch(self):
+        self.calls += 1
+        return f"value-{self.calls}"
+
+    def _fail(self):
+        raise RuntimeError("offline")
+
+    def test_miss_fetches_and_hit_does_not(self):
+        self.assertEqual(self.cache.get_or_fetch("k", self._fetch, ttl=60), "value-1")
+        self.assertEqual(self.cache.get_or_fetch("k", self._fetch, ttl=60), "value-1")
+        self.assertEqual(self.calls, 1)
+
+    def test_miss_propagates_fetch_errors(self):
+        with self.assertRaises(RuntimeError):
+            self.cache.get_or_fetch("k", self._fail, ttl=60)
+
+    def test_stale_entry_is_refreshed_inline(self):
+        self.cache.get_or_fetch("k", self._fetch, ttl=60, stale_ttl=60)
+        self.clock.now += 90
+        self.assertEqual(
+            self.cache.get_or_fetch("k", self._fetch, ttl=60, stale_ttl=60), "value-2"
+        )
+
+    def test_stale_entry_served_when_refresh_fails(self):
+        self.cache.set("k", "old", ttl=60, stale_ttl=60)
+        self.clock.now += 90
+        with self.assertLogs("_pydotlib.cache", level="DEBUG"):
+            value = self.cache.get_or_fetch("k", self._fail, ttl=60, stale_ttl=60)
+        self.assertEqual(value, "old")
+
+    def test_background_refresh_returns_stale_value_immediately(self):
+        self.cache.set("k", "old", ttl=60, stale_ttl=60)
+        self.clock.now += 90
+        release = threading.Event()
+
+        def slow_fetch():
+            release.wait(5)
+            return "new"
+
+        value = self.cache.get_or_fetch(
+            "k", slow_fetch, ttl=60, stale_ttl=60, background=True
+        )
+        self.assertEqual(value, "old")
+        release.set()
+        self.cache.wait()
+        self.assertEqual(self.cache.get("k"), "new")
+
+    def test_concurrent_refresh_serves_stale(self):
+        self.cache.set("k", "old", ttl=60, stale_ttl=60)
+        self.clock.now += 90
+        with self.cache._refresh_lock() as acquired:
+            self.assertTrue(acquired)
+            other = Cache("test", path=self.cache.path, clock=self.clock)
+            value = other.get_or_fetch("k", self._fetch, ttl=60, stale_ttl=60)
+        self.assertEqual(value, "old")
+        self.assertEqual(self.calls, 0)
+
+
+class TestHotCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = Path(self.tmp.name)
+        self.runtime = root / "runtime"
+        self.runtime.mkdir(mode=0o700)
+        self.runtime.chmod(0o700)
+        self.state = root / "state"
+        patcher = patch.dict(
+            os.environ,
+            {"XDG_RUNTIME_DIR": str(self.runtime), "XDG_STATE_HOME": str(self.state)},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        xdg_dirs.cache_clear()
+        self.addCleanup(xdg_dirs.cache_clear)
+        self.clock = FakeClock()
+
+    def _cache(self) -> HotCache:
+        return HotCache("status", persist_interval=300, clock=self.clock)
+
+    def test_paths(self):
+        cache = self._cache()
+        self.assertTrue(cache.tiered)
+        self.assertEqual(cache.path, hot_cache_dir() / "status.json")
+        self.assertEqual(cache.persisted_path, persisted_cache_dir() / "status.json")
+        self.assertTrue(str(cache.path).startswith(str(self.runtime)))
+        self.assertTrue(str(cache.persisted_path).startswith(str(self.state)))
+
+    def test_persists_at_most_once_per_interval(self):
+        cache = self._cache()
+        with patch("_pydotlib.cache._write_entries", wraps=_write_entries) as write:
+            for i in range(10):
+                self.clock.now += 10
+                cache.set("k", i, ttl=1000)
+            persisted = [
+                c for c in write.call_args_list if c.args[0] == cache.persisted_path
+            ]
+        # The first write persists; the next 90 seconds stay in the runtime dir.
+        self.assertEqual(len(persisted), 1)
+        self.assertEqual(json.loads(cache.persisted_path.read_text())["k"]["value"], 0)
+
+        self.clock.now += 300
+        cache.set("k", "later", ttl=1000)
+        self.assertEqual(
+            json.loads(cache.persisted_path.read_text())["k"]["value"], "later"
+        )
+
+    def test_flush_persists_immediately(self):
+        cache = self._cache()
+        cache.set("k", 1, ttl=1000)
+        self.clock.now += 1
+        cache.set("k", 2, ttl=1000)
+        cache.flush()
+        self.assertEqual(json.loads(cache.persisted_path.read_text())["k"]["value"], 2)
+
+    def test_seeds_empty_runtime_dir_from_persisted_copy(self):
+        self._cache().set("k", "kept", ttl=1000)
+        # Simulate a reboot wiping the tmpfs.
+        for path in self.runtime.rglob("*"):
+            if path.is_file():
+                path.unlink()
+        self.assertEqual(self._cache().get("k"), "kept")
+
+    def test_falls_back_to_state_dir_without_runtime_dir(self):
+        self.runtime.chmod(0o755)
+        xdg_dirs.cache_clear()
+        cache = self._cache()
+        self.assertFalse(cache.tiered)
+        cache.set("k", 1, ttl=1000)
+        self.assertEqual(cache.path, cache.persisted_path)
+        self.assertEqual(self._cache().get("k"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
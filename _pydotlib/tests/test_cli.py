@@ -1,11 +1,32 @@
+import contextvars
+import json
 import logging
+import tempfile
+import threading
+import time
 import unittest
 from contextlib import redirect_stderr
 from io import StringIO
+from pathlib import Path
 from unittest import mock
 from unittest.mock import patch
 
-from _pydotlib.cli import ColoredLogFormatter, confirm, input_field
+from _pydotlib.cli import (
+    TASK_DONE,
+    TASK_RUNNING,
+    ColoredLogFormatter,
+    JsonLinesFormatter,
+    ProgressDisplay,
+    ProgressTask,
+    configure_prompts,
+    confirm,
+    format_bytes,
+    input_field,
+    load_answers,
+    buffered_step,
+    log_step,
+    setup_logging,
+)
 
 
 class InputFieldTests(unittest.TestCase):
@@ -16,6 +37,9 @@ class InputFieldTests(unittest.TestCase):
         self.mock_stdin = patcher.start()
         self.mock_stdin.isatty.return_value = True
         self.addCleanup(patcher.stop)
+        # Ignore any $DOTFILES_ANSWERS in the developer's environment.
+        configure_prompts(env={})
+        self.addCleanup(configure_prompts, env={})
 
     @patch("builtins.input", return_value="user input")
     def test_returns_user_input_when_provided(self, mock_input):
@@ -70,6 +94,9 @@ class ConfirmTests(unittest.TestCase):
         self.mock_stdin = patcher.start()
         self.mock_stdin.isatty.return_value = True
         self.addCleanup(patcher.stop)
+        # Ignore any $DOTFILES_ANSWERS in the developer's environment.
+        configure_prompts(env={})
+        self.addCleanup(configure_prompts, env={})
 
     @patch("builtins.input", return_value="")
     def test_prints_message_with_yes_no(self, mocked_input):
@@ -138,6 +165,12 @@ class ConfirmTests(unittest.TestCase):
             mocked_input.return_value = "nO"
             self.assertFalse(confirm(message="do something?", default=None))
 
+    @patch("builtins.input", side_effect=["True", "false"])
+    def test_accepts_the_same_words_as_answers_files(self, mocked_input):
+        with redirect_stderr(StringIO()):
+            self.assertTrue(confirm(message="do something?", default=None))
+            self.assertFalse(confirm(message="do something?", default=None))
+
     @patch("builtins.input")
     def test_confirm_requests_input_until_valid_response(self, mocked_input):
         with redirect_stderr(StringIO()):
@@ -212,3 +245,402 @@ class ColoredLogFormatterTests(unittest.TestCase):
         formatter = ColoredLogFormatter()
         with self.assertRaises(KeyError):
             formatter.format(self._make_record(logging.NOTSET))
+
+
+class SetupLoggingTests(unittest.TestCase):
+    def setUp(self):
+        root = logging.getLogger()
+        saved_handlers, saved_level = root.handlers[:], root.level
+        root.handlers = []
+
+        def restore():
+            root.handlers = saved_handlers
+            root.setLevel(saved_level)
+
+        self.addCleanup(restore)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.json_path = Path(self.tmp.name) / "logs" / "run.jsonl"
+
+    def _json_records(self) -> list[dict]:
+        return [json.loads(line) for line in self.json_path.read_text().splitlines()]
+
+    def test_console_output_is_flushed_on_stop(self):
+        stream = StringIO()
+        pipeline = setup_logging(logging.INFO, stream=stream)
+        logging.info("hello %s", "world")
+        logging.debug("hidden")
+        pipeline.stop()
+
+        self.assertIn("hello world", stream.getvalue())
+        self.assertNotIn("hidden", stream.getvalue())
+
+    def test_stop_detaches_and_is_idempotent(self):
+        pipeline = setup_logging(stream=StringIO())
+        self.assertIn(pipeline.queue_handler, logging.getLogger().handlers)
+        pipeline.stop()
+        pipeline.stop()
+        self.assertNotIn(pipeline.queue_handler, logging.getLogger().handlers)
+
+    def test_json_sink_records_thread_and_step(self):
+        def body():
+            with setup_logging(stream=StringIO(), json_path=self.json_path):
+                logging.info("outside")
+                with log_step("symlinks"):
+                    logging.warning("inside")
+
+                def worker():
+                    with log_step("fedora"):
+                        logging.error("from worker")
+
+                thread = threading.Thread(target=worker, name="worker-1")
+                thread.start()
+                thread.join()
+
+        # A fresh context: run_tests.py runs this suite inside its own step.
+        contextvars.Context().run(body)
+
+        records = self._json_records()
+        self.assertEqual(
+            [(r["message"], r["step"], r["level"]) for r in records],
+            [
+                ("outside", None, "INFO"),
+                ("inside", "symlinks", "WARNING"),
+                ("from worker", "fedora", "ERROR"),
+            ],
+        )
+        self.assertEqual(records[2]["thread"], "worker-1")
+        self.assertGreaterEqual(records[0]["elapsed"], 0)
+
+    def test_prompts_wait_for_queued_records(self):
+        events = []
+
+        class SlowStream(StringIO):
+            def write(self, text):
+                time.sleep(0.01)
+                events.append(text)
+                return len(text)
+
+        configure_prompts(env={})
+        self.addCleanup(configure_prompts, env={})
+        with setup_logging(stream=SlowStream()), mock.patch("sys.stdin") as stdin:
+            stdin.isatty.return_value = True
+            for i in range(5):
+                logging.info("before prompt %d", i)
+            with (
+                redirect_stderr(StringIO()),
+                patch("builtins.input", side_effect=lambda: events.append("<prompt>") or "y"),
+            ):
+                self.assertTrue(confirm("go on?"))
+
+        logged_first = events[: events.index("<prompt>")]
+        self.assertEqual(sum("before prompt" in event for event in logged_first), 5)
+
+    def test_concurrent_emitters_lose_no_records(self):
+        threads_count, per_thread = 8, 250
+
+        def worker(n):
+            with log_step(f"step-{n}"):
+                for i in range(per_thread):
+                    logging.info("record %d", i)
+
+        with setup_logging(stream=StringIO(), json_path=self.json_path):
+            threads = [
+                threading.Thread(target=worker, args=(n,)) for n in range(threads_count)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        records = self._json_records()
+        self.assertEqual(len(records), threads_count * per_thread)
+        by_step = {}
+        for record in records:
+            by_step.setdefault(record["step"], []).append(record["message"])
+        self.assertEqual(
+            by_step["step-3"], [f"record {i}" for i in range(per_thread)]
+        )
+
+    def test_buffered_step_prints_its_output_as_one_block(self):
+        stream = StringIO()
+        both_logged = threading.Barrier(2, timeout=5)
+
+        def worker(name):
+            with buffered_step(name):
+                logging.info(f"{name} one")
+                both_logged.wait()
+                logging.info(f"{name} two")
+
+        with setup_logging(stream=stream, json_path=self.json_path):
+            threads = [threading.Thread(target=worker, args=(n,)) for n in ("a", "b")]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            logging.info("after")
+
+        lines = [line.rsplit(" - ", 1)[-1] for line in stream.getvalue().splitlines()]
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines[-1], "after")
+        first = lines[0].split()[0]
+        self.assertEqual(lines[:2], [f"{first} one", f"{first} two"])
+        # The JSON sink saw the records as they happened, without the markers.
+        messages = [r["message"] for r in self._json_records()]
+        self.assertEqual(sorted(messages[:2]), ["a one", "b one"])
+        self.assertEqual(len(messages), 5)
+
+    def test_exception_text_reaches_json_sink(self):
+        with setup_logging(stream=StringIO(), json_path=self.json_path):
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logging.exception("failed")
+
+        (record,) = self._json_records()
+        self.assertIn("failed", record["message"])
+        self.assertIn("ValueError: boom", record["message"])
+
+
+class JsonLinesFormatterTests(unittest.TestCase):
+    def test_missing_step_is_null(self):
+        record = logging.LogRecord("test", logging.INFO, __file__, 0, "hi", None, None)
+        data = json.loads(JsonLinesFormatter().format(record))
+        self.assertIsNone(data["step"])
+        self.assertEqual(data["message"], "hi")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ProgressDisplayTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.stream = StringIO()
+
+    def _display(self, **kwargs) -> ProgressDisplay:
+        kwargs.setdefault("live", True)
+        return ProgressDisplay(self.stream, clock=self.clock, **kwargs)
+
+    def test_format_bytes(self):
+        self.assertEqual(format_bytes(512), "512 B")
+        self.assertEqual(format_bytes(1536), "1.5 KiB")
+        self.assertEqual(format_bytes(3 * 1024**3), "3.0 GiB")
+
+    def test_task_describe(self):
+        task = ProgressTask("clone", TASK_RUNNING, 1024, 4096, started=1.0)
+        self.assertEqual(task.describe(3.5), "running 1.0 KiB / 4.0 KiB 2.5s")
+
+    def test_updates_are_rate_limited(self):
+        display = self._display(fps=10)
+        display.add("a")
+        frames = display.frames
+        # 1,000 updates per second for two seconds.
+        for i in range(2000):
+            self.clock.now = i / 1000
+            display.update("a", advance=1)
+        self.assertLessEqual(display.frames - frames, 20)
+        display.close()
+        self.assertEqual(display.tasks["a"].done_bytes, 2000)
+        self.assertIn("2.0 KiB", self.stream.getvalue().rsplit("\r", 1)[-1])
+
+    def test_unchanged_rows_are_not_rewritten(self):
+        display = self._display()
+        display.add("first")
+        display.add("other")
+        self.clock.now = 1
+        display.close()
+        self.stream.seek(0)
+        self.stream.truncate()
+
+        display._closed = False
+        self.clock.now = 2
+        display.update("other", advance=10)
+
+        output = self.stream.getvalue()
+        self.assertNotIn("first", output)
+        self.assertEqual(output, "\033[1A\rother  pending 10 B\033[K\n")
+
+    def test_new_rows_are_appended(self):
+        display = self._display()
+        display.add("a")
+        self.clock.now = 1
+        display.add("b")
+        output = self.stream.getvalue()
+        self.assertEqual(output.count("\n"), 2)
+        self.assertTrue(output.endswith("\rb  pending\033[K\n"))
+
+    def test_non_tty_prints_periodic_summaries(self):
+        display = self._display(live=False, summary_interval=5)
+        for name in ("fedora", "ubuntu", "arch"):
+            display.add(name)
+        display.start("fedora")
+        self.clock.now = 6
+        display.finish("ubuntu")
+        display.close()
+
+        lines = self.stream.getvalue().splitlines()
+        self.assertNotIn("\033[", self.stream.getvalue())
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0], "progress: 0/1 done, 0 failed, 0 running")
+        self.assertEqual(
+            lines[1], "progress: 1/3 done, 0 failed, 1 running (fedora 6.0s)"
+        )
+
+    def test_close_draws_final_state_once(self):
+        display = self._display()
+        display.add("a")
+        display.finish("a")
+        display.close()
+        display.close()
+        self.assertIn("a  done", self.stream.getvalue().rsplit("\r", 1)[-1])
+        self.assertEqual(display.tasks["a"].state, TASK_DONE)
+
+    def test_concurrent_updates_at_1000_per_second(self):
+        display = ProgressDisplay(self.stream, live=True, fps=10)
+        names = [f"task-{n}" for n in range(4)]
+        for name in names:
+            display.add(name, total_bytes=250)
+
+        def worker(name):
+            display.start(name)
+            for _ in range(250):
+                display.update(name, advance=1)
+                time.sleep(0.004)
+            display.finish(name)
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=worker, args=(name,)) for name in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        display.close()
+        elapsed = time.monotonic() - started
+
+        self.assertTrue(all(t.done_bytes == 250 for t in display.tasks.values()))
+        # Rendering is capped at fps regardless of the update rate.
+        self.assertLessEqual(display.frames, int(elapsed * 10) + 3)
+        # Four workers sleeping 4ms per update: ~1s of updates, not slowed by
+        # drawing.
+        self.assertLess(elapsed, 2.0)
+
+
+class AnswersFileTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("sys.stdin")
+        self.mock_stdin = patcher.start()
+        self.mock_stdin.isatty.return_value = False
+        self.addCleanup(patcher.stop)
+        self.addCleanup(configure_prompts, env={})
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+        self.transcript = self.dir / "transcript.jsonl"
+
+    def _configure(self, answers: dict, suffix: str = ".json") -> None:
+        path = self.dir / f"answers{suffix}"
+        path.write_text(json.dumps(answers))
+        configure_prompts(answers_path=path, transcript_path=self.transcript, env={})
+
+    def _transcript(self) -> list[dict]:
+        return [json.loads(line) for line in self.transcript.read_text().splitlines()]
+
+    def test_exact_id_beats_patterns(self):
+        self._configure({"backup:*": True, "backup:/home/u/.bashrc": False})
+        self.assertFalse(confirm("Back up?", prompt_id="backup:/home/u/.bashrc"))
+        self.assertTrue(confirm("Back up?", prompt_id="backup:/home/u/.zshrc"))
+
+    def test_first_matching_pattern_wins(self):
+        self._configure({"backup:*/.bash*": "no", "backup:*": "yes"})
+        self.assertFalse(confirm("Back up?", prompt_id="backup:/home/u/.bash_profile"))
+        self.assertTrue(confirm("Back up?", prompt_id="backup:/home/u/.vim"))
+
+    def test_answer_used_even_on_tty(self):
+        self.mock_stdin.isatty.return_value = True
+        self._configure({"git.name": "Jane Doe"})
+        with patch("builtins.input") as mocked_input:
+            self.assertEqual(input_field("Name", prompt_id="git.name"), "Jane Doe")
+            mocked_input.assert_not_called()
+
+    def test_empty_or_null_answer_gives_default(self):
+        self._configure({"a": "", "b": None})
+        self.assertEqual(input_field("A", default="x", prompt_id="a"), "x")
+        self.assertEqual(input_field("B", default="y", prompt_id="b"), "y")
+
+    def test_prompt_id_defaults_to_uncolored_message(self):
+        self._configure({"Proceed?": True})
+        self.assertTrue(confirm("\033[1mProceed?\033[0m"))
+
+    def test_confirm_without_default_uses_answer_when_non_tty(self):
+        self._configure({"danger": "y"})
+        self.assertTrue(confirm("Really?", prompt_id="danger"))
+
+    def test_unanswered_confirm_without_default_still_raises(self):
+        self._configure({})
+        with self.assertRaisesRegex(RuntimeError, "'danger'"):
+            confirm("Really?", prompt_id="danger")
+
+    def test_invalid_answers_raise(self):
+        self._configure({"c": "maybe", "i": 3})
+        with self.assertRaises(ValueError):
+            confirm("C?", prompt_id="c")
+        with self.assertRaises(ValueError):
+            input_field("I?", prompt_id="i")
+
+    def test_transcript_records_every_prompt(self):
+        self._configure({"git.name": "Jane"})
+        input_field("\033[1mName\033[0m", prompt_id="git.name")
+        input_field("Location", default="Seattle", prompt_id="weather.location")
+        confirm("Back up?", default=True, prompt_id="backup:x")
+
+        self.assertEqual(
+            [
+                (r["prompt_id"], r["message"], r["answer"], r["source"])
+                for r in self._transcript()
+            ],
+            [
+                ("git.name", "Name", "Jane", "answers"),
+                ("weather.location", "Location", "Seattle", "default"),
+                ("backup:x", "Back up?", True, "default"),
+            ],
+        )
+
+    def test_tty_answers_are_transcribed(self):
+        self.mock_stdin.isatty.return_value = True
+        self._configure({})
+        with patch("builtins.input", return_value="n"), redirect_stderr(StringIO()):
+            self.assertFalse(confirm("Back up?", default=True, prompt_id="b"))
+        self.assertEqual(self._transcript()[0]["source"], "tty")
+
+    def test_toml_answers(self):
+        path = self.dir / "answers.toml"
+        path.write_text('"git.email" = "j@example.com"\n"backup:*" = false\n')
+        answers = load_answers(path)
+        self.assertEqual(answers.lookup("git.email"), "j@example.com")
+        self.assertIs(answers.lookup("backup:/x"), False)
+
+    def test_environment_variables_configure_prompts(self):
+        path = self.dir / "answers.json"
+        path.write_text(json.dumps({"q": True}))
+        configure_prompts(
+            env={
+                "DOTFILES_ANSWERS": str(path),
+                "DOTFILES_TRANSCRIPT": str(self.transcript),
+            }
+        )
+        self.assertTrue(confirm("Q?", prompt_id="q"))
+        self.assertEqual(len(self._transcript()), 1)
+
+    def test_malformed_answers_file(self):
+        path = self.dir / "answers.json"
+        for content in ("{not json", "[1, 2]"):
+            path.write_text(content)
+            with self.assertRaises(ValueError):
+                load_answers(path)
@@ -1,27 +1,41 @@
 import base64
+import io
+import os
+import subprocess
+import tempfile
+import threading
 import unittest
 from contextlib import redirect_stderr
 from io import StringIO
+from pathlib import Path
 from unittest import mock
 
 from _pydotlib import clipboard
+from _pydotlib.cache import Cache
 from _pydotlib.clipboard import (
     BACKEND_NATIVE,
     BACKEND_NATIVE_UNREACHABLE,
     BACKEND_OSC52,
+    BACKEND_RELAY,
+    BACKEND_TMUX,
     BEL,
     EXIT_NO_BACKEND,
     EXIT_OK,
     EXIT_PASTE_UNSUPPORTED,
     EXIT_TOO_LARGE,
+    EXIT_USAGE,
+    OSC52_CHUNK_RAW,
     OSC52_MAX_RAW,
     OSC52_PREFIX,
+    OSC52_READ_CEILING,
     ST,
+    TMUX_LOAD_BUFFER,
     Environment,
     choose_backend,
     detect,
     encode_osc52,
     parse_osc52_reply,
+    write_osc52,
 )
 
 
@@ -57,6 +71,28 @@ class _Completed:
         self.stdout = stdout
 
 
+class _Sink(io.BytesIO):
+    def close(self):
+        self.captured = self.getvalue()
+        super().close()
+
+
+class FakePopen:
+    """Records how tmux load-buffer was spawned and what it was fed."""
+
+    def __init__(self, cmd, stdin=None, returncode=0):
+        self.cmd = cmd
+        self.stdin_arg = stdin
+        self.stdin = _Sink() if stdin is subprocess.PIPE else None
+        self.returncode = returncode
+
+    def wait(self):
+        return self.returncode
+
+    def kill(self):
+        pass
+
+
 class FakeTTY:
     """A stand-in for the /dev/tty binary file object used by copy()."""
 
@@ -70,7 +106,8 @@ class FakeTTY:
         return False
 
     def write(self, b):
-        self.data += b
+        self.data += bytes(b)
+        return len(b)
 
     def flush(self):
         pass
@@ -187,6 +224,13 @@ class EncodeTests(unittest.TestCase):
             OSC52_PREFIX + b"p;" + base64.standard_b64encode(b"x") + BEL,
         )
 
+    def test_streamed_matches_encode(self):
+        for size in (0, 1, OSC52_CHUNK_RAW - 1, OSC52_CHUNK_RAW, 3 * OSC52_CHUNK_RAW + 2):
+            data = bytes(range(256)) * (size // 256) + b"x" * (size % 256)
+            fake = FakeTTY()
+            write_osc52(fake, data)
+            self.assertEqual(fake.data, encode_osc52(data), size)
+
 
 class ParseReplyTests(unittest.TestCase):
     def _reply(self, data: bytes, term: bytes = BEL) -> bytes:
@@ -211,10 +255,9 @@ class ParseReplyTests(unittest.TestCase):
     def test_invalid_base64_returns_none(self):
         self.assertIsNone(parse_osc52_reply(OSC52_PREFIX + b"c;!!!notbase64!!!" + BEL))
 
-    def test_reply_complete_helper_handles_split(self):
-        head = OSC52_PREFIX + b"c;" + base64.standard_b64encode(b"data")
-        self.assertFalse(clipboard._reply_complete(head))
-        self.assertTrue(clipboard._reply_complete(head + BEL))
+    def test_oversized_reply_returns_none(self):
+        big = self._reply(b"x" * OSC52_READ_CEILING)
+        self.assertIsNone(parse_osc52_reply(big))
 
 
 class NormalizeWslTests(unittest.TestCase):
@@ -289,6 +332,90 @@ class CopyTests(unittest.TestCase):
         self.assertIn("set-clipboard is off", err.getvalue())
 
 
+class CopyFileTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.env = make_env(is_ssh=True)
+
+    def _file(self, data: bytes):
+        path = os.path.join(self.tmp.name, "input")
+        with open(path, "wb") as out:
+            out.write(data)
+        handle = open(path, "rb")
+        self.addCleanup(handle.close)
+        return handle
+
+    def _pipe(self, data: bytes):
+        read_fd, write_fd = os.pipe()
+
+        def writer():
+            with open(write_fd, "wb") as out:
+                try:
+                    out.write(data)
+                except BrokenPipeError:
+                    pass  # The reader stopped at the size cap.
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        self.addCleanup(thread.join)
+        handle = open(read_fd, "rb")
+        self.addCleanup(handle.close)
+        return handle
+
+    def _copy(self, handle, **kwargs):
+        fake = FakeTTY()
+        with redirect_stderr(StringIO()) as err:
+            rc = clipboard.copy_file(
+                handle, self.env, tty_writer=lambda: fake, run=lambda c: None, **kwargs
+            )
+        return rc, fake.data, err.getvalue()
+
+    def test_regular_file_is_streamed(self):
+        data = bytes(range(256)) * 200
+        rc, written, _ = self._copy(self._file(data))
+        self.assertEqual(rc, EXIT_OK)
+        self.assertEqual(written, encode_osc52(data))
+
+    def test_oversized_file_is_refused_before_reading(self):
+        handle = self._file(b"")
+        os.truncate(handle.name, OSC52_MAX_RAW + 1)
+        with mock.patch("mmap.mmap") as mapper, mock.patch.object(handle, "read") as read:
+            rc, written, err = self._copy(handle)
+        mapper.assert_not_called()
+        read.assert_not_called()
+        self.assertEqual(rc, EXIT_TOO_LARGE)
+        self.assertEqual(written, b"")
+        self.assertIn("too large", err)
+
+    def test_pipe(self):
+        data = b"piped " * 1000
+        rc, written, _ = self._copy(self._pipe(data))
+        self.assertEqual(rc, EXIT_OK)
+        self.assertEqual(written, encode_osc52(data))
+
+    def test_oversized_pipe_is_refused(self):
+        rc, written, err = self._copy(self._pipe(b"x" * (OSC52_MAX_RAW + 10)))
+        self.assertEqual(rc, EXIT_TOO_LARGE)
+        self.assertEqual(written, b"")
+        self.assertIn(f"over {OSC52_MAX_RAW} bytes", err)
+
+    def test_empty_input_is_refused(self):
+        for handle in (self._file(b""), self._pipe(b"")):
+            rc, written, err = self._copy(handle)
+            self.assertEqual(rc, EXIT_USAGE)
+            self.assertIn("empty", err)
+
+    def test_native_tool_reads_the_file_itself(self):
+        self.env = make_env(native_copy=["pbcopy"])
+        handle = self._file(b"native")
+        with mock.patch("subprocess.run", return_value=_Completed(0)) as run:
+            rc, _, _ = self._copy(handle)
+        self.assertEqual(rc, EXIT_OK)
+        self.assertEqual(run.call_args.kwargs["stdin"], handle.fileno())
+        self.assertNotIn("input", run.call_args.kwargs)
+
+
 class PasteTests(unittest.TestCase):
     def test_native_paste_returns_output(self):
         env = make_env(native_paste=["pbpaste"])
@@ -319,6 +446,205 @@ class PasteTests(unittest.TestCase):
         self.assertIn("no clipboard reply", err.getvalue())
 
 
+class OscPasteTests(unittest.TestCase):
+    def setUp(self):
+        self.master, self.slave = os.openpty()
+        self.addCleanup(os.close, self.master)
+
+    def _paste(self, reply: bytes) -> bytes | None:
+        def terminal():
+            # Discard the query, then answer in small pieces.
+            os.read(self.master, 64)
+            for i in range(0, len(reply), 1000):
+                os.write(self.master, reply[i : i + 1000])
+
+        thread = threading.Thread(target=terminal)
+        thread.start()
+        try:
+            return clipboard._osc52_paste(5.0, lambda: self.slave)
+        finally:
+            thread.join()
+
+    def test_reads_reply_split_across_reads(self):
+        data = bytes(range(256)) * 40
+        reply = b"typed" + OSC52_PREFIX + b"c;" + base64.standard_b64encode(data) + ST
+        self.assertEqual(self._paste(reply), data)
+
+    def test_malformed_reply_returns_none(self):
+        self.assertIsNone(self._paste(OSC52_PREFIX + b"c;not base64!" + BEL))
+
+
+class TmuxBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.env = make_env(is_ssh=True, is_tmux=True)
+        self.spawned = []
+
+        def popen(cmd, stdin=None):
+            self.spawned.append(FakePopen(cmd, stdin))
+            return self.spawned[-1]
+
+        patcher = mock.patch("subprocess.Popen", side_effect=popen)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _copy(self, data, *, set_clipboard="external\n", **kwargs):
+        fake = FakeTTY()
+        with redirect_stderr(StringIO()) as err:
+            rc = clipboard.copy(
+                data, self.env, tty_writer=lambda: fake, run=lambda c: set_clipboard,
+                **kwargs,
+            )
+        return rc, fake.data, err.getvalue()
+
+    def test_small_copy_still_uses_osc52(self):
+        rc, written, _ = self._copy(b"small")
+        self.assertEqual(rc, EXIT_OK)
+        self.assertEqual(written, encode_osc52(b"small"))
+        self.assertEqual(self.spawned, [])
+
+    def test_oversized_copy_goes_to_tmux(self):
+        data = b"x" * (OSC52_MAX_RAW + 1)
+        rc, written, _ = self._copy(data)
+        self.assertEqual(rc, EXIT_OK)
+        self.assertEqual(written, b"")
+        (proc,) = self.spawned
+        self.assertEqual(proc.cmd, TMUX_LOAD_BUFFER)
+        self.assertEqual(proc.stdin.captured, data)
+
+    def test_oversized_copy_refused_when_set_clipboard_off(self):
+        rc, _, err = self._copy(b"x" * (OSC52_MAX_RAW + 1), set_clipboard="off\n")
+        self.assertEqual(rc, EXIT_TOO_LARGE)
+        self.assertIn("too large", err)
+        self.assertEqual(self.spawned, [])
+
+    def test_forced_osc52_is_not_redirected(self):
+        rc, _, _ = self._copy(b"x" * (OSC52_MAX_RAW + 1), prefer=BACKEND_OSC52)
+        self.assertEqual(rc, EXIT_TOO_LARGE)
+
+    def test_forced_tmux(self):
+        rc, _, _ = self._copy(b"tiny", prefer=BACKEND_TMUX)
+        self.assertEqual(rc, EXIT_OK)
+        self.assertEqual(self.spawned[0].stdin.captured, b"tiny")
+
+    def test_forced_tmux_outside_tmux(self):
+        self.env = make_env(is_ssh=True)
+        rc, _, err = self._copy(b"tiny", prefer=BACKEND_TMUX)
+        self.assertEqual(rc, EXIT_NO_BACKEND)
+        self.assertIn("not inside tmux", err)
+
+    def test_load_buffer_failure(self):
+        with mock.patch(
+            "subprocess.Popen", side_effect=lambda cmd, stdin=None: FakePopen(cmd, stdin, 1)
+        ):
+            rc, _, err = self._copy(b"x" * (OSC52_MAX_RAW + 1))
+        self.assertEqual(rc, EXIT_NO_BACKEND)
+        self.assertIn("3.2", err)
+
+    def test_file_is_tmux_stdin(self):
+        with tempfile.TemporaryFile() as handle:
+            handle.write(b"y" * (OSC52_MAX_RAW + 1))
+            handle.seek(0)
+            with redirect_stderr(StringIO()):
+                rc = clipboard.copy_file(handle, self.env, run=lambda c: "on")
+            self.assertEqual(rc, EXIT_OK)
+            self.assertEqual(self.spawned[0].stdin_arg, handle.fileno())
+
+    def test_oversized_pipe_is_streamed_whole(self):
+        data = bytes(range(256)) * 1000
+        read_fd, write_fd = os.pipe()
+
+        def write():
+            with open(write_fd, "wb") as out:
+                out.write(data)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        with open(read_fd, "rb") as handle, redirect_stderr(StringIO()):
+            rc = clipboard.copy_file(handle, self.env, run=lambda c: "on")
+        writer.join()
+        self.assertEqual(rc, EXIT_OK)
+        self.assertEqual(self.spawned[0].stdin.captured, data)
+
+    def test_paste_reads_tmux_buffer(self):
+        with mock.patch("subprocess.run", return_value=_Completed(0, b"buffer")) as run:
+            rc, data = clipboard.paste(self.env, prefer=BACKEND_TMUX)
+        self.assertEqual((rc, data), (EXIT_OK, b"buffer"))
+        self.assertEqual(run.call_args.args[0], clipboard.TMUX_SAVE_BUFFER)
+
+    def test_paste_without_buffers(self):
+        with mock.patch("subprocess.run", return_value=_Completed(1)):
+            with redirect_stderr(StringIO()) as err:
+                rc, data = clipboard.paste(self.env, prefer=BACKEND_TMUX)
+        self.assertEqual((rc, data), (EXIT_NO_BACKEND, b""))
+        self.assertIn("no paste buffer", err.getvalue())
+
+
+class RelayBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.env = make_env(is_ssh=True, relay_socket="/nonexistent/relay.sock")
+
+    def test_chosen_over_ssh_when_configured(self):
+        self.assertEqual(choose_backend(self.env, "copy", None), BACKEND_RELAY)
+        self.assertEqual(choose_backend(self.env, "paste", None), BACKEND_RELAY)
+        self.assertEqual(
+            choose_backend(make_env(relay_socket="/x"), "copy", None), BACKEND_OSC52
+        )
+
+    def test_detects_socket_from_env(self):
+        env = detect(
+            {"CLIPBOARD_RELAY_SOCK": "/tmp/r.sock"}, system="Linux", release="", which=make_which()
+        )
+        self.assertEqual(env.relay_socket, "/tmp/r.sock")
+
+    def test_unreachable_relay_falls_back_to_osc52(self):
+        fake = FakeTTY()
+        with redirect_stderr(StringIO()) as err:
+            rc = clipboard.copy(b"x", self.env, tty_writer=lambda: fake, run=lambda c: None)
+        self.assertEqual(rc, EXIT_OK)
+        self.assertEqual(fake.data, encode_osc52(b"x"))
+        self.assertIn("falling back to OSC 52", err.getvalue())
+
+    def _pipe(self, data: bytes):
+        read_fd, write_fd = os.pipe()
+        with open(write_fd, "wb") as out:
+            out.write(data)
+        handle = open(read_fd, "rb")
+        self.addCleanup(handle.close)
+        return handle
+
+    def test_empty_pipe_is_refused_before_the_relay(self):
+        with mock.patch("_pydotlib.clipboard.relay_copy") as relay_copy:
+            with redirect_stderr(StringIO()) as err:
+                rc = clipboard.copy_file(self._pipe(b""), self.env, tty_writer=FakeTTY)
+        self.assertEqual(rc, EXIT_USAGE)
+        self.assertIn("refusing to copy empty input", err.getvalue())
+        relay_copy.assert_not_called()
+
+    def test_unreachable_relay_falls_back_with_what_was_read(self):
+        fake = FakeTTY()
+        with redirect_stderr(StringIO()):
+            rc = clipboard.copy_file(
+                self._pipe(b"piped"), self.env, tty_writer=lambda: fake, run=lambda c: None
+            )
+        self.assertEqual(rc, EXIT_OK)
+        self.assertEqual(fake.data, encode_osc52(b"piped"))
+
+    def test_forced_relay_does_not_fall_back(self):
+        with redirect_stderr(StringIO()) as err:
+            rc = clipboard.copy(
+                b"x", self.env, prefer=BACKEND_RELAY, tty_writer=FakeTTY, run=lambda c: None
+            )
+            paste_rc, _ = clipboard.paste(self.env, prefer=BACKEND_RELAY)
+        self.assertEqual((rc, paste_rc), (EXIT_NO_BACKEND, EXIT_NO_BACKEND))
+        self.assertIn("cannot reach clipboard relay", err.getvalue())
+
+    def test_forced_relay_without_socket(self):
+        with redirect_stderr(StringIO()) as err:
+            rc = clipboard.copy(b"x", make_env(), prefer=BACKEND_RELAY, tty_writer=FakeTTY)
+        self.assertEqual(rc, EXIT_NO_BACKEND)
+        self.assertIn("CLIPBOARD_RELAY_SOCK", err.getvalue())
+
+
 class ResolvePreferTests(unittest.TestCase):
     def test_cli_flag_wins_over_env(self):
         with mock.patch.dict("os.environ", {"CLIPBOARD_BACKEND": "native"}):
@@ -327,6 +653,8 @@ class ResolvePreferTests(unittest.TestCase):
     def test_env_used_when_no_flag(self):
         with mock.patch.dict("os.environ", {"CLIPBOARD_BACKEND": "native"}):
             self.assertEqual(clipboard.resolve_prefer(None), BACKEND_NATIVE)
+        with mock.patch.dict("os.environ", {"CLIPBOARD_BACKEND": "TMUX"}):
+            self.assertEqual(clipboard.resolve_prefer(None), BACKEND_TMUX)
 
     def test_auto_returns_none_without_warning(self):
         with mock.patch.dict("os.environ", {"CLIPBOARD_BACKEND": "auto"}):
@@ -341,6 +669,59 @@ class ResolvePreferTests(unittest.TestCase):
             self.assertIn("invalid CLIPBOARD_BACKEND", err.getvalue())
 
 
+class DetectionCacheTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = Cache("clipboard-detect", path=Path(tmp.name) / "detect.json")
+
+    def test_fingerprint_tracks_relevant_vars_only(self):
+        base = {"PATH": "/usr/bin", "TMUX": "/tmp/tmux-1/default,1,0"}
+        fp = clipboard.session_fingerprint(base, system="Linux", release="6.0")
+        same = clipboard.session_fingerprint(
+            {**base, "PWD": "/elsewhere"}, system="Linux", release="6.0"
+        )
+        self.assertEqual(fp, same)
+        for changed in ({**base, "PATH": "/opt/bin"}, {**base, "DISPLAY": ":0"}):
+            self.assertNotEqual(
+                clipboard.session_fingerprint(changed, system="Linux", release="6.0"), fp
+            )
+        self.assertNotEqual(
+            clipboard.session_fingerprint(base, system="Darwin", release="6.0"), fp
+        )
+
+    def test_environment_is_detected_once_per_session(self):
+        with mock.patch.object(clipboard.shutil, "which", return_value=None) as which:
+            first = clipboard.default_environment(cache=self.cache)
+            calls = which.call_count
+            self.assertEqual(clipboard.default_environment(cache=self.cache), first)
+            self.assertEqual(which.call_count, calls)
+            with mock.patch.dict("os.environ", {"DISPLAY": ":42"}):
+                clipboard.default_environment(cache=self.cache)
+            self.assertGreater(which.call_count, calls)
+
+    def test_unusable_cached_environment_is_redetected(self):
+        key = f"env:{clipboard._current_fingerprint()}"
+        self.cache.set(key, {"os": "linux", "retired_field": 1}, 60)
+        self.assertIsInstance(clipboard.default_environment(cache=self.cache), Environment)
+        self.assertIn("is_ssh", self.cache.get(key))
+
+    def test_probe_output_is_reused(self):
+        calls = []
+
+        def run(cmd):
+            calls.append(cmd)
+            return "off\n"
+
+        cached = clipboard.cached_run(run, cache=self.cache)
+        cmd = ["tmux", "show", "-gv", "set-clipboard"]
+        self.assertEqual(cached(cmd), "off\n")
+        self.assertEqual(clipboard.cached_run(run, cache=self.cache)(cmd), "off\n")
+        self.assertEqual(calls, [cmd])
+        cached(["tmux", "show", "-gv", "other"])
+        self.assertEqual(len(calls), 2)
+
+
 class PasteTimeoutTests(unittest.TestCase):
     def test_default_when_unset(self):
         with mock.patch.dict("os.environ", {}, clear=True):
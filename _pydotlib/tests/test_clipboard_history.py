@@ -0,0 +1,198 @@
+import io
+import itertools
+import os
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+from _pydotlib.clipboard_history import (
+    ClipboardHistory,
+    CopyRecorder,
+    HistoryEntry,
+    format_entry,
+)
+
+
+class ClipboardHistoryTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "state" / "clipboard-history"
+        self.clock = itertools.count(1000.0)
+
+    def _history(self, **kwargs):
+        return ClipboardHistory(self.path, clock=lambda: next(self.clock), **kwargs)
+
+    def test_missing_file_is_empty(self):
+        history = self._history()
+        self.assertEqual(history.entries(), [])
+        self.assertIsNone(history.read(1))
+        self.assertFalse(self.path.exists())
+
+    def test_newest_first(self):
+        history = self._history()
+        for data in (b"one", b"two", b"three"):
+            self.assertTrue(history.append(data))
+        self.assertEqual(
+            history.entries(),
+            [
+                HistoryEntry(1, 1002.0, 5),
+                HistoryEntry(2, 1001.0, 3),
+                HistoryEntry(3, 1000.0, 3),
+            ],
+        )
+        self.assertEqual(history.read(1), b"three")
+        self.assertEqual(history.read(3), b"one")
+        self.assertIsNone(history.read(4))
+
+    def test_file_is_private_and_fixed_size(self):
+        history = self._history(slots=4, data_bytes=64)
+        history.append(b"x")
+        size = self.path.stat().st_size
+        for _ in range(50):
+            history.append(b"abcdefgh")
+        self.assertEqual(self.path.stat().st_mode & 0o777, 0o600)
+        self.assertEqual(self.path.stat().st_size, size)
+
+    def test_slots_are_reused(self):
+        history = self._history(slots=3, data_bytes=1024)
+        for i in range(5):
+            history.append(b"entry %d" % i)
+        self.assertEqual(
+            [history.read(n) for n in (1, 2, 3)], [b"entry 4", b"entry 3", b"entry 2"]
+        )
+        self.assertEqual(len(history.entries()), 3)
+
+    def test_overwritten_entries_drop_out_and_data_wraps(self):
+        history = self._history(slots=16, data_bytes=40)
+        chunks = [bytes([65 + i]) * 10 for i in range(7)]
+        for chunk in chunks:
+            history.append(chunk)
+        # 40 bytes hold the last four 10-byte entries; the ring has wrapped.
+        self.assertEqual([e.number for e in history.entries()], [1, 2, 3, 4])
+        self.assertEqual([history.read(n) for n in (1, 2, 3, 4)], chunks[:2:-1])
+
+    def test_entry_split_across_the_end(self):
+        history = self._history(slots=8, data_bytes=40)
+        for data in (b"0123456789", b"abcdefghij", b"ABCDEFGHIJ", b"wxyz"):
+            history.append(data)
+        self.assertTrue(history.append(b"WRAPPED!"))  # bytes 34-39, then 0-1
+        reopened = self._history(slots=8, data_bytes=40)
+        self.assertEqual(reopened.read(1), b"WRAPPED!")
+        self.assertEqual(reopened.read(2), b"wxyz")
+        # The first entry lost its first two bytes, so it is gone.
+        self.assertEqual(len(reopened.entries()), 4)
+
+    def test_empty_and_oversized_are_not_recorded(self):
+        history = self._history(data_bytes=64)
+        self.assertFalse(history.append(b""))
+        self.assertFalse(history.append(b"x" * (history.max_entry + 1)))
+        self.assertTrue(history.append(b"x" * history.max_entry))
+        self.assertEqual(len(history.entries()), 1)
+
+    def test_grep_and_listing(self):
+        history = self._history()
+        history.append(b"first line\nsecond")
+        history.append(b"password=hunter2")
+        history.append(b"another line")
+        self.assertEqual([e.number for e in history.grep(rb"line\b")], [1, 3])
+        self.assertEqual(history.grep(re.compile(rb"^second", re.M))[0].number, 3)
+        listing = history.listing(5, re.compile(b"hunter"))
+        self.assertEqual([(e.number, p) for e, p in listing], [(2, b"passw")])
+
+    def test_unrecognized_file_is_reinitialized(self):
+        self.path.parent.mkdir(parents=True)
+        self.path.write_bytes(b"something else entirely")
+        history = self._history()
+        self.assertEqual(history.entries(), [])
+        with self.assertLogs("_pydotlib.clipboard_history", "WARNING"):
+            history.append(b"new")
+        self.assertEqual(history.read(1), b"new")
+
+    def test_different_geometry_is_reinitialized(self):
+        self._history(slots=4, data_bytes=64).append(b"old")
+        history = self._history(slots=8, data_bytes=64)
+        self.assertEqual(history.entries(), [])
+        with self.assertLogs("_pydotlib.clipboard_history", "WARNING"):
+            history.append(b"new")
+        self.assertEqual([e.size for e in history.entries()], [3])
+
+
+class CopyRecorderTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.history = ClipboardHistory(self.dir / "history", data_bytes=4096)
+
+    def test_records_what_was_read_from_a_pipe(self):
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b"piped text")
+        os.close(write_fd)
+        with open(read_fd, "rb") as handle:
+            recorder = CopyRecorder(handle, self.history.max_entry)
+            buf = bytearray(4)
+            self.assertEqual(recorder.readinto(buf), 4)
+            self.assertEqual(recorder.read(), b"d text")
+        self.assertIsNone(recorder.start)
+        self.assertTrue(self.history.record(recorder))
+        self.assertEqual(self.history.read(1), b"piped text")
+
+    def test_gives_up_past_the_limit(self):
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b"x" * 20)
+        os.close(write_fd)
+        with open(read_fd, "rb") as handle:
+            recorder = CopyRecorder(handle, 10)
+            recorder.read(8)
+            self.assertEqual(recorder.kept, b"x" * 8)
+            recorder.read(8)
+        self.assertIsNone(recorder.kept)
+        self.assertFalse(self.history.record(recorder))
+
+    def test_rereads_a_regular_file_nothing_was_read_through(self):
+        path = self.dir / "input"
+        path.write_bytes(b"skip:the rest")
+        with open(path, "rb") as handle:
+            handle.seek(5)
+            recorder = CopyRecorder(handle, self.history.max_entry)
+            os.lseek(handle.fileno(), 0, os.SEEK_END)  # e.g. a native tool read it
+            self.assertTrue(self.history.record(recorder))
+        self.assertEqual(self.history.read(1), b"the rest")
+
+    def test_closing_leaves_the_input_open(self):
+        path = self.dir / "input"
+        path.write_bytes(b"data")
+        with open(path, "rb") as handle:
+            recorder = CopyRecorder(handle, self.history.max_entry)
+            self.assertIsInstance(recorder, io.BufferedIOBase)
+            recorder.close()
+            self.assertEqual(handle.read(), b"data")
+
+    def test_large_regular_file_is_skipped(self):
+        path = self.dir / "input"
+        path.write_bytes(b"x" * (self.history.max_entry + 1))
+        with open(path, "rb") as handle:
+            self.assertFalse(
+                self.history.record(CopyRecorder(handle, self.history.max_entry))
+            )
+        self.assertEqual(self.history.entries(), [])
+
+
+class FormatEntryTests(unittest.TestCase):
+    def test_first_line_only(self):
+        line = format_entry(HistoryEntry(3, 0.0, 12), b"hello\nworld\n")
+        self.assertTrue(line.startswith("   3  "))
+        self.assertTrue(line.endswith("       12  hello ..."))
+
+    def test_single_line_with_newline(self):
+        self.assertTrue(format_entry(HistoryEntry(1, 0.0, 4), b"abc\n").endswith("  abc"))
+
+    def test_long_and_unprintable(self):
+        line = format_entry(HistoryEntry(1, 0.0, 500), b"\x1b[31m" + b"y" * 100, width=20)
+        self.assertTrue(line.endswith("  ?[31myyyyyyyyyyyy..."))
+
+
+if __name__ == "__main__":
+    unittest.main()
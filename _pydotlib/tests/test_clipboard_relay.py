@@ -0,0 +1,171 @@
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from _pydotlib import clipboard
+from _pydotlib.clipboard_relay import (
+    RELAY_CHUNK,
+    RELAY_MAX_FRAME,
+    RelayError,
+    RelayServer,
+    RelayUnreachable,
+    read_stream,
+    relay_copy,
+    relay_paste,
+    write_stream,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Runs a relay in its own process, with "clipboard" commands that keep the
+# clipboard in a file.
+SERVER_SCRIPT = """
+import json, sys
+from _pydotlib.clipboard_relay import RelayServer
+path, copy_cmd, paste_cmd = json.loads(sys.argv[1])
+with RelayServer(path, copy_cmd, paste_cmd) as server:
+    print("ready", flush=True)
+    server.serve_forever()
+"""
+
+
+class FramingTests(unittest.TestCase):
+    def test_roundtrip_splits_large_chunks(self):
+        buf = io.BytesIO()
+        data = os.urandom(RELAY_CHUNK * 2 + 5)
+        write_stream(buf, [b"", data, b"tail"])
+        buf.seek(0)
+        frames = list(read_stream(buf))
+        self.assertEqual(b"".join(frames), data + b"tail")
+        self.assertTrue(all(len(f) <= RELAY_CHUNK for f in frames))
+        self.assertEqual(buf.read(), b"")
+
+    def test_truncated_stream(self):
+        buf = io.BytesIO()
+        write_stream(buf, [b"abc"])
+        for cut in (2, 6):
+            with self.assertRaises(RelayError):
+                list(read_stream(io.BytesIO(buf.getvalue()[:cut])))
+
+    def test_oversized_frame_is_rejected(self):
+        header = (RELAY_MAX_FRAME + 1).to_bytes(4, "big")
+        with self.assertRaises(RelayError):
+            list(read_stream(io.BytesIO(header)))
+
+
+class RelayProcessTests(unittest.TestCase):
+    """A relay in a separate process, reached through a socket in a temp dir."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.socket = self.dir / "relay.sock"
+        self.store = self.dir / "clipboard"
+
+    def _start(self, copy_cmd=None, paste_cmd=None):
+        copy_cmd = copy_cmd or [
+            sys.executable,
+            "-c",
+            "import shutil, sys; "
+            f"shutil.copyfileobj(sys.stdin.buffer, open({str(self.store)!r}, 'wb'))",
+        ]
+        paste_cmd = paste_cmd or ["cat", str(self.store)]
+        proc = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                SERVER_SCRIPT,
+                json.dumps([str(self.socket), copy_cmd, paste_cmd]),
+            ],
+            cwd=REPO_ROOT,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        self.addCleanup(proc.wait)
+        self.addCleanup(proc.terminate)
+        self.assertEqual(proc.stdout.readline().strip(), "ready")
+        proc.stdout.close()
+        return proc
+
+    def test_large_copy_and_paste(self):
+        self._start()
+        data = os.urandom(5 * 1024 * 1024 + 3)
+        relay_copy(self.socket, [data[:1000], data[1000:]])
+        self.assertEqual(self.store.read_bytes(), data)
+        self.assertEqual(relay_paste(self.socket), data)
+
+    def test_socket_is_private(self):
+        self._start()
+        self.assertEqual(self.socket.stat().st_mode & 0o777, 0o600)
+
+    def test_clipboard_backend_streams_a_pipe(self):
+        self._start()
+        env = clipboard.detect(
+            {"SSH_TTY": "/dev/pts/1", "CLIPBOARD_RELAY_SOCK": str(self.socket)},
+            system="Linux",
+            release="6.0",
+            which=lambda name: None,
+        )
+        self.assertEqual(clipboard.choose_backend(env, "copy", None), "relay")
+
+        data = b"remote text " * 100_000
+        read_fd, write_fd = os.pipe()
+
+        def write():
+            with open(write_fd, "wb") as out:
+                out.write(data)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        with open(read_fd, "rb") as handle:
+            self.assertEqual(clipboard.copy_file(handle, env), clipboard.EXIT_OK)
+        writer.join()
+        self.assertEqual(clipboard.paste(env), (clipboard.EXIT_OK, data))
+
+    def test_failing_clipboard_command_is_reported(self):
+        self._start(copy_cmd=["false"], paste_cmd=["cat", "/nonexistent"])
+        with self.assertRaisesRegex(RelayError, "false failed"):
+            relay_copy(self.socket, [b"x"])
+        with self.assertRaisesRegex(RelayError, "cat failed"):
+            relay_paste(self.socket)
+
+    def test_nothing_listening(self):
+        with self.assertRaises(RelayUnreachable):
+            relay_paste(self.socket)
+
+
+class RelayServerTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.socket = Path(tmp.name) / "relay.sock"
+
+    def test_replaces_stale_socket(self):
+        stale = socket.socket(socket.AF_UNIX)
+        stale.bind(str(self.socket))
+        stale.close()
+        with RelayServer(self.socket, ["true"], ["true"]):
+            self.assertTrue(self.socket.exists())
+        self.assertFalse(self.socket.exists())
+
+    def test_refuses_live_socket(self):
+        with RelayServer(self.socket, ["true"], ["true"]):
+            with self.assertRaisesRegex(RelayError, "already listening"):
+                RelayServer(self.socket, ["true"], ["true"])
+
+    def test_refuses_non_socket(self):
+        self.socket.write_text("not a socket")
+        with self.assertRaises(RelayError):
+            RelayServer(self.socket, ["true"], ["true"])
+
+
+if __name__ == "__main__":
+    unittest.main()
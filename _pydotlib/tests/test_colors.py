@@ -1,10 +1,29 @@
+import json
 import os
-import subprocess
-import sys
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import patch
 
-from _pydotlib.colors import _get_colors, should_use_colors
+from _pydotlib.colors import (
+    CAPABILITY_CACHE_MAX_ENTRIES,
+    PLAIN,
+    TRANSITION_CACHE_MAX_ENTRIES,
+    Style,
+    StyleRenderer,
+    TerminalCapabilities,
+    _get_colors,
+    capability_cache_path,
+    detect_capabilities,
+    should_use_colors,
+    terminal_capabilities,
+)
+from _pydotlib.terminfo import Terminfo
+from _pydotlib.tests.test_terminfo import compile_entry
+
+
+def _caps(colors: int) -> TerminalCapabilities:
+    return TerminalCapabilities(colors=colors, truecolor=False, hyperlinks=False)
 
 
 class TestShouldUseColors(unittest.TestCase):
@@ -39,17 +58,17 @@ class TestShouldUseColors(unittest.TestCase):
 
     @patch.dict(os.environ, {}, clear=True)
     @patch("sys.stdout.isatty", return_value=True)
-    @patch("subprocess.check_output", return_value=b"256")
+    @patch("_pydotlib.colors.terminal_capabilities", return_value=_caps(256))
     def test_returns_true_when_tty_and_colors_supported(
-        self, mock_subprocess, mock_isatty
+        self, mock_caps, mock_isatty
     ):
         self.assertTrue(should_use_colors())
 
     @patch.dict(os.environ, {}, clear=True)
     @patch("sys.stdout.isatty", return_value=True)
-    @patch("subprocess.check_output", return_value=b"4")
+    @patch("_pydotlib.colors.terminal_capabilities", return_value=_caps(4))
     def test_returns_false_when_tty_but_insufficient_colors(
-        self, mock_subprocess, mock_isatty
+        self, mock_caps, mock_isatty
     ):
         self.assertFalse(should_use_colors())
 
@@ -60,9 +79,9 @@ class TestShouldUseColors(unittest.TestCase):
 
     @patch.dict(os.environ, {}, clear=True)
     @patch("sys.stdout.isatty", return_value=True)
-    @patch("subprocess.check_output", return_value=b"invalid")
-    def test_returns_false_when_tput_returns_invalid(
-        self, mock_subprocess, mock_isatty
+    @patch("_pydotlib.colors.terminal_capabilities", return_value=_caps(0))
+    def test_returns_false_when_terminal_declares_no_colors(
+        self, mock_caps, mock_isatty
     ):
         self.assertFalse(should_use_colors())
 
@@ -71,22 +90,18 @@ class TestShouldUseColors(unittest.TestCase):
         # NO_COLOR should override CLICOLOR
         self.assertFalse(should_use_colors())
 
-    @patch.dict(os.environ, {}, clear=True)
+    @patch.dict(os.environ, {"TERM": "no-such-terminal-xyz"}, clear=True)
     @patch("sys.stdout.isatty", return_value=True)
-    @patch("subprocess.check_output", side_effect=FileNotFoundError("tput"))
-    def test_returns_false_when_tput_not_installed(
-        self, mock_subprocess, mock_isatty
-    ):
+    def test_returns_false_when_no_terminfo_entry(self, mock_isatty):
         self.assertFalse(should_use_colors())
 
     @patch.dict(os.environ, {}, clear=True)
     @patch("sys.stdout.isatty", return_value=True)
-    @patch(
-        "subprocess.check_output",
-        side_effect=subprocess.CalledProcessError(1, ["tput", "colors"]),
-    )
-    def test_returns_false_when_tput_fails(self, mock_subprocess, mock_isatty):
-        self.assertFalse(should_use_colors())
+    @patch("_pydotlib.colors.terminal_capabilities", return_value=_caps(256))
+    @patch("subprocess.check_output")
+    def test_does_not_fork_tput(self, mock_subprocess, mock_caps, mock_isatty):
+        self.assertTrue(should_use_colors())
+        mock_subprocess.assert_not_called()
 
 
 class TestColorsClass(unittest.TestCase):
@@ -112,3 +127,268 @@ class TestColorsClass(unittest.TestCase):
         self.assertEqual(colors.GREEN, "")
         self.assertEqual(colors.BOLD, "")
         self.assertEqual(colors.RESET, "")
+
+
+class TestDetectCapabilities(unittest.TestCase):
+    def _terminfo(self, colors=0, booleans=()):
+        numbers = {"colors": colors} if colors else {}
+        return Terminfo(("test",), frozenset(booleans), numbers, {})
+
+    def test_colors_from_terminfo(self):
+        caps = detect_capabilities(self._terminfo(256), {"TERM": "xterm-256color"})
+        self.assertEqual(caps, TerminalCapabilities(256, False, False))
+
+    def test_truecolor_from_terminfo_flag(self):
+        caps = detect_capabilities(self._terminfo(256, {"Tc"}), {})
+        self.assertTrue(caps.truecolor)
+        self.assertEqual(caps.colors, 1 << 24)
+
+    def test_truecolor_from_colorterm(self):
+        for value in ("truecolor", "24bit"):
+            caps = detect_capabilities(self._terminfo(256), {"COLORTERM": value})
+            self.assertTrue(caps.truecolor)
+
+    def test_no_terminfo(self):
+        self.assertEqual(
+            detect_capabilities(None, {}), TerminalCapabilities(0, False, False)
+        )
+
+    def test_hyperlinks_from_terminal_identity(self):
+        self.assertTrue(detect_capabilities(None, {"TERM_PROGRAM": "WezTerm"}).hyperlinks)
+        self.assertTrue(detect_capabilities(None, {"TERM": "xterm-kitty"}).hyperlinks)
+        self.assertFalse(detect_capabilities(None, {"TERM": "xterm"}).hyperlinks)
+
+
+class TestTerminalCapabilitiesCache(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        root = Path(self._tmpdir.name)
+        self.terminfo_dir = root / "terminfo"
+        self.cache_path = root / "cache" / "terminal-capabilities.json"
+        self.entry = self.terminfo_dir / "x" / "xterm-test"
+        self.entry.parent.mkdir(parents=True)
+        self._install(256)
+        self.env = {"TERM": "xterm-test", "TERMINFO": str(self.terminfo_dir)}
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _install(self, colors, mtime=1_000_000):
+        self.entry.write_bytes(compile_entry("xterm-test", numbers={"colors": colors}))
+        os.utime(self.entry, (mtime, mtime))
+
+    def test_miss_detects_and_writes_cache(self):
+        caps = terminal_capabilities(self.env, self.cache_path)
+
+        self.assertEqual(caps.colors, 256)
+        entries = json.loads(self.cache_path.read_text())
+        self.assertEqual(list(entries.values()), [{"colors": 256, "truecolor": False, "hyperlinks": False}])
+
+    def test_hit_skips_terminfo_parse(self):
+        terminal_capabilities(self.env, self.cache_path)
+
+        with patch("_pydotlib.colors.parse_terminfo") as mock_parse:
+            caps = terminal_capabilities(self.env, self.cache_path)
+
+        mock_parse.assert_not_called()
+        self.assertEqual(caps.colors, 256)
+
+    def test_changed_terminfo_invalidates(self):
+        terminal_capabilities(self.env, self.cache_path)
+        self._install(8, mtime=2_000_000)
+
+        self.assertEqual(terminal_capabilities(self.env, self.cache_path).colors, 8)
+
+    def test_keyed_by_colorterm(self):
+        self.assertFalse(terminal_capabilities(self.env, self.cache_path).truecolor)
+        env = {**self.env, "COLORTERM": "truecolor"}
+        self.assertTrue(terminal_capabilities(env, self.cache_path).truecolor)
+
+    def test_corrupt_cache_is_ignored(self):
+        self.cache_path.parent.mkdir(parents=True)
+        self.cache_path.write_text("{not json")
+
+        self.assertEqual(terminal_capabilities(self.env, self.cache_path).colors, 256)
+        self.assertIsInstance(json.loads(self.cache_path.read_text()), dict)
+
+    def test_unwritable_cache_is_ignored(self):
+        blocker = Path(self._tmpdir.name) / "blocker"
+        blocker.write_text("")
+
+        caps = terminal_capabilities(self.env, blocker / "sub" / "caps.json")
+
+        self.assertEqual(caps.colors, 256)
+
+    def test_entry_count_is_bounded(self):
+        for i in range(CAPABILITY_CACHE_MAX_ENTRIES + 5):
+            env = {**self.env, "TERM_PROGRAM": f"prog{i}"}
+            terminal_capabilities(env, self.cache_path)
+
+        entries = json.loads(self.cache_path.read_text())
+        self.assertEqual(len(entries), CAPABILITY_CACHE_MAX_ENTRIES)
+        self.assertTrue(any("prog20" in key for key in entries))
+        self.assertFalse(any("|prog0|" in key for key in entries))
+
+    def test_unknown_terminal_is_not_cached(self):
+        caps = terminal_capabilities({"TERM": "no-such-terminal-xyz"}, self.cache_path)
+
+        self.assertEqual(caps.colors, 0)
+        self.assertFalse(self.cache_path.exists())
+
+    def test_cache_lives_in_runtime_dir(self):
+        with tempfile.TemporaryDirectory() as runtime_dir:
+            os.chmod(runtime_dir, 0o700)
+            with patch.dict(os.environ, {"XDG_RUNTIME_DIR": runtime_dir}):
+                self.assertEqual(
+                    capability_cache_path(),
+                    Path(runtime_dir) / "dotfiles" / "terminal-capabilities.json",
+                )
+
+    @patch.dict(os.environ, {"XDG_CACHE_HOME": "/tmp/cache"}, clear=True)
+    def test_cache_falls_back_to_cache_dir(self):
+        self.assertEqual(
+            capability_cache_path(),
+            Path("/tmp/cache/dotfiles/terminal-capabilities.json"),
+        )
+
+
+class TestStyle(unittest.TestCase):
+    def test_add_merges_colors_and_attributes(self):
+        merged = Style(fg="red", bold=True) + Style(bg="blue", underline=True)
+
+        self.assertEqual(merged, Style(fg="red", bg="blue", bold=True, underline=True))
+
+    def test_add_right_hand_color_wins(self):
+        self.assertEqual((Style(fg="red") + Style(fg="green")).fg, "green")
+
+
+class TestStyleRenderer(unittest.TestCase):
+    def setUp(self):
+        self.renderer = StyleRenderer(enabled=True, colors=256)
+
+    def test_single_span(self):
+        self.assertEqual(
+            self.renderer.style("hi", Style(fg="red", bold=True)), "\033[1;31mhi\033[0m"
+        )
+
+    def test_plain_span_has_no_escapes(self):
+        self.assertEqual(self.renderer.style("hi", None), "hi")
+        self.assertEqual(self.renderer.style("hi", PLAIN), "hi")
+
+    def test_adjacent_spans_with_same_style_merge(self):
+        bold = Style(bold=True)
+
+        out = self.renderer.render([(bold, "a"), (bold, "b"), (bold, "c")])
+
+        self.assertEqual(out, "\033[1mabc\033[0m")
+
+    def test_equal_styles_merge_even_if_distinct_objects(self):
+        out = self.renderer.render(
+            [(Style(fg="red"), "a"), (Style(fg="red"), "b"), (Style(), "c"), (None, "d")]
+        )
+
+        self.assertEqual(out, "\033[31mab\033[0mcd")
+
+    def test_emits_only_the_delta(self):
+        out = self.renderer.render(
+            [(Style(fg="red", bold=True), "a"), (Style(fg="red"), "b"), (Style(fg="green"), "c")]
+        )
+
+        self.assertEqual(out, "\033[1;31ma\033[22mb\033[32mc\033[0m")
+
+    def test_dropping_bold_keeps_dim(self):
+        out = self.renderer.render(
+            [
+                (Style(fg="red", bold=True, dim=True, underline=True), "a"),
+                (Style(fg="red", dim=True, underline=True), "b"),
+            ]
+        )
+
+        self.assertEqual(out, "\033[1;2;4;31ma\033[22;2mb\033[0m")
+
+    def test_resets_colors_to_default(self):
+        out = self.renderer.render(
+            [
+                (Style(fg="red", bg="blue", bold=True, underline=True), "a"),
+                (Style(bold=True, underline=True), "b"),
+            ]
+        )
+
+        self.assertEqual(out, "\033[1;4;31;44ma\033[39;49mb\033[0m")
+
+    def test_uses_full_reset_when_shorter(self):
+        out = self.renderer.render(
+            [
+                (Style(bold=True, italic=True, underline=True, strike=True), "a"),
+                (Style(fg="red"), "b"),
+            ]
+        )
+
+        self.assertEqual(out, "\033[1;3;4;9ma\033[0;31mb\033[0m")
+
+    def test_returning_to_plain_resets(self):
+        out = self.renderer.render([(Style(fg="red"), "a"), (None, "b")])
+
+        self.assertEqual(out, "\033[31ma\033[0mb")
+
+    def test_skips_empty_spans(self):
+        out = self.renderer.render([(Style(fg="red"), ""), (None, "b")])
+
+        self.assertEqual(out, "b")
+
+    def test_256_and_rgb_colors(self):
+        self.assertEqual(self.renderer.sgr(Style(fg=208)), "\033[38;5;208m")
+        self.assertEqual(self.renderer.sgr(Style(bg=(255, 0, 0))), "\033[48;5;196m")
+        truecolor = StyleRenderer(enabled=True, colors=1 << 24)
+        self.assertEqual(truecolor.sgr(Style(fg=(1, 2, 3))), "\033[38;2;1;2;3m")
+
+    def test_degrades_to_16_colors(self):
+        renderer = StyleRenderer(enabled=True, colors=16)
+
+        self.assertEqual(renderer.sgr(Style(fg=196)), "\033[91m")
+        self.assertEqual(renderer.sgr(Style(fg="bright_red")), "\033[91m")
+
+    def test_rejects_unknown_colors(self):
+        with self.assertRaises(ValueError):
+            self.renderer.sgr(Style(fg="chartreuse"))
+        with self.assertRaises(ValueError):
+            self.renderer.sgr(Style(fg=256))
+
+    def test_transitions_are_cached(self):
+        a, b = Style(fg="red"), Style(fg="green")
+
+        self.renderer.transition(a, b)
+        with patch.object(self.renderer, "_compile_transition") as mock_compile:
+            self.renderer.transition(a, b)
+
+        mock_compile.assert_not_called()
+
+    def test_fresh_styles_do_not_grow_the_caches(self):
+        for _ in range(1000):
+            self.renderer.render([(Style(fg="red"), "x")])
+
+        self.assertEqual(len(self.renderer._transitions), 2)
+        self.assertLessEqual(
+            len(self.renderer._transitions_by_identity), TRANSITION_CACHE_MAX_ENTRIES
+        )
+
+    def test_distinct_styles_do_not_grow_the_caches(self):
+        gradient = [Style(fg=(0, 0, blue)) for blue in range(256)] * 2
+        for prev, style in zip(gradient, gradient[1:]):
+            self.renderer.render([(prev, "x"), (style, "y")])
+
+        self.assertLessEqual(len(self.renderer._params), TRANSITION_CACHE_MAX_ENTRIES)
+        self.assertLessEqual(len(self.renderer._transitions), TRANSITION_CACHE_MAX_ENTRIES)
+
+    def test_disabled_renders_plain_text(self):
+        renderer = StyleRenderer(enabled=False)
+
+        self.assertEqual(renderer.render([(Style(bold=True), "a"), (None, "b")]), "ab")
+        self.assertEqual(renderer.style("x", Style(fg="red")), "x")
+        self.assertEqual(renderer.sgr(Style(fg="red")), "")
+
+    @patch("_pydotlib.colors.terminal_capabilities")
+    def test_forced_color_on_unknown_terminal_assumes_256(self, mock_caps):
+        mock_caps.return_value = TerminalCapabilities(0, False, False)
+
+        self.assertEqual(StyleRenderer(enabled=True).colors, 256)
@@ -0,0 +1,107 @@
+import base64
+import unittest
+
+from _pydotlib.escapes import (
+    KIND_CSI,
+    KIND_DCS,
+    KIND_OSC,
+    MAX_STRING_BYTES,
+    Reply,
+    ReplyParser,
+    parse_replies,
+)
+
+
+def feed_split(data: bytes, *cuts: int) -> list[Reply]:
+    """Feed `data` to one parser in pieces cut at the given offsets."""
+    parser = ReplyParser()
+    replies: list[Reply] = []
+    bounds = [0, *cuts, len(data)]
+    for start, end in zip(bounds, bounds[1:]):
+        replies += parser.feed(data[start:end])
+    return replies
+
+
+class ReplyParserTests(unittest.TestCase):
+    def test_csi(self):
+        self.assertEqual(
+            parse_replies(b"\x1b[?62;22c"), [Reply(KIND_CSI, b"?62;22", b"c")]
+        )
+
+    def test_osc_with_bel_and_st(self):
+        self.assertEqual(
+            parse_replies(b"\x1b]11;rgb:0000/0000/0000\x07\x1b]10;x\x1b\\"),
+            [
+                Reply(KIND_OSC, b"11;rgb:0000/0000/0000"),
+                Reply(KIND_OSC, b"10;x"),
+            ],
+        )
+
+    def test_dcs_ignores_bel(self):
+        # Only OSC accepts BEL as a terminator.
+        self.assertEqual(
+            parse_replies(b"\x1bP>|xterm\x07(1)\x1b\\"),
+            [Reply(KIND_DCS, b">|xterm\x07(1)")],
+        )
+
+    def test_skips_noise_between_replies(self):
+        replies = parse_replies(b"ab\x1b[1;2Rcd\x1b(B\x1b]11;x\x07ef")
+        self.assertEqual([r.kind for r in replies], [KIND_CSI, KIND_OSC])
+
+    def test_esc_inside_string_aborts_it(self):
+        self.assertEqual(
+            parse_replies(b"\x1b]11;cut\x1b[0n"), [Reply(KIND_CSI, b"0", b"n")]
+        )
+
+    def test_invalid_csi_byte_drops_sequence(self):
+        self.assertEqual(
+            parse_replies(b"\x1b[12\x01\x1b[c"), [Reply(KIND_CSI, b"", b"c")]
+        )
+
+    def test_osc_command(self):
+        self.assertEqual(parse_replies(b"\x1b]52;c;\x07")[0].osc_command, 52)
+        self.assertIsNone(parse_replies(b"\x1b]x\x07")[0].osc_command)
+        self.assertIsNone(parse_replies(b"\x1b[c")[0].osc_command)
+
+    def test_every_split_point_gives_the_same_replies(self):
+        data = (
+            b"x\x1b[?1;2c"
+            + b"\x1b]52;c;"
+            + base64.standard_b64encode(b"hello world")
+            + b"\x1b\\"
+            + b"\x1bP1$r0m\x1b\\"
+        )
+        expected = parse_replies(data)
+        self.assertEqual(len(expected), 3)
+        for cut in range(1, len(data)):
+            self.assertEqual(feed_split(data, cut), expected, cut)
+        self.assertEqual(feed_split(data, *range(1, len(data))), expected)
+
+    def test_osc52_payload_is_decoded(self):
+        data = bytes(range(256)) * 10
+        reply = parse_replies(b"\x1b]52;c;" + base64.standard_b64encode(data) + b"\x07")
+        self.assertEqual(reply, [Reply(KIND_OSC, b"52;c;", payload=data)])
+
+    def test_osc52_at_ceiling_in_tty_sized_reads(self):
+        data = bytes(range(256)) * ((MAX_STRING_BYTES - 16) * 3 // 4 // 256)
+        reply = b"\x1b]52;c;" + base64.standard_b64encode(data) + b"\x1b\\"
+        parser = ReplyParser()
+        replies: list[Reply] = []
+        for i in range(0, len(reply), 4096):
+            replies += parser.feed(reply[i : i + 4096])
+        self.assertEqual([r.payload for r in replies], [data])
+
+    def test_osc52_malformed_payload(self):
+        for body in (b"!!!!", b"abc", b"YQ=", b"Y Q=="):
+            (reply,) = parse_replies(b"\x1b]52;c;" + body + b"\x07")
+            self.assertIsNone(reply.payload, body)
+
+    def test_oversized_string_is_dropped(self):
+        parser = ReplyParser(max_string_bytes=16)
+        self.assertEqual(parser.feed(b"\x1b]11;" + b"x" * 20 + b"\x07"), [])
+        # The parser recovers for the next sequence.
+        self.assertEqual(parser.feed(b"\x1b]11;ok\x07"), [Reply(KIND_OSC, b"11;ok")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,7 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from _pydotlib.git import (
+    GitBatch,
     get_repo_root,
     read_git_config,
     read_git_config_file,
@@ -215,3 +216,118 @@ class TestUpdateGitConfigFile(unittest.TestCase):
                 self.assertNotIn("old@example.com", content)
             finally:
                 config_path.unlink()
+
+
+class TestGitBatch(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.repo = Path(self._tmpdir.name)
+        env = {
+            **os.environ,
+            "GIT_AUTHOR_NAME": "Test",
+            "GIT_AUTHOR_EMAIL": "test@example.com",
+            "GIT_COMMITTER_NAME": "Test",
+            "GIT_COMMITTER_EMAIL": "test@example.com",
+        }
+        subprocess.run(["git", "init", "-q"], cwd=self.repo, check=True)
+        (self.repo / "hello.txt").write_text("hello world\n")
+        (self.repo / "empty.txt").write_text("")
+        subprocess.run(["git", "add", "."], cwd=self.repo, check=True)
+        subprocess.run(
+            ["git", "commit", "-q", "-m", "init"], cwd=self.repo, check=True, env=env
+        )
+        self.batch = GitBatch()
+
+    def tearDown(self):
+        self.batch.close()
+        self._tmpdir.cleanup()
+
+    def test_read_returns_blob_content(self):
+        obj = self.batch.read(self.repo, "HEAD:hello.txt")
+
+        self.assertIsNotNone(obj)
+        self.assertEqual(obj.type, "blob")
+        self.assertEqual(obj.size, 12)
+        self.assertEqual(obj.data, b"hello world\n")
+
+    def test_read_empty_blob(self):
+        obj = self.batch.read(self.repo, "HEAD:empty.txt")
+
+        self.assertEqual(obj.size, 0)
+        self.assertEqual(obj.data, b"")
+
+    def test_info_returns_header_without_content(self):
+        obj = self.batch.info(self.repo, "HEAD")
+
+        self.assertEqual(obj.type, "commit")
+        self.assertEqual(len(obj.oid), 40)
+        self.assertIsNone(obj.data)
+
+    def test_missing_object_returns_none(self):
+        self.assertIsNone(self.batch.info(self.repo, "HEAD:nope.txt"))
+        self.assertIsNone(self.batch.read(self.repo, "HEAD:nope.txt"))
+        # The process is still usable after a miss.
+        self.assertEqual(self.batch.read(self.repo, "HEAD:hello.txt").data, b"hello world\n")
+
+    def test_many_preserves_order(self):
+        revs = ["HEAD:hello.txt", "HEAD:nope.txt", "HEAD:empty.txt"] * 200
+
+        results = self.batch.read_many(self.repo, revs)
+
+        self.assertEqual(len(results), len(revs))
+        for rev, obj in zip(revs, results):
+            if rev == "HEAD:nope.txt":
+                self.assertIsNone(obj)
+            else:
+                self.assertEqual(obj.data, (self.repo / rev[5:]).read_bytes())
+
+    def test_concurrent_callers_get_their_own_answers(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        revs = ["HEAD:hello.txt", "HEAD:empty.txt"] * 100
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda rev: self.batch.read(self.repo, rev), revs))
+
+        for rev, obj in zip(revs, results):
+            self.assertEqual(obj.data, (self.repo / rev[5:]).read_bytes())
+
+    def test_reuses_one_process_per_repo_and_mode(self):
+        self.batch.info(self.repo, "HEAD")
+        self.batch.info(self.repo, "HEAD")
+        self.batch.read(self.repo, "HEAD")
+
+        self.assertEqual(len(self.batch._workers), 2)
+
+    def test_rejects_names_with_newlines(self):
+        with self.assertRaises(ValueError):
+            self.batch.info(self.repo, "HEAD\nHEAD")
+
+    def test_close_is_idempotent_and_rejects_new_queries(self):
+        self.batch.info(self.repo, "HEAD")
+        self.batch.close()
+        self.batch.close()
+
+        with self.assertRaises(RuntimeError):
+            self.batch.info(self.repo, "HEAD")
+
+    def test_context_manager_closes(self):
+        with GitBatch() as batch:
+            self.assertEqual(batch.info(self.repo, "HEAD").type, "commit")
+        with self.assertRaises(RuntimeError):
+            batch.info(self.repo, "HEAD")
+
+    def test_replaces_dead_process(self):
+        self.batch.info(self.repo, "HEAD")
+        worker = next(iter(self.batch._workers.values()))
+        worker._proc.kill()
+        worker._proc.wait()
+        with self.assertRaises(RuntimeError):
+            self.batch.info(self.repo, "HEAD")
+
+        self.assertEqual(self.batch.info(self.repo, "HEAD").type, "commit")
+
+    @patch("subprocess.Popen", side_effect=FileNotFoundError("git"))
+    def test_raises_when_git_not_installed(self, mock_popen):
+        with self.assertRaises(RuntimeError) as cm:
+            self.batch.info(self.repo, "HEAD")
+        self.assertIn("not installed", str(cm.exception))
@@ -1,10 +1,13 @@
+import os
 import subprocess
+import tempfile
 import unittest
 from unittest.mock import MagicMock
 
 from _pydotlib.integration_checks import (
     BOOTSTRAP_CHECKS,
     CheckResult,
+    PlannedCheck,
     build_native_checks,
     check_command_output_matches,
     check_command_silent,
@@ -15,6 +18,9 @@ from _pydotlib.integration_checks import (
     check_file_not_exists,
     check_symlink,
     check_tmux_config,
+    compile_checks,
+    parse_batch_output,
+    run_batched,
 )
 
 
@@ -354,3 +360,95 @@ class NativeChecksSmokeTests(unittest.TestCase):
             for check in build_native_checks("/home/u", "/home/u/.dotfiles", platform=platform):
                 result = check(exec_fn)
                 self.assertIsInstance(result, CheckResult)
+
+
+def _local_exec(cmd: list[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(cmd, capture_output=True, text=True, check=False)
+
+
+class BatchedChecksTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        os.symlink("/etc/hosts", f"{self.dir}/link")
+        with open(f"{self.dir}/file", "w") as f:
+            f.write("hello\n")
+        os.mkdir(f"{self.dir}/empty")
+
+    def _suite(self):
+        d = self.dir
+        return [
+            check_symlink(f"{d}/link", "/etc/hosts"),
+            check_symlink(f"{d}/link", "/elsewhere"),
+            check_symlink(f"{d}/file", "/x"),
+            check_dir_exists(d),
+            check_file_not_exists(f"{d}/file"),
+            check_dir_non_empty(f"{d}/empty"),
+            check_file_contains(f"{d}/file", "hello"),
+            check_file_contains(f"{d}/missing", "hello"),
+            check_command_silent(["sh", "-c", "echo 'a b'; printf 'x\ny' >&2"]),
+            check_command_output_matches(["printf", "no newline"], "zz"),
+            check_command_succeeds(["sh", "-c", "echo bad >&2; exit 3"]),
+        ]
+
+    def test_same_results_as_calling_each_check(self):
+        suite = self._suite()
+        exec_fn = MagicMock(side_effect=_local_exec)
+        batched = run_batched(suite, exec_fn)
+        self.assertEqual(exec_fn.call_count, 1)
+        self.assertEqual(batched, [check(_local_exec) for check in suite])
+
+    def test_output_is_recovered_byte_for_byte(self):
+        odd = "line\n\nno trailing newline \u00e9 %s \\n"
+        check = PlannedCheck("odd", [["printf", "%s", odd]], lambda fn: CheckResult("odd", True))
+        nonce = "n0nce"
+        proc = _local_exec(["sh", "-c", compile_checks([check], nonce)])
+        self.assertEqual(parse_batch_output(proc.stdout, nonce), [(0, odd, "")])
+
+    def test_unplanned_checks_and_undeclared_steps_use_exec_fn(self):
+        def plain(exec_fn):
+            return CheckResult("plain", exec_fn(["true"]).returncode == 0)
+
+        def sneaky(exec_fn):
+            exec_fn(["true"])
+            return CheckResult("sneaky", exec_fn(["false"]).returncode == 1)
+
+        exec_fn = MagicMock(side_effect=_local_exec)
+        results = run_batched(
+            [plain, PlannedCheck("sneaky", [["true"]], sneaky)], exec_fn
+        )
+        self.assertTrue(all(r.passed for r in results))
+        self.assertEqual(
+            [c.args[0] for c in exec_fn.call_args_list[1:]], [["true"], ["false"]]
+        )
+
+    def test_incomplete_batch_falls_back_per_check(self):
+        suite = self._suite()[:3]
+
+        def script_exec(cmd):
+            # Cut the output off partway through the second check's steps.
+            proc = _local_exec(cmd)
+            nonce = proc.stdout.split(" ", 1)[0]
+            cut = proc.stdout.index(f"{nonce} 3 ")
+            return subprocess.CompletedProcess(cmd, 124, proc.stdout[:cut], "")
+
+        exec_fn = MagicMock(side_effect=_local_exec)
+        with self.assertLogs("_pydotlib.integration_checks", "WARNING"):
+            results = run_batched(suite, exec_fn, script_exec_fn=script_exec)
+        self.assertEqual(results, [check(_local_exec) for check in suite])
+        # Only the checks the script didn't finish ran on their own: the
+        # second (test -L, readlink) and the third (test -L fails).
+        self.assertEqual(exec_fn.call_count, 3)
+
+    def test_timed_out_step_gets_the_runner_note(self):
+        check = check_command_succeeds(["sleep", "5"])
+        result = run_batched([check], _local_exec, step_timeout=0.2)[0]
+        self.assertFalse(result.passed)
+        self.assertIn("exit 124", result.detail)
+        self.assertIn("<timed out after 0.2s>", result.detail)
+
+    def test_every_builtin_check_is_planned(self):
+        for check in BOOTSTRAP_CHECKS:
+            self.assertIsInstance(check, PlannedCheck)
+            self.assertTrue(check.steps)
@@ -0,0 +1,107 @@
+import random
+import unittest
+
+from _pydotlib.quantize import (
+    ANSI_16,
+    PALETTE_256,
+    TRUECOLOR,
+    _distance,
+    gradient,
+    quantize,
+    quantize_many,
+    rgb_escape,
+    rgb_to_16,
+    rgb_to_256,
+    rgb_to_lab,
+)
+
+
+def exhaustive_256(rgb):
+    lab = rgb_to_lab(rgb)
+    return min(range(16, 256), key=lambda i: _distance(lab, i))
+
+
+class PaletteTests(unittest.TestCase):
+    def test_palette_layout(self):
+        self.assertEqual(len(PALETTE_256), 256)
+        self.assertEqual(PALETTE_256[16], (0, 0, 0))
+        self.assertEqual(PALETTE_256[231], (255, 255, 255))
+        self.assertEqual(PALETTE_256[196], (255, 0, 0))
+        self.assertEqual(PALETTE_256[232], (8, 8, 8))
+        self.assertEqual(PALETTE_256[255], (238, 238, 238))
+
+    def test_lab_white_and_black(self):
+        l, a, b = rgb_to_lab((255, 255, 255))
+        self.assertAlmostEqual(l, 100, places=1)
+        self.assertAlmostEqual(a, 0, places=1)
+        self.assertAlmostEqual(b, 0, places=1)
+        self.assertAlmostEqual(rgb_to_lab((0, 0, 0))[0], 0, places=6)
+
+
+class RgbTo256Tests(unittest.TestCase):
+    def test_cube_and_gray_entries_map_to_themselves(self):
+        for index in range(16, 256):
+            self.assertEqual(rgb_to_256(PALETTE_256[index]), index, PALETTE_256[index])
+
+    def test_near_grays_prefer_gray_ramp(self):
+        self.assertEqual(rgb_to_256((128, 128, 128)), 244)
+        self.assertEqual(rgb_to_256((30, 31, 29)), 234)
+
+    def test_matches_exhaustive_search(self):
+        rng = random.Random(1234)
+        colors = [tuple(rng.randrange(256) for _ in range(3)) for _ in range(2000)]
+
+        matches = sum(rgb_to_256(rgb) == exhaustive_256(rgb) for rgb in colors)
+
+        self.assertGreaterEqual(matches / len(colors), 0.99)
+
+
+class RgbTo16Tests(unittest.TestCase):
+    def test_ansi_entries_map_to_themselves(self):
+        for index, rgb in enumerate(ANSI_16):
+            self.assertEqual(rgb_to_16(rgb), index)
+
+    def test_eight_color_terminals_only_get_the_first_eight(self):
+        self.assertEqual(rgb_to_16((255, 0, 0), colors=8), 1)
+        self.assertEqual(rgb_to_16((255, 255, 255), colors=8), 7)
+
+
+class BatchTests(unittest.TestCase):
+    def test_quantize_many_matches_single_calls(self):
+        colors = [(10, 200, 30), (10, 200, 30), (255, 128, 0), (0, 0, 0)]
+
+        self.assertEqual(quantize_many(colors, 256), [quantize(c, 256) for c in colors])
+        self.assertEqual(quantize_many(colors, 16), [quantize(c, 16) for c in colors])
+
+    def test_gradient_endpoints(self):
+        run = gradient((0, 0, 0), (255, 255, 255), 10, 256)
+
+        self.assertEqual(len(run), 10)
+        self.assertEqual(run[0], 16)
+        self.assertEqual(run[-1], 231)
+
+    def test_gradient_degenerate_lengths(self):
+        self.assertEqual(gradient((1, 2, 3), (4, 5, 6), 0, 256), [])
+        self.assertEqual(gradient((255, 0, 0), (0, 0, 0), 1, 256), [196])
+
+
+class RgbEscapeTests(unittest.TestCase):
+    def test_truecolor_passes_rgb_through(self):
+        self.assertEqual(rgb_escape((1, 2, 3), TRUECOLOR), "\033[38;2;1;2;3m")
+        self.assertEqual(
+            rgb_escape((1, 2, 3), TRUECOLOR, background=True), "\033[48;2;1;2;3m"
+        )
+
+    def test_256_color(self):
+        self.assertEqual(rgb_escape((255, 0, 0), 256), "\033[38;5;196m")
+
+    def test_16_color_uses_bright_codes(self):
+        self.assertEqual(rgb_escape((255, 0, 0), 16), "\033[91m")
+        self.assertEqual(rgb_escape((255, 0, 0), 16, background=True), "\033[101m")
+        self.assertEqual(rgb_escape((205, 0, 0), 16), "\033[31m")
+
+    def test_8_color(self):
+        self.assertEqual(rgb_escape((0, 0, 238), 8, background=True), "\033[44m")
+
+    def test_no_color(self):
+        self.assertEqual(rgb_escape((255, 0, 0), 0), "")
@@ -1,9 +1,49 @@
+import contextlib
+import io
+import shutil
+import subprocess
 import tempfile
+import threading
 import unittest
+import urllib.error
+import urllib.request
 from pathlib import Path
 from unittest.mock import patch
 
-from run_tests import detect_runtime, discover_flavors
+import run_tests
+from _pydotlib.cache import Cache
+from _pydotlib.integration_checks import (
+    check_command_silent,
+    check_command_succeeds,
+    check_tmux_config,
+    run_batched,
+)
+from _pydotlib.timings import KIND_CHECK, RunRecorder
+from run_tests import (
+    BASELINE_LABEL,
+    IMAGE_HASH_LABEL,
+    WARM_LABEL,
+    CheckTiming,
+    FlavorResult,
+    _check_tools,
+    _make_timeout_exec_fn,
+    baseline_key,
+    build_image,
+    detect_runtime,
+    dockerfile_inputs,
+    hermetic_env,
+    image_content_hash,
+    make_bare_repo,
+    discover_flavors,
+    format_phase_table,
+    run_flavors,
+    run_checks,
+    run_runtime,
+    run_pydotlib_tests,
+    run_warm_container_test,
+    serve_files,
+    shard_tests,
+)
 
 
 class DetectRuntimeTests(unittest.TestCase):
@@ -75,3 +115,442 @@ class DiscoverFlavorsTests(unittest.TestCase):
             root = Path(tmpdir)
             self._make_repo(root, ["Dockerfile.alpine", "Dockerfile.bak"])
             self.assertEqual(discover_flavors(root), ["alpine", "bak"])
+
+
+def _completed(returncode: int, stderr: str = "") -> subprocess.CompletedProcess:
+    return subprocess.CompletedProcess(args=[], returncode=returncode, stdout="", stderr=stderr)
+
+
+class RunRuntimeTests(unittest.TestCase):
+    @patch("run_tests.subprocess.run")
+    def test_retries_transient_lock_errors_with_backoff(self, run):
+        run.side_effect = [
+            _completed(125, "Error: database is locked"),
+            _completed(125, "Error: error acquiring lock 3 for container"),
+            _completed(0),
+        ]
+        delays = []
+        with self.assertLogs(level="WARNING"):
+            result = run_runtime(["podman", "run", "x"], sleep=delays.append)
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(delays, [1.0, 2.0])
+
+    @patch("run_tests.subprocess.run", return_value=_completed(125, "Error: no such image"))
+    def test_other_failures_are_returned_immediately(self, run):
+        delays = []
+        self.assertEqual(run_runtime(["podman", "run", "x"], sleep=delays.append).returncode, 125)
+        self.assertEqual(run.call_count, 1)
+        self.assertEqual(delays, [])
+
+    @patch("run_tests.subprocess.run", return_value=_completed(125, "database is locked"))
+    def test_gives_up_after_the_last_attempt(self, run):
+        with self.assertLogs(level="WARNING"):
+            result = run_runtime(["podman", "build"], sleep=lambda _: None)
+        self.assertEqual(result.returncode, 125)
+        self.assertEqual(run.call_count, run_tests.RUNTIME_RETRY_ATTEMPTS)
+
+
+class RunFlavorsTests(unittest.TestCase):
+    def test_runs_concurrently_and_keeps_input_order(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def run_one(runtime, repo_root, flavor, *, timings):
+            barrier.wait()  # deadlocks unless all three run at once
+            timings["build"] = 1.0
+            timings["bootstrap"] = 2.5
+            return flavor != "fedora"
+
+        with self.assertLogs(level="INFO") as logs:
+            results = run_flavors(
+                "podman", Path("/repo"), ["debian", "fedora", "ubuntu"], jobs=3, run_one=run_one
+            )
+        self.assertEqual([r.flavor for r in results], ["debian", "fedora", "ubuntu"])
+        self.assertEqual([r.passed for r in results], [True, False, True])
+        self.assertEqual(results[0].timings, {"build": 1.0, "bootstrap": 2.5})
+        self.assertIn("fedora: FAILED in 3.5s", "\n".join(logs.output))
+
+    def test_crash_is_a_failed_flavor(self):
+        def run_one(runtime, repo_root, flavor, *, timings):
+            raise RuntimeError("boom")
+
+        with self.assertLogs(level="ERROR") as logs:
+            (result,) = run_flavors("docker", Path("/repo"), ["alpine"], run_one=run_one)
+        self.assertFalse(result.passed)
+        self.assertIn("boom", "\n".join(logs.output))
+
+
+class FormatPhaseTableTests(unittest.TestCase):
+    def test_matrix(self):
+        table = format_phase_table(
+            [
+                FlavorResult("debian", True, {"build": 12.04, "checks": 3.0}),
+                FlavorResult("fedora", False, {"build": 1.0}),
+            ]
+        )
+        lines = table.splitlines()
+        self.assertEqual(
+            lines[0].split(), ["flavor", *run_tests.PHASES, "total", "result"]
+        )
+        self.assertEqual(lines[1].split(), ["debian", "12.0s", "-", "-", "-", "-", "3.0s", "15.0s", "pass"])
+        self.assertEqual(lines[2].split()[-2:], ["1.0s", "FAIL"])
+        self.assertEqual(len({len(line) for line in lines[:2]}), 1)
+
+
+class ImageContentHashTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        (self.root / "tests" / "docker").mkdir(parents=True)
+        (self.root / "conf").mkdir()
+        (self.root / "conf" / "a.txt").write_text("a")
+        (self.root / "conf" / "sub").mkdir()
+        (self.root / "conf" / "sub" / "b.txt").write_text("b")
+        (self.root / "setup.sh").write_text("echo hi")
+        (self.root / "unrelated.txt").write_text("x")
+        self.dockerfile = self.root / "tests" / "docker" / "Dockerfile.debian"
+        self.dockerfile.write_text(
+            "FROM debian\n"
+            "COPY --chown=testuser conf \\\n    /home/testuser/conf\n"
+            'ADD ["setup.sh", "/tmp/"]\n'
+            "COPY --from=builder /out /out\n"
+            "ADD https://example.com/x.tar /tmp/\n"
+        )
+
+    def test_inputs(self):
+        self.assertEqual(
+            [p.relative_to(self.root).as_posix() for p in dockerfile_inputs(self.dockerfile, self.root)],
+            ["conf/a.txt", "conf/sub/b.txt", "setup.sh"],
+        )
+
+    def test_copy_dot_is_the_whole_context_minus_dockerignore(self):
+        (self.root / ".git").mkdir()
+        (self.root / ".git" / "HEAD").write_text("ref")
+        (self.root / "conf" / "a.pyc").write_text("junk")
+        (self.root / ".dockerignore").write_text(
+            "# build junk\n.git\n**/*.pyc\nconf/sub\n!conf/sub/b.txt\nunrelated.*\n"
+        )
+        self.dockerfile.write_text("FROM debian\nCOPY . /app\nCOPY ./ /again\n")
+        self.assertEqual(
+            [p.relative_to(self.root).as_posix() for p in dockerfile_inputs(self.dockerfile, self.root)],
+            [
+                ".dockerignore",
+                "conf/a.txt",
+                "conf/sub/b.txt",
+                "setup.sh",
+                "tests/docker/Dockerfile.debian",
+            ],
+        )
+        before = image_content_hash(self.dockerfile, self.root)
+        (self.root / ".git" / "HEAD").write_text("another ref")
+        self.assertEqual(image_content_hash(self.dockerfile, self.root), before)
+
+    def test_dockerfile_specific_ignore_file_wins(self):
+        (self.root / ".dockerignore").write_text("setup.sh\n")
+        (self.root / "tests" / "docker" / "Dockerfile.debian.dockerignore").write_text("conf\n")
+        self.assertEqual(
+            [p.relative_to(self.root).as_posix() for p in dockerfile_inputs(self.dockerfile, self.root)],
+            ["setup.sh"],
+        )
+
+    def test_hash_tracks_copied_files_only(self):
+        before = image_content_hash(self.dockerfile, self.root)
+        (self.root / "unrelated.txt").write_text("changed")
+        self.assertEqual(image_content_hash(self.dockerfile, self.root), before)
+        (self.root / "conf" / "sub" / "b.txt").write_text("changed")
+        self.assertNotEqual(image_content_hash(self.dockerfile, self.root), before)
+
+    def test_hash_tracks_the_dockerfile_and_modes(self):
+        before = image_content_hash(self.dockerfile, self.root)
+        (self.root / "setup.sh").chmod(0o755)
+        after_chmod = image_content_hash(self.dockerfile, self.root)
+        self.assertNotEqual(after_chmod, before)
+        self.dockerfile.write_text(self.dockerfile.read_text() + "RUN true\n")
+        self.assertNotEqual(image_content_hash(self.dockerfile, self.root), after_chmod)
+
+
+class BuildImageCacheTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        (self.root / "tests" / "docker").mkdir(parents=True)
+        self.dockerfile = self.root / "tests" / "docker" / "Dockerfile.debian"
+        self.dockerfile.write_text("FROM debian\n")
+        self.durations = Cache("image-builds", path=self.root / "durations.json")
+        self.hash = image_content_hash(self.dockerfile, self.root)
+
+    def _build(self, label, *, rebuild=False):
+        with patch("run_tests.image_label", return_value=label), patch(
+            "run_tests.run_runtime", return_value=_completed(0)
+        ) as run_runtime:
+            ok = build_image(
+                "docker", self.root, "debian", rebuild=rebuild, durations=self.durations
+            )
+        self.assertTrue(ok)
+        return run_runtime
+
+    def test_builds_with_the_hash_label_and_records_the_duration(self):
+        run_runtime = self._build(None)
+        cmd = run_runtime.call_args.args[0]
+        self.assertIn(f"{IMAGE_HASH_LABEL}={self.hash}", cmd)
+        self.assertIsInstance(
+            self.durations.get(f"docker:dotfiles_debian:{self.hash}"), float
+        )
+
+    def test_matching_label_skips_the_build(self):
+        self.durations.set(f"docker:dotfiles_debian:{self.hash}", 95.25, 3600)
+        with self.assertLogs(level="INFO") as logs:
+            run_runtime = self._build(self.hash)
+        run_runtime.assert_not_called()
+        self.assertIn("saved ~95.2s", "\n".join(logs.output))
+
+    def test_stale_label_or_rebuild_builds(self):
+        self._build("0" * 64).assert_called_once()
+        self._build(self.hash, rebuild=True).assert_called_once()
+
+
+class FakeRuntime:
+    """Answers `subprocess.run` for podman commands and records them."""
+
+    def __init__(self, labels=None, running="true"):
+        self.labels = dict(labels or {})  # (name, label) -> value
+        self.running = running
+        self.calls = []
+
+    def __call__(self, cmd, **kwargs):
+        self.calls.append(cmd)
+        if cmd[2:3] == ["inspect"]:
+            template, name = cmd[4], cmd[5]
+            if "State.Running" in template:
+                return _completed_out(self.running)
+            label = template.split('"')[1]
+            return _completed_out(self.labels.get((name, label), "<no value>"))
+        return _completed(0)
+
+    def verbs(self):
+        return [(cmd[1], cmd[-1] if cmd[1] != "exec" else cmd[2]) for cmd in self.calls]
+
+
+def _completed_out(stdout: str) -> subprocess.CompletedProcess:
+    return subprocess.CompletedProcess(args=[], returncode=0, stdout=stdout + "\n", stderr="")
+
+
+class WarmContainerTestTests(unittest.TestCase):
+    def setUp(self):
+        self.root = Path("/repo")
+        self.image_labels = {("dotfiles_debian", IMAGE_HASH_LABEL): "abc"}
+        patcher = patch("run_tests.run_integration_checks", return_value=True)
+        self.checks = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, runtime):
+        with patch("run_tests.subprocess.run", runtime), self.assertLogs(level="INFO"):
+            key = baseline_key("podman", self.root, "debian")
+            runtime.calls.clear()
+            passed = run_warm_container_test("podman", self.root, "debian")
+        return key, passed
+
+    def test_cold_pool_creates_baseline_and_warm_container(self):
+        runtime = FakeRuntime(self.image_labels)
+        key, passed = self._run(runtime)
+        self.assertTrue(passed)
+        verbs = runtime.verbs()
+        # Baseline: seeded scratch container, committed with its key.
+        self.assertIn(("exec", "dotfiles-test-debian-baseline"), verbs)
+        commit = next(c for c in runtime.calls if c[1] == "commit" and c[-1].endswith(":baseline"))
+        self.assertIn(f"LABEL {BASELINE_LABEL}={key}", commit)
+        # Fan-out from the post-bootstrap snapshot.
+        self.assertIn(("commit", "dotfiles_debian:bootstrapped"), verbs)
+        self.assertEqual(
+            sorted(call.args[1] for call in self.checks.call_args_list),
+            ["dotfiles-test-debian", "dotfiles-test-debian-first-run"],
+        )
+        # The next run's warm container, started last.
+        last_run = [c for c in runtime.calls if c[1] == "run"][-1]
+        self.assertIn("dotfiles-warm-debian", last_run)
+        self.assertIn(f"{WARM_LABEL}={key}", last_run)
+        self.assertIn("dotfiles_debian:baseline", last_run)
+
+    def test_claims_a_current_warm_container(self):
+        runtime = FakeRuntime(self.image_labels)
+        with patch("run_tests.subprocess.run", runtime):
+            key = baseline_key("podman", self.root, "debian")
+        runtime.labels[("dotfiles_debian:baseline", BASELINE_LABEL)] = key
+        runtime.labels[("dotfiles-warm-debian", WARM_LABEL)] = key
+        _, passed = self._run(runtime)
+        self.assertTrue(passed)
+        verbs = runtime.verbs()
+        self.assertIn(("rename", "dotfiles-test-debian"), verbs)
+        self.assertNotIn(("commit", "dotfiles_debian:baseline"), verbs)
+        started = [c[c.index("--name") + 1] for c in runtime.calls if c[1] == "run"]
+        self.assertEqual(started, ["dotfiles-test-debian-first-run", "dotfiles-warm-debian"])
+
+    def test_stale_or_stopped_warm_container_is_replaced(self):
+        for labels, running in (({"dotfiles-warm-debian": "old"}, "true"), ({}, "false")):
+            runtime = FakeRuntime(self.image_labels, running=running)
+            with patch("run_tests.subprocess.run", runtime):
+                key = baseline_key("podman", self.root, "debian")
+            runtime.labels[("dotfiles-warm-debian", WARM_LABEL)] = labels.get(
+                "dotfiles-warm-debian", key
+            )
+            self._run(runtime)
+            verbs = runtime.verbs()
+            self.assertNotIn(("rename", "dotfiles-test-debian"), verbs)
+            self.assertIn(("rm", "dotfiles-warm-debian"), verbs)
+            started = [c[c.index("--name") + 1] for c in runtime.calls if c[1] == "run"]
+            self.assertIn("dotfiles-test-debian", started)
+
+    def test_baseline_key_tracks_image_hash(self):
+        runtime = FakeRuntime(self.image_labels)
+        with patch("run_tests.subprocess.run", runtime):
+            before = baseline_key("podman", self.root, "debian")
+            runtime.labels[("dotfiles_debian", IMAGE_HASH_LABEL)] = "def"
+            self.assertNotEqual(baseline_key("podman", self.root, "debian"), before)
+            runtime.labels.clear()
+            self.assertIsNone(baseline_key("podman", self.root, "debian"))
+
+
+class HermeticTests(unittest.TestCase):
+    def test_serve_files(self):
+        with serve_files({"/a/b.txt": b"hello"}) as base_url:
+            with urllib.request.urlopen(f"{base_url}/a/b.txt", timeout=5) as response:
+                self.assertEqual(response.read(), b"hello")
+            with self.assertRaises(urllib.error.HTTPError) as caught:
+                urllib.request.urlopen(f"{base_url}/missing", timeout=5)
+            caught.exception.close()
+
+    def test_env_is_rooted_in_the_temp_dir(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = hermetic_env(Path(tmp))
+            for name in ("HOME", "XDG_CONFIG_HOME", "XDG_STATE_HOME", "XDG_RUNTIME_DIR"):
+                self.assertTrue(env[name].startswith(tmp), name)
+                self.assertTrue(Path(env[name]).is_dir(), name)
+            self.assertEqual(Path(env["XDG_RUNTIME_DIR"]).stat().st_mode & 0o777, 0o700)
+
+    @unittest.skipUnless(shutil.which("git"), "git not installed")
+    def test_bare_repo_clones_shallow_over_file_url(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            env = hermetic_env(root)
+            repo = root / "git" / "owner" / "repo.git"
+            make_bare_repo(repo, env)
+            subprocess.run(
+                ["git", "clone", "-q", "--depth", "1", repo.as_uri(), str(root / "clone")],
+                env=env,
+                check=True,
+                capture_output=True,
+            )
+            self.assertTrue((root / "clone" / "README").is_file())
+
+    def test_check_tools_looks_through_env(self):
+        check = check_command_silent(["env", "-u", "X", "A=1", "bash", "-lc", "true"])
+        self.assertEqual(_check_tools(check), {"bash"})
+        self.assertEqual(_check_tools(check_tmux_config("/x")), {"tmux"})
+
+
+class RunChecksTimingTests(unittest.TestCase):
+    def test_records_durations_and_applies_timeouts_by_stable_name(self):
+        calls = []
+
+        def exec_fn(cmd, *, timeout=15.0):
+            calls.append((cmd[-1], timeout))
+            return _completed(0 if cmd[-1] != "/tmp/home-123/bad" else 1)
+
+        recorder = RunRecorder()
+        timing = CheckTiming(
+            recorder,
+            "hermetic-linux",
+            timeouts={"`test -e ~/good` succeeds": 2.5},
+            aliases={"/tmp/home-123": "~"},
+        )
+        checks = [
+            check_command_succeeds(["test", "-e", "/tmp/home-123/good"]),
+            check_command_succeeds(["test", "-e", "/tmp/home-123/bad"]),
+        ]
+        with self.assertLogs(level="INFO"):
+            self.assertFalse(run_checks(checks, exec_fn, timing=timing))
+        self.assertEqual(calls, [("/tmp/home-123/good", 2.5), ("/tmp/home-123/bad", 15.0)])
+        self.assertEqual(
+            [(t.kind, t.flavor, t.name, t.passed) for t in recorder.timings],
+            [
+                (KIND_CHECK, "hermetic-linux", "`test -e ~/good` succeeds", True),
+                (KIND_CHECK, "hermetic-linux", "`test -e ~/bad` succeeds", False),
+            ],
+        )
+
+
+class BatchedTimeoutTests(unittest.TestCase):
+    def test_script_timeout_keeps_partial_results_and_falls_back(self):
+        checks = [
+            check_command_succeeds(["echo", "hi"]),
+            check_command_succeeds(["sleep", "5"]),
+        ]
+        with self.assertLogs(level="WARNING"):
+            results = run_batched(
+                checks,
+                _make_timeout_exec_fn([], 0.3),
+                script_exec_fn=_make_timeout_exec_fn([], 0.5),
+            )
+        self.assertEqual([r.passed for r in results], [True, False])
+        self.assertIn("timed out after 0.3s", results[1].detail)
+
+
+class ShardTestsTests(unittest.TestCase):
+    def test_balances_whole_classes_and_keeps_order(self):
+        ids = ["m.A.test_1", "m.A.test_2", "m.B.test_1", "m.C.test_1", "m.C.test_2"]
+        durations = {"m.A.test_1": 1.0, "m.A.test_2": 1.0, "m.B.test_1": 1.5, "m.C.test_1": 0.5}
+        self.assertEqual(
+            shard_tests(ids, durations, 2),
+            [["m.A.test_1", "m.A.test_2"], ["m.B.test_1", "m.C.test_1", "m.C.test_2"]],
+        )
+
+    def test_never_more_shards_than_classes(self):
+        self.assertEqual(
+            shard_tests(["m.A.test_1", "m.A.test_2"], {}, 8), [["m.A.test_1", "m.A.test_2"]]
+        )
+        self.assertEqual(shard_tests([], {}, 4), [])
+
+
+SHARD_FIXTURE = """
+import logging
+import unittest
+
+
+class Passing(unittest.TestCase):
+    def test_ok(self):
+        logging.getLogger().error("not on the console")
+
+    def test_fails(self):
+        self.assertEqual(1, 2)
+
+
+class Other(unittest.TestCase):
+    def test_skipped(self):
+        self.skipTest("no reason")
+
+    def test_errors(self):
+        raise RuntimeError("boom")
+"""
+
+
+class RunPydotlibTestsShardingTests(unittest.TestCase):
+    def test_merges_results_from_worker_processes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tests_dir = Path(tmp)
+            (tests_dir / "test_shard_fixture.py").write_text(SHARD_FIXTURE)
+            recorder = RunRecorder()
+            stdout, stderr = io.StringIO(), io.StringIO()
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                passed = run_pydotlib_tests(recorder=recorder, jobs=2, tests_dir=tests_dir)
+        self.assertFalse(passed)
+        self.assertIn(
+            "Tests run: 4\nSuccesses: 2\nFailures: 1\nErrors: 1\nSkipped: 1", stdout.getvalue()
+        )
+        report = stderr.getvalue()
+        self.assertIn("(2 processes)", report)
+        self.assertIn("FAIL: test_shard_fixture.Passing.test_fails", report)
+        self.assertIn("RuntimeError: boom", report)
+        self.assertIn("FAILED (failures=1, errors=1, skipped=1)", report)
+        self.assertNotIn("not on the console", report)
+        self.assertEqual(len(recorder.timings), 4)
@@ -0,0 +1,110 @@
+import os
+import threading
+import unittest
+
+from _pydotlib.escapes import parse_replies
+from _pydotlib.terminal import (
+    DA1,
+    build_query,
+    parse_color,
+    parse_report,
+    probe,
+)
+
+# What a kitty-like terminal sends back for build_query(("TN", "Ms", "XX")).
+KITTY_REPLIES = (
+    b"\x1bP1$r0;38:2:1:2:3m\x1b\\"
+    b"\x1bP>|kitty(0.35.2)\x1b\\"
+    b"\x1bP1+r544e=787465726d2d6b69747479\x1b\\"
+    b"\x1bP1+r4d73=\x1b\\"
+    b"\x1bP0+r5858\x1b\\"
+    b"\x1b]10;rgb:dddd/dddd/dddd\x1b\\"
+    b"\x1b]11;rgb:0000/0000/0000\x1b\\"
+    b"\x1bP1$r2 q\x1b\\"
+    b"\x1b[?62;52;c"
+)
+
+
+class BuildQueryTests(unittest.TestCase):
+    def test_ends_with_da1_sentinel(self):
+        self.assertTrue(build_query().endswith(DA1))
+
+    def test_encodes_capability_names_as_hex(self):
+        self.assertIn(b"\x1bP+q524742\x1b\\", build_query(["RGB"]))
+
+
+class ParseReportTests(unittest.TestCase):
+    def test_full_report(self):
+        report = parse_report(parse_replies(KITTY_REPLIES), elapsed=0.01)
+        self.assertTrue(report.responded)
+        self.assertEqual(report.attributes, (62, 52))
+        self.assertEqual(report.version, "kitty(0.35.2)")
+        self.assertEqual(report.capabilities, {"TN": "xterm-kitty", "Ms": ""})
+        self.assertEqual(report.foreground, (221, 221, 221))
+        self.assertEqual(report.background, (0, 0, 0))
+        self.assertTrue(report.dark_background)
+        self.assertEqual(report.cursor_style, 2)
+        self.assertTrue(report.truecolor)
+        self.assertTrue(report.clipboard)
+        self.assertFalse(report.sixel)
+
+    def test_da1_only(self):
+        report = parse_report(parse_replies(b"\x1b[?1;2c"))
+        self.assertTrue(report.responded)
+        self.assertIsNone(report.version)
+        self.assertIsNone(report.truecolor)
+        self.assertIsNone(report.dark_background)
+        self.assertFalse(report.clipboard)
+
+    def test_palette_terminal_is_not_truecolor(self):
+        report = parse_report(parse_replies(b"\x1bP1$r0;38;5;16m\x1b\\\x1b[?1c"))
+        self.assertFalse(report.truecolor)
+
+    def test_no_replies(self):
+        self.assertFalse(parse_report([]).responded)
+
+    def test_parse_color(self):
+        self.assertEqual(parse_color("rgb:ffff/8080/0000"), (255, 128, 0))
+        self.assertEqual(parse_color("rgb:f/8/0"), (255, 136, 0))
+        for bad in ("#ffffff", "rgb:ff/ff", "rgb:fffff/0/0", "rgb:zz/0/0"):
+            self.assertIsNone(parse_color(bad), bad)
+
+
+class ProbeTests(unittest.TestCase):
+    def setUp(self):
+        self.master, self.slave = os.openpty()
+        self.addCleanup(os.close, self.master)
+
+    def test_single_round_trip_until_sentinel(self):
+        received = bytearray()
+
+        def terminal():
+            while not received.endswith(DA1):
+                received.extend(os.read(self.master, 4096))
+            # Answer in two reads, split inside a reply.
+            os.write(self.master, KITTY_REPLIES[:50])
+            os.write(self.master, KITTY_REPLIES[50:])
+
+        thread = threading.Thread(target=terminal)
+        thread.start()
+        report = probe(5.0, tty_fd_opener=lambda: self.slave)
+        thread.join()
+
+        self.assertEqual(bytes(received), build_query())
+        self.assertTrue(report.responded)
+        self.assertEqual(report.version, "kitty(0.35.2)")
+        self.assertLess(report.elapsed, 5.0)
+
+    def test_silent_terminal_times_out(self):
+        report = probe(0.05, tty_fd_opener=lambda: self.slave)
+        self.assertFalse(report.responded)
+
+    def test_no_tty(self):
+        def no_tty():
+            raise OSError("no tty")
+
+        self.assertIsNone(probe(tty_fd_opener=no_tty))
+
+
+if __name__ == "__main__":
+    unittest.main()
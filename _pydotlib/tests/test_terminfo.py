@@ -0,0 +1,258 @@
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+from _pydotlib.terminfo import (
+    BOOLEAN_NAMES,
+    MAGIC_32BIT,
+    MAGIC_LEGACY,
+    NUMBER_NAMES,
+    STRING_NAMES,
+    SYSTEM_TERMINFO_DIRS,
+    find_terminfo,
+    load_terminfo,
+    parse_terminfo,
+    terminfo_dirs,
+)
+
+
+def _pad(buf: bytearray) -> None:
+    if len(buf) % 2:
+        buf.append(0)
+
+
+def compile_entry(
+    names: str,
+    booleans: dict[str, bool] | None = None,
+    numbers: dict[str, int] | None = None,
+    strings: dict[str, bytes] | None = None,
+    ext_booleans: dict[str, bool] | None = None,
+    ext_numbers: dict[str, int] | None = None,
+    ext_strings: dict[str, bytes] | None = None,
+    wide: bool = False,
+) -> bytes:
+    """A minimal `tic` stand-in: compile capabilities into term(5) format."""
+    booleans = booleans or {}
+    numbers = numbers or {}
+    strings = strings or {}
+    num_fmt = "<i" if wide else "<h"
+
+    bool_count = max((BOOLEAN_NAMES.index(n) + 1 for n in booleans), default=0)
+    num_count = max((NUMBER_NAMES.index(n) + 1 for n in numbers), default=0)
+    str_count = max((STRING_NAMES.index(n) + 1 for n in strings), default=0)
+
+    table = bytearray()
+    offsets = []
+    for name in STRING_NAMES[:str_count]:
+        if name in strings:
+            offsets.append(len(table))
+            table += strings[name] + b"\0"
+        else:
+            offsets.append(-1)
+
+    name_bytes = names.encode() + b"\0"
+    out = bytearray(
+        struct.pack(
+            "<6h",
+            MAGIC_32BIT if wide else MAGIC_LEGACY,
+            len(name_bytes),
+            bool_count,
+            num_count,
+            str_count,
+            len(table),
+        )
+    )
+    out += name_bytes
+    out += bytes(1 if booleans.get(n) else 0 for n in BOOLEAN_NAMES[:bool_count])
+    _pad(out)
+    for name in NUMBER_NAMES[:num_count]:
+        out += struct.pack(num_fmt, numbers.get(name, -1))
+    for offset in offsets:
+        out += struct.pack("<h", offset)
+    out += table
+
+    if ext_booleans is None and ext_numbers is None and ext_strings is None:
+        return bytes(out)
+
+    ext_booleans = ext_booleans or {}
+    ext_numbers = ext_numbers or {}
+    ext_strings = ext_strings or {}
+    _pad(out)
+
+    ext_table = bytearray()
+    value_offsets = []
+    for value in ext_strings.values():
+        value_offsets.append(len(ext_table))
+        ext_table += value + b"\0"
+    names_table = bytearray()
+    name_offsets = []
+    for name in [*ext_booleans, *ext_numbers, *ext_strings]:
+        name_offsets.append(len(names_table))
+        names_table += name.encode() + b"\0"
+    ext_table += names_table
+
+    out += struct.pack(
+        "<5h",
+        len(ext_booleans),
+        len(ext_numbers),
+        len(ext_strings),
+        len(value_offsets) + len(name_offsets),
+        len(ext_table),
+    )
+    out += bytes(1 if v else 0 for v in ext_booleans.values())
+    _pad(out)
+    for value in ext_numbers.values():
+        out += struct.pack(num_fmt, value)
+    for offset in value_offsets + name_offsets:
+        out += struct.pack("<h", offset)
+    out += ext_table
+    return bytes(out)
+
+
+class ParseTerminfoTests(unittest.TestCase):
+    def test_parses_legacy_entry(self):
+        info = parse_terminfo(
+            compile_entry(
+                "xterm-256color|xterm with 256 colors",
+                booleans={"am": True, "bce": True},
+                numbers={"cols": 80, "colors": 256, "pairs": 32767},
+                strings={"bold": b"\x1b[1m", "setaf": b"\x1b[38;5;%p1%dm"},
+            )
+        )
+
+        self.assertEqual(info.names, ("xterm-256color", "xterm with 256 colors"))
+        self.assertTrue(info.flag("am"))
+        self.assertTrue(info.flag("bce"))
+        self.assertFalse(info.flag("bw"))
+        self.assertEqual(info.colors, 256)
+        self.assertEqual(info.number("cols"), 80)
+        self.assertIsNone(info.number("lines"))
+        self.assertEqual(info.string("bold"), b"\x1b[1m")
+        self.assertEqual(info.string("setaf"), b"\x1b[38;5;%p1%dm")
+        self.assertIsNone(info.string("cup"))
+        self.assertFalse(info.truecolor)
+
+    def test_parses_32bit_numbers(self):
+        info = parse_terminfo(
+            compile_entry("xterm-direct", numbers={"colors": 0x1000000}, wide=True)
+        )
+
+        self.assertEqual(info.colors, 16777216)
+
+    def test_odd_names_and_booleans_are_padded(self):
+        # names (2 bytes incl. NUL) + 1 boolean = 3 bytes -> one pad byte.
+        info = parse_terminfo(
+            compile_entry("x", booleans={"bw": True}, numbers={"colors": 8})
+        )
+
+        self.assertTrue(info.flag("bw"))
+        self.assertEqual(info.colors, 8)
+
+    def test_parses_extended_capabilities(self):
+        info = parse_terminfo(
+            compile_entry(
+                "tmux-256color",
+                numbers={"colors": 256},
+                strings={"bold": b"\x1b[1m"},
+                ext_booleans={"Tc": True, "XT": True},
+                ext_numbers={"U8": 1},
+                ext_strings={"Ss": b"\x1b[%p1%d q", "Se": b"\x1b[2 q"},
+            )
+        )
+
+        self.assertTrue(info.flag("Tc"))
+        self.assertTrue(info.flag("XT"))
+        self.assertEqual(info.number("U8"), 1)
+        self.assertEqual(info.string("Ss"), b"\x1b[%p1%d q")
+        self.assertEqual(info.string("Se"), b"\x1b[2 q")
+        self.assertTrue(info.truecolor)
+
+    def test_extended_rgb_as_number_is_truecolor(self):
+        info = parse_terminfo(
+            compile_entry("xterm-direct", ext_numbers={"RGB": 8}, wide=True)
+        )
+
+        self.assertTrue(info.truecolor)
+
+    def test_missing_colors_reports_zero(self):
+        self.assertEqual(parse_terminfo(compile_entry("dumb")).colors, 0)
+
+    def test_rejects_bad_magic(self):
+        with self.assertRaises(ValueError):
+            parse_terminfo(b"\x00\x00" + b"\x00" * 10)
+
+    def test_rejects_truncated_entry(self):
+        data = compile_entry("xterm", numbers={"colors": 8}, strings={"bold": b"x"})
+        with self.assertRaises(ValueError):
+            parse_terminfo(data[:-3])
+
+
+class FindTerminfoTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _install(self, directory: Path, subdir: str, term: str, colors: int) -> None:
+        (directory / subdir).mkdir(parents=True, exist_ok=True)
+        (directory / subdir / term).write_bytes(
+            compile_entry(term, numbers={"colors": colors})
+        )
+
+    def test_search_order(self):
+        env = {
+            "TERMINFO": "/ti",
+            "HOME": "/home/u",
+            "TERMINFO_DIRS": "/a::/b",
+        }
+
+        dirs = terminfo_dirs(env)
+
+        self.assertEqual(dirs[:3], [Path("/ti"), Path("/home/u/.terminfo"), Path("/a")])
+        self.assertEqual(dirs[3 : 3 + len(SYSTEM_TERMINFO_DIRS)], [Path(d) for d in SYSTEM_TERMINFO_DIRS])
+        self.assertEqual(dirs[3 + len(SYSTEM_TERMINFO_DIRS)], Path("/b"))
+        self.assertEqual(len(dirs), len(set(dirs)))
+
+    def test_terminfo_env_wins_over_home(self):
+        self._install(self.root / "ti", "x", "xterm-test", 256)
+        self._install(self.root / "home" / ".terminfo", "x", "xterm-test", 8)
+        env = {"TERMINFO": str(self.root / "ti"), "HOME": str(self.root / "home")}
+
+        self.assertEqual(load_terminfo("xterm-test", env).colors, 256)
+
+    def test_finds_hex_directory_layout(self):
+        self._install(self.root / "ti", "78", "xterm-test", 88)
+        env = {"TERMINFO": str(self.root / "ti")}
+
+        self.assertEqual(find_terminfo("xterm-test", env), self.root / "ti" / "78" / "xterm-test")
+
+    def test_defaults_to_term_from_env(self):
+        self._install(self.root / "ti", "x", "xterm-test", 16)
+        env = {"TERMINFO": str(self.root / "ti"), "TERM": "xterm-test"}
+
+        self.assertEqual(load_terminfo(env=env).colors, 16)
+
+    def test_returns_none_for_unknown_or_unsafe_terms(self):
+        env = {"TERMINFO": str(self.root)}
+
+        self.assertIsNone(load_terminfo("no-such-terminal-xyz", env))
+        self.assertIsNone(load_terminfo("", env))
+        self.assertIsNone(load_terminfo("../etc/passwd", env))
+
+    def test_returns_none_for_corrupt_entry(self):
+        (self.root / "x").mkdir()
+        (self.root / "x" / "xterm-bad").write_bytes(b"garbage")
+
+        self.assertIsNone(load_terminfo("xterm-bad", {"TERMINFO": str(self.root)}))
+
+    @unittest.skipUnless(
+        find_terminfo("xterm-256color", {}), "no system terminfo for xterm-256color"
+    )
+    def test_reads_system_entry(self):
+        info = load_terminfo("xterm-256color", {})
+
+        self.assertEqual(info.colors, 256)
+        self.assertIn("xterm-256color", info.names)
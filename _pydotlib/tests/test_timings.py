@@ -0,0 +1,143 @@
+import random
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from _pydotlib.timings import (
+    KIND_CHECK,
+    KIND_PHASE,
+    KIND_UNIT,
+    RunRecorder,
+    Timing,
+    TimingDB,
+    adaptive_timeout,
+    adaptive_timeouts,
+    compare,
+    format_comparison,
+    percentile,
+    permutation_p_value,
+    resolve_commit,
+    slowest,
+)
+
+
+class TimingDBTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db = TimingDB(Path(tmp.name) / "state" / "timings.sqlite3")
+
+    def _runs(self, commit, item, durations, *, kind=KIND_UNIT, flavor="", dirty=False):
+        for seconds in durations:
+            self.db.save(commit, [Timing(kind, item, seconds, flavor)], dirty=dirty)
+
+    def test_missing_file_has_no_samples(self):
+        self.assertEqual(self.db.samples(), {})
+        self.assertFalse(self.db.path.exists())
+
+    def test_samples_newest_first_and_filtered(self):
+        recorder = RunRecorder()
+        recorder.add(KIND_PHASE, "bootstrap", 12.5, flavor="debian")
+        recorder.add(KIND_UNIT, "t.test_a", 0.25)
+        self.db.save("aaa", recorder.timings)
+        self._runs("bbb", "t.test_a", [0.5, 0.75])
+        self.assertEqual(
+            self.db.samples(kind=KIND_UNIT), {(KIND_UNIT, "", "t.test_a"): [0.75, 0.5, 0.25]}
+        )
+        self.assertEqual(
+            self.db.samples(flavor="debian"), {(KIND_PHASE, "debian", "bootstrap"): [12.5]}
+        )
+        self.assertEqual(
+            self.db.samples(commit="aaa", kind=KIND_UNIT)[(KIND_UNIT, "", "t.test_a")], [0.25]
+        )
+        self.assertEqual(len(self.db.samples(recent_runs=2)[(KIND_UNIT, "", "t.test_a")]), 2)
+
+    def test_dirty_runs_only_count_without_a_commit(self):
+        self._runs("aaa", "t", [1.0])
+        self._runs("aaa", "t", [9.0], dirty=True)
+        self.assertEqual(self.db.samples(commit="aaa")[(KIND_UNIT, "", "t")], [1.0])
+        self.assertEqual(self.db.samples()[(KIND_UNIT, "", "t")], [9.0, 1.0])
+
+    def test_save_drops_runs_beyond_retention(self):
+        db = TimingDB(self.db.path, retained_runs=2)
+        for seconds in (1.0, 2.0, 3.0):
+            db.save("aaa", [Timing(KIND_UNIT, "t", seconds)])
+        self.assertEqual(db.samples(recent_runs=None)[(KIND_UNIT, "", "t")], [3.0, 2.0])
+
+    def test_slowest_ranks_by_median(self):
+        self._runs("aaa", "fast", [0.1, 0.1, 5.0])
+        self._runs("aaa", "slow", [1.0, 1.0, 1.0])
+        ranked = slowest(self.db, 1)
+        self.assertEqual([(s.name, s.median, s.samples) for s in ranked], [("slow", 1.0, 3)])
+
+    def test_compare_flags_consistent_slowdowns_only(self):
+        self._runs("base", "slower", [1.0, 1.1, 0.9, 1.05, 0.95])
+        self._runs("head", "slower", [1.5, 1.6, 1.4, 1.55, 1.45])
+        self._runs("base", "noisy", [1.0, 2.0, 0.5, 1.5, 1.2])
+        self._runs("head", "noisy", [1.3, 0.6, 2.1, 1.1, 1.6])
+        self._runs("base", "few", [1.0, 1.0])
+        self._runs("head", "few", [9.0, 9.0])
+        results = {c.name: c for c in compare(self.db, "base", "head")}
+        self.assertEqual(set(results), {"slower", "noisy"})
+        self.assertTrue(results["slower"].significant)
+        self.assertLess(results["slower"].p_value, 0.01)
+        self.assertFalse(results["noisy"].significant)
+        table = format_comparison(list(results.values()))
+        self.assertIn("+50%", table)
+        self.assertIn("SLOWER", table)
+
+    def test_adaptive_timeouts_ignore_failed_runs(self):
+        for _ in range(10):
+            self.db.save("aaa", [Timing(KIND_CHECK, "c", 0.5, "hermetic")])
+        self.db.save("aaa", [Timing(KIND_CHECK, "c", 15.0, "hermetic", passed=False)])
+        self.assertEqual(adaptive_timeouts(self.db, KIND_CHECK, "hermetic", 15.0), {"c": 2.0})
+        self.assertEqual(adaptive_timeouts(self.db, KIND_CHECK, "native-linux", 15.0), {})
+
+
+class StatisticsTests(unittest.TestCase):
+    def test_percentile_interpolates(self):
+        self.assertEqual(percentile([1, 2, 3, 4, 5], 50), 3)
+        self.assertEqual(percentile([1, 2], 25), 1.25)
+        self.assertEqual(percentile([7], 99), 7)
+        with self.assertRaises(ValueError):
+            percentile([], 50)
+
+    def test_exact_permutation_p_value(self):
+        # The head split is the most extreme of C(6, 3) = 20.
+        self.assertEqual(permutation_p_value([1, 2, 3], [4, 5, 6]), 1 / 20)
+        self.assertEqual(permutation_p_value([4, 5, 6], [1, 2, 3]), 1.0)
+        self.assertEqual(permutation_p_value([1, 1, 1], [1, 1, 1]), 1.0)
+
+    def test_sampled_permutation_p_value(self):
+        rng = random.Random(1)
+        base = [rng.gauss(1.0, 0.05) for _ in range(30)]
+        head = [rng.gauss(1.2, 0.05) for _ in range(30)]
+        self.assertLess(permutation_p_value(base, head, rounds=2000), 0.01)
+        self.assertGreater(permutation_p_value(head, base, rounds=2000), 0.9)
+
+    def test_adaptive_timeout_is_clamped(self):
+        self.assertEqual(adaptive_timeout([1.0] * 9, 15.0), 15.0)  # too few
+        self.assertEqual(adaptive_timeout([1.0] * 10, 15.0), 3.0)
+        self.assertEqual(adaptive_timeout([0.01] * 10, 15.0), 2.0)
+        self.assertEqual(adaptive_timeout([10.0] * 10, 15.0), 15.0)
+
+
+class ResolveCommitTests(unittest.TestCase):
+    def test_outside_a_repo(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertIsNone(resolve_commit(Path(tmp)))
+
+    def test_resolves_head(self):
+        repo_root = Path(__file__).resolve().parents[2]
+        head = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=repo_root, capture_output=True, text=True
+        ).stdout.strip()
+        if not head:
+            self.skipTest("not a git checkout")
+        self.assertEqual(resolve_commit(repo_root), head)
+        self.assertIsNone(resolve_commit(repo_root, "no-such-ref-anywhere"))
+
+
+if __name__ == "__main__":
+    unittest.main()
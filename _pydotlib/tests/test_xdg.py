@@ -1,9 +1,20 @@
 import os
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
-from _pydotlib.xdg import xdg_cache_dir, xdg_config_dir, xdg_data_dir, xdg_state_dir
+from _pydotlib.xdg import (
+    DEFAULT_CONFIG_DIRS,
+    DEFAULT_DATA_DIRS,
+    XdgDirs,
+    xdg_cache_dir,
+    xdg_config_dir,
+    xdg_data_dir,
+    xdg_dirs,
+    xdg_runtime_dir,
+    xdg_state_dir,
+)
 
 
 class TestXdgConfigDir(unittest.TestCase):
@@ -17,6 +28,11 @@ class TestXdgConfigDir(unittest.TestCase):
         self.assertEqual(xdg_config_dir(), expected)
 
 
+    @patch.dict(os.environ, {"XDG_CONFIG_HOME": "relative/config"})
+    def test_ignores_relative_path(self):
+        self.assertEqual(xdg_config_dir(), Path.home() / ".config")
+
+
 class TestXdgDataDir(unittest.TestCase):
     @patch.dict(os.environ, {"XDG_DATA_HOME": "/custom/data"})
     def test_returns_env_variable_if_set(self):
@@ -48,3 +64,127 @@ class TestXdgCacheDir(unittest.TestCase):
     def test_returns_default_if_env_not_set(self):
         expected = Path.home() / ".cache"
         self.assertEqual(xdg_cache_dir(), expected)
+
+
+class TestXdgRuntimeDir(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.runtime_dir = Path(tmp.name) / "runtime"
+        self.runtime_dir.mkdir(mode=0o700)
+        self.runtime_dir.chmod(0o700)
+
+    def _resolve(self, value: str) -> Path | None:
+        with patch.dict(os.environ, {"XDG_RUNTIME_DIR": value}):
+            return xdg_runtime_dir()
+
+    def test_returns_env_variable_if_set(self):
+        self.assertEqual(self._resolve(str(self.runtime_dir)), self.runtime_dir)
+
+    def test_rejects_group_or_world_accessible_dir(self):
+        for mode in (0o750, 0o701, 0o777):
+            self.runtime_dir.chmod(mode)
+            self.assertIsNone(self._resolve(str(self.runtime_dir)))
+
+    def test_rejects_missing_relative_or_non_directory(self):
+        file_path = self.runtime_dir / "file"
+        file_path.touch(mode=0o700)
+        for value in (str(self.runtime_dir / "missing"), "relative/dir", str(file_path)):
+            self.assertIsNone(self._resolve(value))
+
+    def test_rejects_dir_owned_by_someone_else(self):
+        with patch("os.getuid", return_value=os.getuid() + 1):
+            self.assertIsNone(self._resolve(str(self.runtime_dir)))
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_returns_none_if_env_not_set(self):
+        self.assertIsNone(xdg_runtime_dir())
+
+
+class TestXdgDirs(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.home = self.root / "home"
+
+    def _dirs(self, **env) -> XdgDirs:
+        return XdgDirs({"HOME": str(self.home), **env})
+
+    def test_defaults(self):
+        dirs = self._dirs()
+        self.assertEqual(dirs.config_home, self.home / ".config")
+        self.assertEqual(dirs.data_home, self.home / ".local/share")
+        self.assertEqual(dirs.state_home, self.home / ".local/state")
+        self.assertEqual(dirs.cache_home, self.home / ".cache")
+        self.assertIsNone(dirs.runtime_dir)
+        self.assertEqual(dirs.config_dirs, DEFAULT_CONFIG_DIRS)
+        self.assertEqual(dirs.data_dirs, DEFAULT_DATA_DIRS)
+
+    def test_relative_and_empty_values_are_ignored(self):
+        dirs = self._dirs(
+            XDG_CONFIG_HOME="relative",
+            XDG_DATA_HOME="",
+            XDG_CONFIG_DIRS="relative:/etc/custom::/etc/custom",
+            XDG_DATA_DIRS="only/relative",
+        )
+        self.assertEqual(dirs.config_home, self.home / ".config")
+        self.assertEqual(dirs.data_home, self.home / ".local/share")
+        self.assertEqual(dirs.config_dirs, (Path("/etc/custom"),))
+        self.assertEqual(dirs.data_dirs, DEFAULT_DATA_DIRS)
+
+    def test_snapshot_ignores_later_environment_changes(self):
+        with patch.dict(os.environ, {"XDG_CONFIG_HOME": "/first"}):
+            dirs = XdgDirs()
+            os.environ["XDG_CONFIG_HOME"] = "/second"
+            self.assertEqual(dirs.config_home, Path("/first"))
+
+    def test_find_config_follows_search_path_order(self):
+        user = self.root / "user"
+        system_a, system_b = self.root / "a", self.root / "b"
+        for base in (system_a, system_b):
+            (base / "dotfiles").mkdir(parents=True)
+            (base / "dotfiles" / "weather_location").write_text(base.name)
+        dirs = self._dirs(
+            XDG_CONFIG_HOME=str(user), XDG_CONFIG_DIRS=f"{system_a}:{system_b}"
+        )
+        self.assertEqual(dirs.config_search_path, (user, system_a, system_b))
+        self.assertEqual(
+            dirs.find_config("dotfiles/weather_location"),
+            system_a / "dotfiles" / "weather_location",
+        )
+
+        (user / "dotfiles").mkdir(parents=True)
+        (user / "dotfiles" / "weather_location").write_text("user")
+        # Still the memoized answer until invalidated.
+        self.assertEqual(
+            dirs.find_config("dotfiles/weather_location"),
+            system_a / "dotfiles" / "weather_location",
+        )
+        dirs.invalidate()
+        self.assertEqual(
+            dirs.find_config("dotfiles/weather_location"),
+            user / "dotfiles" / "weather_location",
+        )
+
+    def test_negative_lookups_are_cached(self):
+        dirs = self._dirs(
+            XDG_DATA_HOME=str(self.root / "data"), XDG_DATA_DIRS="/nonexistent"
+        )
+        with patch.object(Path, "exists", return_value=False) as exists:
+            self.assertIsNone(dirs.find_data("missing/file"))
+            calls = exists.call_count
+            self.assertIsNone(dirs.find_data("missing/file"))
+            self.assertEqual(exists.call_count, calls)
+
+    def test_find_rejects_absolute_paths(self):
+        with self.assertRaises(ValueError):
+            self._dirs().find_config("/etc/passwd")
+
+    def test_xdg_dirs_is_shared_until_cleared(self):
+        self.addCleanup(xdg_dirs.cache_clear)
+        xdg_dirs.cache_clear()
+        first = xdg_dirs()
+        self.assertIs(xdg_dirs(), first)
+        xdg_dirs.cache_clear()
+        self.assertIsNot(xdg_dirs(), first)
@@ -0,0 +1,429 @@
+"""History of test-run durations, for regression reports and adaptive timeouts.
+
+`run_tests.py` records how long every unit test, integration check and
+container phase took in one SQLite file,
+`$XDG_STATE_HOME/dotfiles/test-timings.sqlite3`:
+
+    runs     id, commit_sha, dirty, started (epoch seconds)
+    timings  run_id, kind, name, flavor, seconds, passed
+
+`kind` is one of `KIND_UNIT` (name = test id), `KIND_CHECK` (name = check
+name) or `KIND_PHASE` (name = container phase or test tier); `flavor` is
+the container flavor or host tier the item ran under, or "" for unit tests.
+
+From that history `slowest` ranks items by their median, `compare` flags
+items that got slower between two commits (a one-sided permutation test on
+the means, so no distribution is assumed and a handful of runs per commit
+is enough), and `adaptive_timeouts` derives timeouts from p99.
+
+Recording is best-effort: callers treat `sqlite3.Error`/`OSError` as a
+warning, never as a test failure.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import random
+import sqlite3
+import statistics
+import subprocess
+import threading
+import time
+from collections.abc import Generator, Sequence
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from _pydotlib.xdg import xdg_dirs
+
+KIND_UNIT = "unit"
+KIND_CHECK = "check"
+KIND_PHASE = "phase"
+
+# Reports and timeouts look at this many of the newest runs per item.
+RECENT_RUNS = 30
+# `save` drops runs older than the newest `RETAINED_RUNS`, so the file (and
+# every query over it) stays bounded; comparisons need the base commit's
+# runs to still be among them.
+RETAINED_RUNS = 1000
+# A slowdown is flagged when the permutation test's p-value is at most
+# `COMPARE_ALPHA` and the median grew by `COMPARE_MIN_RATIO` and at least
+# `COMPARE_MIN_SECS`; tiny absolute changes are noise however consistent.
+COMPARE_ALPHA = 0.05
+COMPARE_MIN_RATIO = 1.10
+COMPARE_MIN_SECS = 0.005
+COMPARE_MIN_SAMPLES = 3
+# Exact permutation tests up to this many splits, else a seeded sample.
+PERMUTATION_ROUNDS = 10_000
+# Adaptive timeout: `ADAPTIVE_TIMEOUT_FACTOR` x p99 of passing runs, never
+# below `ADAPTIVE_TIMEOUT_FLOOR_SECS` and never above the fixed default,
+# once there are `ADAPTIVE_MIN_SAMPLES` of them.
+ADAPTIVE_TIMEOUT_FACTOR = 3.0
+ADAPTIVE_TIMEOUT_FLOOR_SECS = 2.0
+ADAPTIVE_MIN_SAMPLES = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    commit_sha TEXT NOT NULL,
+    dirty INTEGER NOT NULL,
+    started REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS timings (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    flavor TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    passed INTEGER NOT NULL
+);
+DROP INDEX IF EXISTS timings_item;
+CREATE INDEX IF NOT EXISTS timings_recent ON timings (kind, flavor, name, run_id DESC);
+CREATE INDEX IF NOT EXISTS runs_commit ON runs (commit_sha);
+"""
+
+ItemKey = tuple[str, str, str]  # kind, flavor, name
+
+
+def timings_path() -> Path:
+    return xdg_dirs().state_home / "dotfiles" / "test-timings.sqlite3"
+
+
+def resolve_commit(repo_root: Path, ref: str = "HEAD") -> str | None:
+    """The full sha `ref` names in `repo_root`, or None if git can't say."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"],
+            cwd=repo_root,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def is_dirty(repo_root: Path) -> bool:
+    """Whether tracked files in `repo_root` differ from HEAD."""
+    try:
+        result = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=repo_root,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return False
+    return result.returncode == 0 and bool(result.stdout.strip())
+
+
+@dataclass(frozen=True)
+class Timing:
+    kind: str
+    name: str
+    seconds: float
+    flavor: str = ""
+    passed: bool = True
+
+
+class RunRecorder:
+    """Collects one run's timings in memory; safe to add to from any thread."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._timings: list[Timing] = []
+
+    def add(
+        self, kind: str, name: str, seconds: float, *, flavor: str = "", passed: bool = True
+    ) -> None:
+        with self._lock:
+            self._timings.append(Timing(kind, name, seconds, flavor, passed))
+
+    @property
+    def timings(self) -> list[Timing]:
+        with self._lock:
+            return list(self._timings)
+
+
+@dataclass(frozen=True)
+class ItemStats:
+    kind: str
+    flavor: str
+    name: str
+    median: float
+    p99: float
+    samples: int
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """One item's durations at a base and a head commit."""
+
+    kind: str
+    flavor: str
+    name: str
+    base_median: float
+    head_median: float
+    p_value: float
+
+    @property
+    def ratio(self) -> float:
+        return self.head_median / self.base_median if self.base_median else math.inf
+
+    @property
+    def significant(self) -> bool:
+        return (
+            self.p_value <= COMPARE_ALPHA
+            and self.ratio >= COMPARE_MIN_RATIO
+            and self.head_median - self.base_median >= COMPARE_MIN_SECS
+        )
+
+
+class TimingDB:
+    """The SQLite timing history; every method opens its own connection."""
+
+    def __init__(self, path: Path | None = None, *, retained_runs: int = RETAINED_RUNS) -> None:
+        self.path = path if path is not None else timings_path()
+        self.retained_runs = retained_runs
+
+    def save(
+        self,
+        commit: str,
+        timings: Sequence[Timing],
+        *,
+        dirty: bool = False,
+        started: float | None = None,
+    ) -> int:
+        """Store one run's `timings` under `commit`; returns the run id.
+
+        Runs beyond the newest `retained_runs` are deleted in the same
+        transaction.
+        """
+        with self._connect() as con:
+            cursor = con.execute(
+                "INSERT INTO runs (commit_sha, dirty, started) VALUES (?, ?, ?)",
+                (commit, int(dirty), time.time() if started is None else started),
+            )
+            run_id = cursor.lastrowid
+            assert run_id is not None
+            con.executemany(
+                "INSERT INTO timings (run_id, kind, name, flavor, seconds, passed)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, t.kind, t.name, t.flavor, t.seconds, int(t.passed))
+                    for t in timings
+                ],
+            )
+            cutoff = con.execute(
+                "SELECT id FROM runs ORDER BY id DESC LIMIT 1 OFFSET ?", (self.retained_runs,)
+            ).fetchone()
+            if cutoff is not None:
+                con.execute("DELETE FROM timings WHERE run_id <= ?", cutoff)
+                con.execute("DELETE FROM runs WHERE id <= ?", cutoff)
+        return run_id
+
+    def samples(
+        self,
+        *,
+        kind: str | None = None,
+        flavor: str | None = None,
+        commit: str | None = None,
+        passed_only: bool = False,
+        recent_runs: int | None = RECENT_RUNS,
+    ) -> dict[ItemKey, list[float]]:
+        """Durations per item, newest first, at most `recent_runs` per item.
+
+        Filters on `kind`, `flavor` and `commit` when given. Dirty runs count
+        towards their commit only when `commit` is None.
+        """
+        where = []
+        params: list[object] = []
+        for column, value in (("t.kind", kind), ("t.flavor", flavor), ("r.commit_sha", commit)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if commit is not None:
+            where.append("r.dirty = 0")
+        if passed_only:
+            where.append("t.passed = 1")
+        # Number each item's runs newest first, so the window is applied by
+        # SQLite rather than by streaming every row of the history.
+        query = (
+            "SELECT kind, flavor, name, seconds FROM ("
+            " SELECT t.kind, t.flavor, t.name, t.seconds, ROW_NUMBER() OVER ("
+            "  PARTITION BY t.kind, t.flavor, t.name ORDER BY t.run_id DESC"
+            " ) AS recency FROM timings t JOIN runs r ON r.id = t.run_id"
+            + (" WHERE " + " AND ".join(where) if where else "")
+            + ")"
+        )
+        if recent_runs is not None:
+            query += " WHERE recency <= ?"
+            params.append(recent_runs)
+        query += " ORDER BY kind, flavor, name, recency"
+        found: dict[ItemKey, list[float]] = {}
+        if not self.path.exists():
+            return found
+        with self._connect() as con:
+            for kind_, flavor_, name, seconds in con.execute(query, params):
+                found.setdefault((kind_, flavor_, name), []).append(seconds)
+        return found
+
+    @contextmanager
+    def _connect(self) -> Generator[sqlite3.Connection, None, None]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=10)) as con:
+            con.executescript(_SCHEMA)
+            with con:  # one transaction
+                yield con
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """The `q`-th percentile (0-100) of `values`, linearly interpolated."""
+    if not values:
+        raise ValueError("percentile of no values")
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    low = math.floor(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def permutation_p_value(
+    base: Sequence[float],
+    head: Sequence[float],
+    *,
+    rounds: int = PERMUTATION_ROUNDS,
+    rng: random.Random | None = None,
+) -> float:
+    """One-sided p-value that `head`'s mean exceeds `base`'s by chance.
+
+    Exact over every split of the pooled samples when there are at most
+    `rounds` of them, otherwise estimated from `rounds` random splits.
+    """
+    pooled = [*base, *head]
+    size = len(head)
+    total = sum(pooled)
+    observed = statistics.fmean(head) - statistics.fmean(base)
+    # Float-sum noise must not make the observed split miss itself.
+    threshold = observed - 1e-12 * max(abs(total), 1.0)
+
+    def diff(head_sum: float) -> float:
+        return head_sum / size - (total - head_sum) / len(base)
+
+    if math.comb(len(pooled), size) <= rounds:
+        splits = list(itertools.combinations(pooled, size))
+        hits = sum(diff(sum(split)) >= threshold for split in splits)
+        return hits / len(splits)
+    rng = rng or random.Random(0)
+    hits = sum(diff(sum(rng.sample(pooled, size))) >= threshold for _ in range(rounds))
+    return (hits + 1) / (rounds + 1)
+
+
+def slowest(db: TimingDB, count: int, *, kind: str | None = None) -> list[ItemStats]:
+    """The `count` items with the largest median over their recent runs."""
+    stats = [
+        ItemStats(k, flavor, name, statistics.median(values), percentile(values, 99), len(values))
+        for (k, flavor, name), values in db.samples(kind=kind).items()
+    ]
+    stats.sort(key=lambda s: s.median, reverse=True)
+    return stats[:count]
+
+
+def compare(db: TimingDB, base_commit: str, head_commit: str) -> list[Comparison]:
+    """Items measured at both commits, most slowed-down first.
+
+    Items with fewer than `COMPARE_MIN_SAMPLES` runs on either side are left
+    out: no test can call them significant.
+    """
+    base = db.samples(commit=base_commit)
+    head = db.samples(commit=head_commit)
+    comparisons = []
+    for key in base.keys() & head.keys():
+        if min(len(base[key]), len(head[key])) < COMPARE_MIN_SAMPLES:
+            continue
+        comparisons.append(
+            Comparison(
+                *key,
+                base_median=statistics.median(base[key]),
+                head_median=statistics.median(head[key]),
+                p_value=permutation_p_value(base[key], head[key]),
+            )
+        )
+    comparisons.sort(key=lambda c: c.ratio, reverse=True)
+    return comparisons
+
+
+def adaptive_timeout(
+    samples: Sequence[float],
+    default: float,
+    *,
+    factor: float = ADAPTIVE_TIMEOUT_FACTOR,
+    floor: float = ADAPTIVE_TIMEOUT_FLOOR_SECS,
+    min_samples: int = ADAPTIVE_MIN_SAMPLES,
+) -> float:
+    """`factor` x p99 of `samples`, clamped to [`floor`, `default`].
+
+    `default` until there are `min_samples`: a timeout derived from a few
+    runs would fire on the first slow machine.
+    """
+    if len(samples) < min_samples:
+        return default
+    return min(default, max(floor, factor * percentile(samples, 99)))
+
+
+def adaptive_timeouts(db: TimingDB, kind: str, flavor: str, default: float) -> dict[str, float]:
+    """`adaptive_timeout` for every item of `kind` under `flavor` with history.
+
+    Only passing runs count, so a run that hung until the old timeout
+    doesn't raise the new one.
+    """
+    return {
+        name: adaptive_timeout(values, default)
+        for (_, _, name), values in db.samples(
+            kind=kind, flavor=flavor, passed_only=True
+        ).items()
+    }
+
+
+def _format_rows(rows: list[list[str]], left: int) -> str:
+    """Align `rows`; the first `left` columns left-justified, the rest right."""
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join(
+        "  ".join(
+            cell.ljust(width) if i < left else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        ).rstrip()
+        for row in rows
+    )
+
+
+def format_slowest(stats: Sequence[ItemStats]) -> str:
+    rows = [["kind", "flavor", "name", "median", "p99", "runs"]]
+    rows += [
+        [s.kind, s.flavor or "-", s.name, f"{s.median:.3f}s", f"{s.p99:.3f}s", str(s.samples)]
+        for s in stats
+    ]
+    return _format_rows(rows, 3)
+
+
+def format_comparison(comparisons: Sequence[Comparison]) -> str:
+    rows = [["kind", "flavor", "name", "base", "head", "change", "p", ""]]
+    rows += [
+        [
+            c.kind,
+            c.flavor or "-",
+            c.name,
+            f"{c.base_median:.3f}s",
+            f"{c.head_median:.3f}s",
+            f"{(c.ratio - 1) * 100:+.0f}%",
+            f"{c.p_value:.3f}",
+            "SLOWER" if c.significant else "",
+        ]
+        for c in comparisons
+    ]
+    return _format_rows(rows, 3)
@@ -1,37 +1,163 @@
 import os
+import stat
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
 
+DEFAULT_CONFIG_DIRS = (Path("/etc/xdg"),)
+DEFAULT_DATA_DIRS = (Path("/usr/local/share"), Path("/usr/share"))
+
+
+def _base_dir(env: Mapping[str, str], name: str, default: Path) -> Path:
+    # The spec says relative paths are invalid and must be ignored, which
+    # also covers the common `export XDG_CONFIG_HOME=` (empty) mistake.
+    value = env.get(name)
+    if value and os.path.isabs(value):
+        return Path(value)
+    return default
+
+
+def _search_dirs(
+    env: Mapping[str, str], name: str, default: tuple[Path, ...]
+) -> tuple[Path, ...]:
+    dirs: list[Path] = []
+    for value in env.get(name, "").split(":"):
+        if value and os.path.isabs(value) and Path(value) not in dirs:
+            dirs.append(Path(value))
+    return tuple(dirs) if dirs else default
+
+
+def _runtime_dir(value: str | None) -> Path | None:
+    if not value:
+        return None
+
+    path = Path(value)
+    if not path.is_absolute():
+        return None
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    if (
+        not stat.S_ISDIR(st.st_mode)
+        or st.st_uid != os.getuid()
+        or stat.S_IMODE(st.st_mode) != 0o700
+    ):
+        return None
+    return path
+
 
 def xdg_config_dir() -> Path:
     """Returns the base directory for user-specific config files."""
-    if "XDG_CONFIG_HOME" in os.environ:
-        return Path(os.environ["XDG_CONFIG_HOME"])
-    else:
-        return Path.home().joinpath(".config")
+    return _base_dir(os.environ, "XDG_CONFIG_HOME", Path.home().joinpath(".config"))
 
 
 def xdg_data_dir() -> Path:
     """Returns the base directory for user-specific data files."""
 
-    if "XDG_DATA_HOME" in os.environ:
-        return Path(os.environ["XDG_DATA_HOME"])
-    else:
-        return Path.home().joinpath(".local/share")
+    return _base_dir(os.environ, "XDG_DATA_HOME", Path.home().joinpath(".local/share"))
 
 
 def xdg_state_dir() -> Path:
     """Returns the base directory for user-specific state files."""
 
-    if "XDG_STATE_HOME" in os.environ:
-        return Path(os.environ["XDG_STATE_HOME"])
-    else:
-        return Path.home().joinpath(".local/state")
+    return _base_dir(os.environ, "XDG_STATE_HOME", Path.home().joinpath(".local/state"))
 
 
 def xdg_cache_dir() -> Path:
     """Returns the base directory for user-specific non-essential data files."""
 
-    if "XDG_CACHE_HOME" in os.environ:
-        return Path(os.environ["XDG_CACHE_HOME"])
-    else:
-        return Path.home().joinpath(".cache")
+    return _base_dir(os.environ, "XDG_CACHE_HOME", Path.home().joinpath(".cache"))
+
+
+def xdg_runtime_dir() -> Path | None:
+    """Returns the base directory for user-specific runtime files, if any.
+
+    Unlike the other bases the spec defines no fallback for XDG_RUNTIME_DIR,
+    so this returns None when it isn't set. It also returns None unless the
+    directory is usable as the spec requires: an absolute path to a directory
+    owned by the current user with mode 0700. Anything else (a shared /tmp, a
+    directory left over from `su`, a stale path) could leak or clobber another
+    user's files.
+    """
+
+    return _runtime_dir(os.environ.get("XDG_RUNTIME_DIR"))
+
+
+class XdgDirs:
+    """All XDG base directories, resolved once from an environment snapshot.
+
+    The `xdg_*_dir()` functions re-read `os.environ` on every call; code that
+    resolves many paths (bootstrap, the status scripts) should use the shared
+    `xdg_dirs()` snapshot instead. Values follow the spec's rules: relative
+    paths are ignored, `XDG_CONFIG_DIRS`/`XDG_DATA_DIRS` fall back to their
+    defaults when empty, and the runtime dir is validated as in
+    `xdg_runtime_dir`.
+
+    `find_config`/`find_data` remember their answers, including "not found";
+    call `invalidate()` after creating files they may have looked for.
+    """
+
+    def __init__(self, env: Mapping[str, str] | None = None) -> None:
+        env = dict(os.environ if env is None else env)
+        home = Path(env["HOME"]) if env.get("HOME") else Path.home()
+
+        self.config_home = _base_dir(env, "XDG_CONFIG_HOME", home / ".config")
+        self.data_home = _base_dir(env, "XDG_DATA_HOME", home / ".local/share")
+        self.state_home = _base_dir(env, "XDG_STATE_HOME", home / ".local/state")
+        self.cache_home = _base_dir(env, "XDG_CACHE_HOME", home / ".cache")
+        self.runtime_dir = _runtime_dir(env.get("XDG_RUNTIME_DIR"))
+        self.config_dirs = _search_dirs(env, "XDG_CONFIG_DIRS", DEFAULT_CONFIG_DIRS)
+        self.data_dirs = _search_dirs(env, "XDG_DATA_DIRS", DEFAULT_DATA_DIRS)
+
+        self._found: dict[tuple[str, str], Path | None] = {}
+
+    @property
+    def config_search_path(self) -> tuple[Path, ...]:
+        """Config directories in precedence order, user dir first."""
+        return (self.config_home, *self.config_dirs)
+
+    @property
+    def data_search_path(self) -> tuple[Path, ...]:
+        """Data directories in precedence order, user dir first."""
+        return (self.data_home, *self.data_dirs)
+
+    def find_config(self, relative_path: str | Path) -> Path | None:
+        """First existing `relative_path` along the config search path."""
+        return self._find("config", self.config_search_path, relative_path)
+
+    def find_data(self, relative_path: str | Path) -> Path | None:
+        """First existing `relative_path` along the data search path."""
+        return self._find("data", self.data_search_path, relative_path)
+
+    def invalidate(self) -> None:
+        """Forget the results of earlier `find_config`/`find_data` calls."""
+        self._found.clear()
+
+    def _find(
+        self, kind: str, search_path: tuple[Path, ...], relative_path: str | Path
+    ) -> Path | None:
+        if Path(relative_path).is_absolute():
+            raise ValueError(f"expected a relative path, got {relative_path}")
+
+        key = (kind, str(relative_path))
+        if key not in self._found:
+            self._found[key] = next(
+                (
+                    base / relative_path
+                    for base in search_path
+                    if (base / relative_path).exists()
+                ),
+                None,
+            )
+        return self._found[key]
+
+
+@lru_cache(maxsize=1)
+def xdg_dirs() -> XdgDirs:
+    """The process-wide `XdgDirs` snapshot of `os.environ`, made on first use.
+
+    Tests (or anything else that changes XDG_* variables mid-run) can call
+    `xdg_dirs.cache_clear()` to take a fresh snapshot.
+    """
+    return XdgDirs()
@@ -25,11 +25,11 @@ from _pydotlib.bootstrap import (
     initialize_vim_plugin_manager,
     safe_symlink,
 )
-from _pydotlib.cli import ColoredLogFormatter
-from _pydotlib.xdg import xdg_config_dir, xdg_data_dir, xdg_state_dir
+from _pydotlib.cli import configure_prompts, setup_logging
+from _pydotlib.xdg import xdg_dirs
 
 MY_GITCONFIG_PATH = Path.home() / ".my_gitconfig"
-WEATHER_LOCATION_PATH = xdg_config_dir() / "dotfiles" / "weather_location"
+WEATHER_LOCATION_PATH = xdg_dirs().config_home / "dotfiles" / "weather_location"
 
 
 def apply_dotfile_symlinks(
@@ -69,15 +69,39 @@ def main() -> int:
         type=str,
         help="Location to use for weather-status (e.g. 'Seattle')",
     )
+    args_parser.add_argument(
+        "--log-json",
+        type=Path,
+        metavar="PATH",
+        help="Also append log records to PATH as JSON lines",
+    )
+    args_parser.add_argument(
+        "--answers",
+        type=Path,
+        metavar="PATH",
+        help="JSON/TOML file answering prompts by ID, for unattended runs "
+        "(default: $DOTFILES_ANSWERS)",
+    )
+    args_parser.add_argument(
+        "--transcript",
+        type=Path,
+        metavar="PATH",
+        help="Append every prompt and its answer to PATH as JSON lines "
+        "(default: $DOTFILES_TRANSCRIPT)",
+    )
 
     args = args_parser.parse_args()
 
     # Set up more verbose logging if the user requested it.
-    log_handler = logging.StreamHandler(sys.stdout)
-    log_handler.setFormatter(ColoredLogFormatter())
+    setup_logging(
+        logging.DEBUG if args.verbose else logging.INFO, json_path=args.log_json
+    )
 
-    logging.getLogger().addHandler(log_handler)
-    logging.getLogger().setLevel(logging.DEBUG if args.verbose else logging.INFO)
+    try:
+        configure_prompts(answers_path=args.answers, transcript_path=args.transcript)
+    except (OSError, ValueError) as e:
+        logging.error(f"cannot load answers: {e}")
+        return 1
 
     # Locate the dotfiles checkout by walking up from cwd looking for the
     # `.__dotfiles_root__` marker. No git dependency — the marker is the
@@ -92,12 +116,13 @@ def main() -> int:
 
     # Run installation commands.
     home_dir = Path.home()
+    xdg = xdg_dirs()
 
     create_dirs(
         dry_run=args.dry_run,
         dirs=[
-            xdg_state_dir() / "vim/backups",
-            xdg_state_dir() / "vim/tmp",
+            xdg.state_home / "vim/backups",
+            xdg.state_home / "vim/tmp",
         ],
     )
 
@@ -120,10 +145,10 @@ def main() -> int:
             # Neovim should share most of its configs with vim to reduce duplication since I can't
             # always be sure if neovim is installed on the local machine.
             ("settings/nvim/init.vim", home_dir / ".vimrc"),
-            ("settings/nvim/init.vim", xdg_config_dir() / "nvim/init.vim"),
-            ("settings/nvim/site/plugin", xdg_data_dir() / "nvim/site/plugin"),
-            ("settings/ghostty/config", xdg_config_dir() / "ghostty/config"),
-            ("settings/wezterm/wezterm.lua", xdg_config_dir() / "wezterm/wezterm.lua"),
+            ("settings/nvim/init.vim", xdg.config_home / "nvim/init.vim"),
+            ("settings/nvim/site/plugin", xdg.data_home / "nvim/site/plugin"),
+            ("settings/ghostty/config", xdg.config_home / "ghostty/config"),
+            ("settings/wezterm/wezterm.lua", xdg.config_home / "wezterm/wezterm.lua"),
         ],
     )
 
@@ -132,11 +157,11 @@ def main() -> int:
         urls=[
             (
                 "https://raw.githubusercontent.com/junegunn/vim-plug/master/plug.vim",
-                xdg_data_dir() / "vim/site/autoload/plug.vim",
+                xdg.data_home / "vim/site/autoload/plug.vim",
             ),
             (
                 "https://raw.githubusercontent.com/junegunn/vim-plug/master/plug.vim",
-                xdg_data_dir() / "nvim/site/autoload/plug.vim",
+                xdg.data_home / "nvim/site/autoload/plug.vim",
             ),
         ],
     )
@@ -147,7 +172,7 @@ def main() -> int:
         repos=[
             (
                 "https://github.com/romkatv/powerlevel10k.git",
-                xdg_data_dir() / "powerlevel10k",
+                xdg.data_home / "powerlevel10k",
             ),
         ],
     )
@@ -4,21 +4,62 @@ This script performs testing for the dotfiles repository.
 """
 
 import argparse
+import contextvars
+import dataclasses
+import functools
+import hashlib
+import http.server
+import io
+import json
 import logging
+import multiprocessing
+import os
+import posixpath
+import re
+import shlex
 import shutil
+import sqlite3
+import statistics
 import subprocess
 import sys
+import tempfile
+import threading
+import time
 import unittest
 
+from collections.abc import Callable, Generator, Iterator, Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import cast
 
-from _pydotlib.cli import ColoredLogFormatter
+from _pydotlib.bootstrap import URL_MAP_ENV_VAR
+from _pydotlib.cache import Cache
+from _pydotlib.cli import buffered_step, log_step, setup_logging
 from _pydotlib.integration_checks import (
     BACKUP_SENTINEL,
     BOOTSTRAP_CHECKS,
     Check,
     ExecFn,
     build_native_checks,
+    check_file_contains,
+    run_batched,
+)
+from _pydotlib.timings import (
+    COMPARE_MIN_SAMPLES,
+    KIND_CHECK,
+    KIND_PHASE,
+    KIND_UNIT,
+    RunRecorder,
+    TimingDB,
+    adaptive_timeouts,
+    compare,
+    format_comparison,
+    format_slowest,
+    is_dirty,
+    resolve_commit,
+    slowest,
 )
 
 RUNTIME_AUTO = "auto"
@@ -36,6 +77,35 @@ BOOTSTRAP_TIMEOUT_SECS = 30
 # whose init misbehaved) without false positives.
 CHECK_TIMEOUT_SECS = 15
 
+# Images are labelled with a hash of their Dockerfile and everything it
+# COPYs/ADDs; a build is skipped while an image with the current hash exists.
+IMAGE_HASH_LABEL = "dotfiles.content-hash"
+# How long the last real build of each image took, to report what a skipped
+# build saved. Long-lived: images outlive any reasonable TTL.
+BUILD_DURATION_NAMESPACE = "image-builds"
+BUILD_DURATION_TTL_SECS = 90 * 24 * 3600.0
+_HASH_CHUNK = 1 << 16
+
+# Phases of `run_container_test`, in order; the columns of the --jobs summary.
+PHASES = ("build", "start", "seed", "bootstrap", "rerun", "checks")
+
+# Rootless podman serializes on per-user lock files and a shared storage
+# database, so concurrent `build`/`run` calls can fail with lock errors that
+# succeed on a retry. Only management commands are retried, never `exec`
+# (its stderr belongs to the command under test).
+RUNTIME_RETRY_ATTEMPTS = 4
+RUNTIME_RETRY_BACKOFF_SECS = 1.0
+_TRANSIENT_RUNTIME_ERRORS = (
+    "database is locked",
+    "error acquiring lock",
+    "resource temporarily unavailable",
+    "timed out waiting for lock",
+)
+# Concurrent podman builds contend for the same storage lock and mostly
+# wait on each other anyway; one at a time keeps the flavors' builds from
+# timing out while the rest of their runs overlap.
+_PODMAN_BUILD_LOCK = threading.Lock()
+
 
 def detect_runtime(preferred: str | None = None) -> str:
     """Resolve a usable container runtime.
@@ -101,22 +171,186 @@ def _log_subprocess_failure(
     logging.error("\n".join(parts))
 
 
-def build_image(runtime: str, repo_root: Path, flavor: str) -> bool:
-    """Build the container image for `flavor`. Returns False on failure."""
+def _dockerignore_regex(pattern: str) -> re.Pattern[str]:
+    """Compile one .dockerignore pattern (Go `filepath.Match` syntax plus `**`)."""
+    pattern = posixpath.normpath(pattern.strip("/"))
+    out = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        elif char == "[" and "]" in pattern[i + 1 :]:
+            end = pattern.index("]", i + 1)
+            body = pattern[i + 1 : end]
+            # A negated class still never matches a separator.
+            out.append(f"[^/{body[1:]}]" if body.startswith("^") else f"[{body}]")
+            i = end
+        else:
+            out.append(re.escape(char))
+        i += 1
+    # Matching a directory excludes everything under it.
+    return re.compile("".join(out) + "(?:/.*)?")
+
+
+DockerignoreRules = list[tuple[re.Pattern[str], bool]]
+
+
+def dockerignore_rules(dockerfile_path: Path, context: Path) -> DockerignoreRules:
+    """The (pattern, is exception) rules that keep files out of the build context.
+
+    Read from `<Dockerfile>.dockerignore` if there is one, else from
+    `.dockerignore` in `context`; an empty list if neither exists.
+    """
+    candidates = [
+        dockerfile_path.with_name(dockerfile_path.name + ".dockerignore"),
+        context / ".dockerignore",
+    ]
+    path = next((path for path in candidates if path.is_file()), None)
+    if path is None:
+        return []
+    rules: DockerignoreRules = []
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        exception = line.startswith("!")
+        rules.append((_dockerignore_regex(line.lstrip("!").strip()), exception))
+    return rules
+
+
+def _dockerignored(relative: str, rules: DockerignoreRules) -> bool:
+    ignored = False
+    for regex, exception in rules:  # the last matching rule wins
+        if regex.fullmatch(relative):
+            ignored = not exception
+    return ignored
+
+
+def dockerfile_inputs(dockerfile_path: Path, context: Path) -> list[Path]:
+    """Files under `context` that `dockerfile_path` COPYs or ADDs, sorted.
+
+    Directories are expanded recursively and globs resolved; `.` is the whole
+    context. Files excluded by `dockerignore_rules` aren't sent to the builder
+    and are left out. Sources from another stage (`--from=`) or a URL aren't in
+    the context and are skipped.
+    """
+    text = dockerfile_path.read_text()
+    logical_lines = text.replace("\\\n", " ").splitlines()
+    found: set[Path] = set()
+    for line in logical_lines:
+        words = line.strip().split(None, 1)
+        if len(words) != 2 or words[0].upper() not in ("COPY", "ADD"):
+            continue
+        args = words[1].strip()
+        try:
+            parts = json.loads(args) if args.startswith("[") else shlex.split(args)
+        except ValueError:
+            continue
+        flags = [part for part in parts if part.startswith("--")]
+        if any(flag.startswith("--from") for flag in flags):
+            continue
+        sources = [part for part in parts if not part.startswith("--")][:-1]
+        for source in sources:
+            if "://" in source:
+                continue
+            # Path.glob(".") raises IndexError before Python 3.12.
+            pattern = posixpath.normpath(source.lstrip("/"))
+            matches = [context] if pattern == "." else sorted(context.glob(pattern))
+            for match in matches or [context / pattern]:
+                if match.is_dir():
+                    found.update(p for p in match.rglob("*") if p.is_file())
+                elif match.is_file():
+                    found.add(match)
+    rules = dockerignore_rules(dockerfile_path, context)
+    return sorted(
+        path for path in found if not _dockerignored(path.relative_to(context).as_posix(), rules)
+    )
+
+
+def image_content_hash(dockerfile_path: Path, context: Path) -> str:
+    """sha256 over the Dockerfile and its `dockerfile_inputs`, with paths and modes."""
+    digest = hashlib.sha256()
+    for path in [dockerfile_path, *dockerfile_inputs(dockerfile_path, context)]:
+        digest.update(os.fsencode(path.relative_to(context)) + b"\0")
+        digest.update(b"x" if os.access(path, os.X_OK) else b"-")
+        with path.open("rb") as handle:
+            while chunk := handle.read(_HASH_CHUNK):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def image_label(runtime: str, image_name: str, label: str) -> str | None:
+    """The value of `label` on `image_name`, or None if unset or no such image."""
+    return _inspect_label(runtime, "image", image_name, label)
+
+
+def build_image(
+    runtime: str,
+    repo_root: Path,
+    flavor: str,
+    *,
+    rebuild: bool = False,
+    durations: Cache | None = None,
+) -> bool:
+    """Build the container image for `flavor`. Returns False on failure.
+
+    Skipped when an image labelled with the current `image_content_hash`
+    already exists, unless `rebuild`. The base image isn't part of the
+    hash; `--rebuild` picks up a newer one. `durations` (default: the
+    `BUILD_DURATION_NAMESPACE` cache) remembers real build times so a skip
+    can report what it saved.
+    """
     dockerfile_path = repo_root / "tests" / "docker" / f"Dockerfile.{flavor}"
     if not dockerfile_path.exists():
         logging.error(f"Dockerfile {dockerfile_path} does not exist")
         return False
 
     image_name = format_image_name(flavor)
-    try:
-        result = subprocess.run(
-            [runtime, "build", "-f", str(dockerfile_path), "-t", image_name, str(repo_root)],
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=BUILD_TIMEOUT_SECS,
+    content_hash = image_content_hash(dockerfile_path, repo_root)
+    if durations is None:
+        durations = Cache(BUILD_DURATION_NAMESPACE)
+    duration_key = f"{runtime}:{image_name}:{content_hash}"
+
+    if not rebuild and image_label(runtime, image_name, IMAGE_HASH_LABEL) == content_hash:
+        saved = durations.get(duration_key)
+        logging.info(
+            f"{image_name} is up to date (content hash {content_hash[:12]}), skipping build"
+            + (f"; saved ~{saved:.1f}s" if isinstance(saved, (int, float)) else "")
         )
+        return True
+
+    started = time.monotonic()
+    try:
+        with _PODMAN_BUILD_LOCK if runtime == "podman" else _no_lock():
+            result = run_runtime(
+                [
+                    runtime,
+                    "build",
+                    "-f",
+                    str(dockerfile_path),
+                    "-t",
+                    image_name,
+                    "--label",
+                    f"{IMAGE_HASH_LABEL}={content_hash}",
+                    str(repo_root),
+                ],
+                timeout=BUILD_TIMEOUT_SECS,
+            )
     except subprocess.TimeoutExpired as e:
         _log_subprocess_failure(
             f"{runtime} build for {image_name} timed out after {BUILD_TIMEOUT_SECS}s",
@@ -131,9 +365,51 @@ def build_image(runtime: str, repo_root: Path, flavor: str) -> bool:
             result.stderr,
         )
         return False
+    durations.set(duration_key, time.monotonic() - started, BUILD_DURATION_TTL_SECS)
     return True
 
 
+@contextmanager
+def _no_lock() -> Generator[None, None, None]:
+    yield
+
+
+def _is_transient_runtime_error(stderr: str | None) -> bool:
+    text = (stderr or "").lower()
+    return any(pattern in text for pattern in _TRANSIENT_RUNTIME_ERRORS)
+
+
+def run_runtime(
+    cmd: list[str],
+    *,
+    timeout: float | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> subprocess.CompletedProcess:
+    """`subprocess.run` a container-runtime management command.
+
+    Retries with exponential backoff while it fails with a transient lock
+    error (see `_TRANSIENT_RUNTIME_ERRORS`); any other result is returned
+    as-is. `subprocess.TimeoutExpired` propagates.
+    """
+    for attempt in range(1, RUNTIME_RETRY_ATTEMPTS + 1):
+        result = subprocess.run(
+            cmd, capture_output=True, text=True, check=False, timeout=timeout
+        )
+        if (
+            result.returncode == 0
+            or attempt == RUNTIME_RETRY_ATTEMPTS
+            or not _is_transient_runtime_error(result.stderr)
+        ):
+            return result
+        delay = RUNTIME_RETRY_BACKOFF_SECS * 2 ** (attempt - 1)
+        logging.warning(
+            f"{' '.join(cmd[:2])} hit a transient error, retrying in {delay:g}s: "
+            f"{result.stderr.strip().splitlines()[-1]}"
+        )
+        sleep(delay)
+    raise AssertionError("unreachable")
+
+
 def remove_container(runtime: str, container_name: str) -> None:
     """Force-remove a container if it exists. Never raises."""
     subprocess.run(
@@ -178,34 +454,101 @@ def run_exec(
     return True
 
 
-def run_container_test(runtime: str, repo_root: Path, flavor: str) -> bool:
-    """Build the image, start a container, run bootstrap then verify; always clean up."""
-    if not build_image(runtime, repo_root, flavor):
-        return False
+@contextmanager
+def _timed(timings: dict[str, float] | None, phase: str) -> Generator[None, None, None]:
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[phase] = time.monotonic() - start
+
+
+# Pre-existing user content seeded into ~/.bashrc so bootstrap has something
+# to back up. The .bashrc.ORIGINAL check in BOOTSTRAP_CHECKS verifies
+# safe_symlink() preserved this content before symlinking — the "bootstrap
+# never destroys user data" invariant.
+SEED_CMD = ["bash", "-c", f"echo '{BACKUP_SENTINEL}' > /home/testuser/.bashrc"]
+BOOTSTRAP_CMD = [
+    "bash",
+    "-c",
+    (
+        "cd /home/testuser/.dotfiles && "
+        "python3 bootstrap.py -v "
+        "--git-name 'Testy McTestFace' "
+        "--git-email 'testy@test.com' "
+        "--weather-location 'Seattle' "
+        "< /dev/null"
+    ),
+]
+
+# --warm-pool state. The baseline is the image plus the seeded ~/.bashrc,
+# committed once per image hash; a warm container is one already started
+# from it, left running by the previous run for the next one to claim. Both
+# are labelled with a key covering everything they were made from, so stale
+# ones are never reused.
+BASELINE_LABEL = "dotfiles.baseline"
+WARM_LABEL = "dotfiles.warm"
+
+
+def format_baseline_image(flavor: str) -> str:
+    return f"{format_image_name(flavor)}:baseline"
+
+
+def format_snapshot_image(flavor: str) -> str:
+    return f"{format_image_name(flavor)}:bootstrapped"
 
-    container_name = format_container_name(flavor)
-    image_name = format_image_name(flavor)
-    logging.info(f"Running {flavor} in {container_name} via {runtime}")
 
-    # Defensive: nuke any stale container from a previous crashed run before starting.
-    remove_container(runtime, container_name)
+def format_warm_container_name(flavor: str) -> str:
+    return f"dotfiles-warm-{flavor}"
 
-    create = subprocess.run(
+
+def _inspect_label(runtime: str, kind: str, name: str, label: str) -> str | None:
+    result = subprocess.run(
+        [
+            runtime,
+            kind,
+            "inspect",
+            "--format",
+            f'{{{{ index .Config.Labels "{label}" }}}}',
+            name,
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    value = result.stdout.strip()
+    if result.returncode != 0 or value in ("", "<no value>"):
+        return None
+    return value
+
+
+def start_container(
+    runtime: str,
+    container_name: str,
+    image: str,
+    repo_root: Path,
+    *,
+    labels: dict[str, str] | None = None,
+) -> bool:
+    """`<runtime> run -d` an idle container from `image` with the repo mounted."""
+    label_args = [
+        arg for key, value in (labels or {}).items() for arg in ("--label", f"{key}={value}")
+    ]
+    create = run_runtime(
         [
             runtime,
             "run",
             "-d",
             "--name",
             container_name,
+            *label_args,
             "-v",
             f"{repo_root}:/home/testuser/.dotfiles:ro",
-            image_name,
+            image,
             "sleep",
             "infinity",
-        ],
-        capture_output=True,
-        text=True,
-        check=False,
+        ]
     )
     if create.returncode != 0:
         _log_subprocess_failure(
@@ -214,46 +557,151 @@ def run_container_test(runtime: str, repo_root: Path, flavor: str) -> bool:
             create.stderr,
         )
         return False
+    return True
+
+
+def snapshot_container(
+    runtime: str, container_name: str, image: str, *, labels: dict[str, str] | None = None
+) -> bool:
+    """Commit `container_name`'s filesystem as `image`, leaving it running."""
+    change_args = [
+        arg
+        for key, value in (labels or {}).items()
+        for arg in ("--change", f"LABEL {key}={value}")
+    ]
+    result = run_runtime([runtime, "commit", *change_args, container_name, image])
+    if result.returncode != 0:
+        _log_subprocess_failure(
+            f"{runtime} commit of {container_name} failed (exit {result.returncode})",
+            result.stdout,
+            result.stderr,
+        )
+        return False
+    return True
+
+
+def baseline_key(runtime: str, repo_root: Path, flavor: str) -> str | None:
+    """What the baseline for `flavor` must be made from, or None without an image."""
+    content_hash = image_label(runtime, format_image_name(flavor), IMAGE_HASH_LABEL)
+    if content_hash is None:
+        return None
+    digest = hashlib.sha256()
+    for part in (content_hash, *SEED_CMD, os.fspath(repo_root.resolve())):
+        digest.update(part.encode() + b"\0")
+    return digest.hexdigest()
+
 
+def ensure_baseline(runtime: str, repo_root: Path, flavor: str, key: str) -> bool:
+    """Commit a seeded container as the baseline image unless it's current."""
+    baseline = format_baseline_image(flavor)
+    if _inspect_label(runtime, "image", baseline, BASELINE_LABEL) == key:
+        return True
+    logging.info(f"creating baseline snapshot {baseline}")
+    scratch = f"{format_container_name(flavor)}-baseline"
+    remove_container(runtime, scratch)
+    if not start_container(runtime, scratch, format_image_name(flavor), repo_root):
+        return False
     try:
-        # Seed pre-existing user content in ~/.bashrc so bootstrap has
-        # something to back up. The .bashrc.ORIGINAL check in BOOTSTRAP_CHECKS
-        # verifies safe_symlink() preserved this content before symlinking —
-        # the "bootstrap never destroys user data" invariant.
-        seed_cmd = [
-            "bash",
-            "-c",
-            f"echo '{BACKUP_SENTINEL}' > /home/testuser/.bashrc",
-        ]
-        if not run_exec(
+        return run_exec(
             runtime,
-            container_name,
-            seed_cmd,
+            scratch,
+            SEED_CMD,
             timeout=10,
             label="seed pre-bootstrap ~/.bashrc (backup test)",
-        ):
-            return False
+        ) and snapshot_container(runtime, scratch, baseline, labels={BASELINE_LABEL: key})
+    finally:
+        remove_container(runtime, scratch)
 
-        bootstrap_cmd = [
-            "bash",
-            "-c",
-            (
-                "cd /home/testuser/.dotfiles && "
-                "python3 bootstrap.py -v "
-                "--git-name 'Testy McTestFace' "
-                "--git-email 'testy@test.com' "
-                "--weather-location 'Seattle' "
-                "< /dev/null"
-            ),
-        ]
-        if not run_exec(
-            runtime,
-            container_name,
-            bootstrap_cmd,
-            timeout=BOOTSTRAP_TIMEOUT_SECS,
-            label="bootstrap.py",
-        ):
+
+def claim_warm_container(runtime: str, flavor: str, key: str) -> bool:
+    """Rename a current warm container to the test container's name.
+
+    A warm container from another baseline, or one that stopped, is removed
+    instead.
+    """
+    warm = format_warm_container_name(flavor)
+    if _inspect_label(runtime, "container", warm, WARM_LABEL) != key:
+        remove_container(runtime, warm)
+        return False
+    running = subprocess.run(
+        [runtime, "container", "inspect", "--format", "{{ .State.Running }}", warm],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if running.stdout.strip() != "true" or run_runtime(
+        [runtime, "rename", warm, format_container_name(flavor)]
+    ).returncode != 0:
+        remove_container(runtime, warm)
+        return False
+    logging.info(f"claimed warm container {warm}")
+    return True
+
+
+def replenish_warm_container(runtime: str, repo_root: Path, flavor: str, key: str) -> None:
+    """Start the next run's warm container from the baseline. Never raises."""
+    warm = format_warm_container_name(flavor)
+    remove_container(runtime, warm)
+    try:
+        start_container(
+            runtime, warm, format_baseline_image(flavor), repo_root, labels={WARM_LABEL: key}
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logging.warning(f"could not start warm container {warm}: {e}")
+
+
+def run_container_test(
+    runtime: str,
+    repo_root: Path,
+    flavor: str,
+    *,
+    timings: dict[str, float] | None = None,
+    rebuild: bool = False,
+    warm: bool = False,
+) -> bool:
+    """Build the image, start a container, run bootstrap then verify; always clean up.
+
+    If `timings` is given, each phase that ran (see `PHASES`) is recorded in
+    it as seconds. `rebuild` is passed to `build_image`. `warm` switches to
+    `run_warm_container_test`.
+    """
+    with _timed(timings, "build"):
+        if not build_image(runtime, repo_root, flavor, rebuild=rebuild):
             return False
+    if warm:
+        return run_warm_container_test(runtime, repo_root, flavor, timings=timings)
+
+    container_name = format_container_name(flavor)
+    image_name = format_image_name(flavor)
+    logging.info(f"Running {flavor} in {container_name} via {runtime}")
+
+    with _timed(timings, "start"):
+        # Defensive: nuke any stale container from a previous crashed run before starting.
+        remove_container(runtime, container_name)
+        started = start_container(runtime, container_name, image_name, repo_root)
+    if not started:
+        return False
+
+    try:
+        with _timed(timings, "seed"):
+            if not run_exec(
+                runtime,
+                container_name,
+                SEED_CMD,
+                timeout=10,
+                label="seed pre-bootstrap ~/.bashrc (backup test)",
+            ):
+                return False
+
+        with _timed(timings, "bootstrap"):
+            if not run_exec(
+                runtime,
+                container_name,
+                BOOTSTRAP_CMD,
+                timeout=BOOTSTRAP_TIMEOUT_SECS,
+                label="bootstrap.py",
+            ):
+                return False
 
         # Idempotency: re-running bootstrap on an already-bootstrapped tree
         # must complete cleanly. Catches the family of "symlink already
@@ -261,62 +709,300 @@ def run_container_test(runtime: str, repo_root: Path, flavor: str) -> bool:
         # and "interactive prompt fires on re-run" bugs. CLI args still apply
         # on the second run, so configure_vcs_author won't re-prompt.
         # Per CLAUDE.md "Migration / backwards-compat policy".
-        if not run_exec(
-            runtime,
-            container_name,
-            bootstrap_cmd,
-            timeout=BOOTSTRAP_TIMEOUT_SECS,
-            label="bootstrap.py (re-run, idempotency)",
-        ):
+        with _timed(timings, "rerun"):
+            if not _run_rerun(runtime, container_name):
+                return False
+
+        with _timed(timings, "checks"):
+            return run_integration_checks(runtime, container_name)
+    finally:
+        remove_container(runtime, container_name)
+
+
+def _run_rerun(runtime: str, container_name: str) -> bool:
+    return run_exec(
+        runtime,
+        container_name,
+        BOOTSTRAP_CMD,
+        timeout=BOOTSTRAP_TIMEOUT_SECS,
+        label="bootstrap.py (re-run, idempotency)",
+    )
+
+
+def run_warm_container_test(
+    runtime: str,
+    repo_root: Path,
+    flavor: str,
+    *,
+    timings: dict[str, float] | None = None,
+) -> bool:
+    """`run_container_test` from snapshots, for repeated runs (`--warm-pool`).
+
+    The container comes from the warm pool, or is started from the baseline
+    snapshot (already seeded), so "start" is a rename and "seed" is skipped.
+    After the first bootstrap the container is committed, and from that
+    snapshot two branches run at once: the idempotency re-run followed by
+    the checks, as in the cold path, and the checks against the first-run
+    state in a second container. Afterwards a fresh warm container is
+    started for the next run.
+    """
+    container_name = format_container_name(flavor)
+    first_run_name = f"{container_name}-first-run"
+    logging.info(f"Running {flavor} in {container_name} via {runtime} (warm pool)")
+
+    with _timed(timings, "start"):
+        key = baseline_key(runtime, repo_root, flavor)
+        if key is None or not ensure_baseline(runtime, repo_root, flavor, key):
             return False
+        if not claim_warm_container(runtime, flavor, key):
+            remove_container(runtime, container_name)
+            baseline = format_baseline_image(flavor)
+            if not start_container(runtime, container_name, baseline, repo_root):
+                return False
 
-        return run_integration_checks(runtime, container_name)
+    try:
+        with _timed(timings, "bootstrap"):
+            if not run_exec(
+                runtime,
+                container_name,
+                BOOTSTRAP_CMD,
+                timeout=BOOTSTRAP_TIMEOUT_SECS,
+                label="bootstrap.py",
+            ):
+                return False
+            snapshot = format_snapshot_image(flavor)
+            remove_container(runtime, first_run_name)
+            if not (
+                snapshot_container(runtime, container_name, snapshot)
+                and start_container(runtime, first_run_name, snapshot, repo_root)
+            ):
+                return False
+
+        def rerun_then_checks() -> bool:
+            with _timed(timings, "rerun"):
+                if not _run_rerun(runtime, container_name):
+                    return False
+            with _timed(timings, "checks"):
+                return run_integration_checks(runtime, container_name)
+
+        def first_run_checks() -> bool:
+            return run_integration_checks(runtime, first_run_name, label="first run")
+
+        # Each branch logs under the caller's step (and buffering), so run
+        # both in copies of this context.
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"{flavor}-fan") as pool:
+            branches = [
+                pool.submit(contextvars.copy_context().run, branch)
+                for branch in (rerun_then_checks, first_run_checks)
+            ]
+            return all([branch.result() for branch in branches])
     finally:
+        remove_container(runtime, first_run_name)
         remove_container(runtime, container_name)
+        replenish_warm_container(runtime, repo_root, flavor, key)
+
 
+@dataclass
+class FlavorResult:
+    """Outcome of one `run_container_test`, with its per-phase durations."""
 
-def _make_timeout_exec_fn(base_cmd: list[str]) -> ExecFn:
-    """Build an exec_fn that prefixes commands with `base_cmd` and handles timeouts."""
+    flavor: str
+    passed: bool = False
+    timings: dict[str, float] = field(default_factory=dict)
 
-    def exec_fn(cmd: list[str]) -> subprocess.CompletedProcess:
+
+def run_flavors(
+    runtime: str,
+    repo_root: Path,
+    flavors: list[str],
+    *,
+    jobs: int = 1,
+    run_one: Callable[..., bool] = run_container_test,
+) -> list[FlavorResult]:
+    """Run `run_one` for every flavor, up to `jobs` at once; results in input order.
+
+    With `jobs > 1` each flavor's console output is held and printed as one
+    block when it finishes (see `buffered_step`), so concurrent flavors don't
+    interleave; with one job it streams as before.
+    """
+
+    def run(flavor: str) -> FlavorResult:
+        result = FlavorResult(flavor)
+        step = buffered_step(flavor) if jobs > 1 else log_step(flavor)
+        with step:
+            try:
+                result.passed = run_one(runtime, repo_root, flavor, timings=result.timings)
+            except Exception:
+                logging.exception(f"{flavor}: container test crashed")
+            logging.log(
+                logging.INFO if result.passed else logging.ERROR,
+                f"{flavor}: {'passed' if result.passed else 'FAILED'} "
+                f"in {sum(result.timings.values()):.1f}s",
+            )
+        return result
+
+    if jobs <= 1 or len(flavors) <= 1:
+        return [run(flavor) for flavor in flavors]
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="flavor") as pool:
+        return list(pool.map(run, flavors))
+
+
+def format_phase_table(results: list[FlavorResult]) -> str:
+    """A flavor × phase matrix of durations, plus total and result columns."""
+    header = ["flavor", *PHASES, "total", "result"]
+    rows = [header]
+    for result in results:
+        cells = [result.flavor]
+        for phase in PHASES:
+            seconds = result.timings.get(phase)
+            cells.append("-" if seconds is None else f"{seconds:.1f}s")
+        cells.append(f"{sum(result.timings.values()):.1f}s")
+        cells.append("pass" if result.passed else "FAIL")
+        rows.append(cells)
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(
+            cell.ljust(width) if i == 0 else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        ).rstrip()
+        for row in rows
+    )
+
+
+def _decode_partial(output: bytes | str | None) -> str:
+    if isinstance(output, bytes):
+        return output.decode("utf-8", errors="replace")
+    return output or ""
+
+
+def _make_timeout_exec_fn(
+    base_cmd: list[str], timeout: float = CHECK_TIMEOUT_SECS
+) -> ExecFn:
+    """Build an exec_fn that prefixes commands with `base_cmd` and handles timeouts.
+
+    The exec_fn also takes a `timeout=` keyword overriding the default.
+    """
+    default_timeout = timeout
+
+    def exec_fn(
+        cmd: list[str], *, timeout: float = default_timeout
+    ) -> subprocess.CompletedProcess:
         full_cmd = [*base_cmd, *cmd]
         try:
             return subprocess.run(
                 full_cmd, capture_output=True, text=True, check=False,
-                timeout=CHECK_TIMEOUT_SECS,
+                timeout=timeout,
             )
         except subprocess.TimeoutExpired as e:
             # Synthesize rc=124 so the check sees a failure instead of hanging the suite.
+            # The partial output is bytes even with text=True.
             return subprocess.CompletedProcess(
                 args=full_cmd,
                 returncode=124,
-                stdout=e.stdout or "",
-                stderr=(e.stderr or "") + f"\n<timed out after {CHECK_TIMEOUT_SECS}s>",
+                stdout=_decode_partial(e.stdout),
+                stderr=_decode_partial(e.stderr) + f"\n<timed out after {timeout:g}s>",
             )
 
     return exec_fn
 
 
-def run_checks(checks: list[Check], exec_fn: ExecFn) -> bool:
-    """Run a check suite, log each result, return overall pass."""
+@dataclass
+class CheckTiming:
+    """Where `run_checks` records per-check durations, and their timeouts.
+
+    Check names embed paths; `aliases` (path -> placeholder) makes them
+    stable across runs and machines before they're used as keys. A check
+    with a timeout gets it as `exec_fn(cmd, timeout=...)`.
+    """
+
+    recorder: RunRecorder
+    flavor: str
+    timeouts: dict[str, float] = field(default_factory=dict)
+    aliases: dict[str, str] = field(default_factory=dict)
+
+    def key(self, name: str) -> str:
+        for path in sorted(self.aliases, key=len, reverse=True):
+            name = name.replace(path, self.aliases[path])
+        return name
+
+
+def run_checks(
+    checks: list[Check],
+    exec_fn: ExecFn,
+    *,
+    script_exec_fn: ExecFn | None = None,
+    label: str | None = None,
+    timing: CheckTiming | None = None,
+) -> bool:
+    """Run a check suite, log each result, return overall pass.
+
+    `label`, if given, prefixes each result line, for suites that run
+    alongside another.
+
+    With `script_exec_fn`, the checks run batched (see
+    `integration_checks.run_batched`): one exec through it for the whole
+    suite instead of one `exec_fn` call per command. Otherwise, with
+    `timing`, each check's duration is recorded and a check with a timeout
+    in `timing.timeouts` passes it to `exec_fn` (see `_make_timeout_exec_fn`).
+    """
+    if script_exec_fn is not None:
+        results = run_batched(
+            checks, exec_fn, script_exec_fn=script_exec_fn, step_timeout=CHECK_TIMEOUT_SECS
+        )
+    else:
+        results = []
+        for check in checks:
+            check_exec_fn = exec_fn
+            if timing is not None:
+                timeout = timing.timeouts.get(timing.key(getattr(check, "name", "")))
+                if timeout is not None:
+                    # Timed runs pass exec_fns that take `timeout=` (see CheckTiming).
+                    check_exec_fn = functools.partial(
+                        cast(Callable[..., subprocess.CompletedProcess], exec_fn), timeout=timeout
+                    )
+            started = time.monotonic()
+            result = check(check_exec_fn)
+            if timing is not None:
+                timing.recorder.add(
+                    KIND_CHECK,
+                    timing.key(result.name),
+                    time.monotonic() - started,
+                    flavor=timing.flavor,
+                    passed=result.passed,
+                )
+            results.append(result)
+
+    prefix = f"[{label}] " if label else ""
     all_passed = True
-    for check in checks:
-        result = check(exec_fn)
+    for result in results:
         if result.passed:
-            logging.info(f"  ✓ {result.name}")
+            logging.info(f"  ✓ {prefix}{result.name}")
         else:
-            logging.error(f"  ✗ {result.name}: {result.detail}")
+            logging.error(f"  ✗ {prefix}{result.name}: {result.detail}")
             all_passed = False
     return all_passed
 
 
-def run_integration_checks(runtime: str, container_name: str) -> bool:
-    """Run the BOOTSTRAP_CHECKS suite inside `container_name`."""
-    exec_fn = _make_timeout_exec_fn([runtime, "exec", container_name])
-    return run_checks(BOOTSTRAP_CHECKS, exec_fn)
+def run_integration_checks(
+    runtime: str, container_name: str, *, label: str | None = None
+) -> bool:
+    """Run the BOOTSTRAP_CHECKS suite inside `container_name`, in one exec.
+
+    Each `<runtime> exec` pays for container-runtime startup, which dwarfs
+    the probes themselves, so the suite is batched. Every step keeps its own
+    CHECK_TIMEOUT_SECS inside the script; the batch as a whole gets that much
+    per step.
+    """
+    base_cmd = [runtime, "exec", container_name]
+    exec_fn = _make_timeout_exec_fn(base_cmd)
+    steps = sum(len(getattr(check, "steps", ())) for check in BOOTSTRAP_CHECKS)
+    script_exec_fn = _make_timeout_exec_fn(base_cmd, CHECK_TIMEOUT_SECS * max(steps, 1))
+    return run_checks(
+        BOOTSTRAP_CHECKS, exec_fn, script_exec_fn=script_exec_fn, label=label
+    )
 
 
-def run_native_test(repo_root: Path) -> bool:
+def run_native_test(repo_root: Path, *, timing: CheckTiming | None = None) -> bool:
     """Run native host smoke tests against the current machine's bootstrapped state."""
     home = str(Path.home())
     dotfiles = str(repo_root.resolve())
@@ -324,7 +1010,213 @@ def run_native_test(repo_root: Path) -> bool:
     checks = build_native_checks(home, dotfiles, platform=platform)
     logging.info(f"running {len(checks)} native checks (platform={platform})")
     exec_fn = _make_timeout_exec_fn([])
-    return run_checks(checks, exec_fn)
+    if timing is not None:
+        timing = dataclasses.replace(timing, aliases={home: "~", dotfiles: "$DOTFILES"})
+    return run_checks(checks, exec_fn, timing=timing)
+
+
+# --hermetic stand-ins for what bootstrap.py fetches. Keep in step with the
+# download_files/git_clone_repos lists in bootstrap.py.
+HERMETIC_RAW_PREFIX = "https://raw.githubusercontent.com/"
+HERMETIC_GIT_PREFIX = "https://github.com/"
+HERMETIC_REPOS = ("romkatv/powerlevel10k.git",)
+# Just enough vim-plug for init.vim's plug#begin block to load, and for the
+# plug.vim checks to find `plug#begin`.
+HERMETIC_PLUG_VIM = """\
+" vim-plug stand-in served by run_tests.py --hermetic.
+function! plug#begin(...)
+endfunction
+function! plug#end()
+endfunction
+command! -nargs=+ -bar Plug :
+"""
+HERMETIC_FILES = {
+    "/junegunn/vim-plug/master/plug.vim": HERMETIC_PLUG_VIM.encode(),
+}
+
+
+class _StandInHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        body = cast(_StandInServer, self.server).files.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        logging.debug(f"stand-in http: {format % args}")
+
+
+class _StandInServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, files: dict[str, bytes]) -> None:
+        self.files = files
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+
+
+@contextmanager
+def serve_files(files: dict[str, bytes]) -> Generator[str, None, None]:
+    """Serve `files` (URL path -> body) on localhost; yields the base URL."""
+    server = _StandInServer(files)
+    # A short poll interval keeps `shutdown` from waiting up to half a second.
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    try:
+        host, port = server.server_address[:2]
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def hermetic_env(root: Path) -> dict[str, str]:
+    """A minimal environment with HOME and every XDG dir under `root`.
+
+    Creates the directories. Only PATH and the locale come from the caller,
+    and system git config is ignored, so nothing on the host leaks in.
+    """
+    home = root / "home"
+    env = {
+        "HOME": str(home),
+        "PATH": os.environ.get("PATH", os.defpath),
+        "LANG": os.environ.get("LANG", "C.UTF-8"),
+        "TERM": "dumb",
+        "XDG_CONFIG_HOME": str(home / ".config"),
+        "XDG_DATA_HOME": str(home / ".local" / "share"),
+        "XDG_STATE_HOME": str(home / ".local" / "state"),
+        "XDG_CACHE_HOME": str(home / ".cache"),
+        "XDG_RUNTIME_DIR": str(root / "run"),
+        "GIT_CONFIG_NOSYSTEM": "1",
+    }
+    for name in ("XDG_CONFIG_HOME", "XDG_DATA_HOME", "XDG_STATE_HOME", "XDG_CACHE_HOME"):
+        Path(env[name]).mkdir(parents=True, exist_ok=True)
+    (root / "run").mkdir(mode=0o700)
+    return env
+
+
+def make_bare_repo(path: Path, env: dict[str, str]) -> None:
+    """Create a bare git repo at `path` holding one commit."""
+    work = path.with_name(path.name + ".work")
+    work.mkdir(parents=True)
+    (work / "README").write_text("stand-in for run_tests.py --hermetic\n")
+    for cmd in (
+        ["git", "init", "-q", str(work)],
+        ["git", "-C", str(work), "add", "README"],
+        [
+            "git", "-C", str(work), "-c", "user.name=hermetic",
+            "-c", "user.email=hermetic@localhost", "commit", "-q", "-m", "stand-in",
+        ],
+        ["git", "clone", "-q", "--bare", str(work), str(path)],
+    ):
+        subprocess.run(cmd, env=env, capture_output=True, text=True, check=True)
+    shutil.rmtree(work)
+
+
+def _check_tools(check: Check) -> set[str]:
+    """Executables a planned check's steps run (looking through `env`)."""
+    tools = set()
+    for step in getattr(check, "steps", ()):
+        argv = list(step)
+        if argv[:1] == ["env"]:
+            argv = argv[1:]
+            while argv and (argv[0].startswith("-") or "=" in argv[0]):
+                argv = argv[2:] if argv[0] == "-u" else argv[1:]
+        if argv:
+            tools.add(argv[0])
+    return tools
+
+
+def run_hermetic_test(repo_root: Path, *, timing: CheckTiming | None = None) -> bool:
+    """Bootstrap a throwaway HOME twice, offline, then run the native checks.
+
+    Downloads come from a localhost HTTP server and clones from local bare
+    repos, via bootstrap's `$DOTFILES_URL_MAP`. The same ~/.bashrc seed as
+    the container tier verifies the backup. Checks whose tools aren't
+    installed are skipped, so this runs on any Linux or macOS box with git.
+    """
+    dotfiles = repo_root.resolve()
+    with tempfile.TemporaryDirectory(prefix="dotfiles-hermetic-") as tmp:
+        root = Path(tmp)
+        env = hermetic_env(root)
+        home = Path(env["HOME"])
+        (home / ".dotfiles").symlink_to(dotfiles)
+        (home / ".bashrc").write_text(f"{BACKUP_SENTINEL}\n")
+        git_root = root / "git"
+        for repo in HERMETIC_REPOS:
+            make_bare_repo(git_root / repo, env)
+
+        bootstrap_cmd = [
+            sys.executable,
+            str(dotfiles / "bootstrap.py"),
+            "-v",
+            "--git-name", "Testy McTestFace",
+            "--git-email", "testy@test.com",
+            "--weather-location", "Seattle",
+        ]
+        with serve_files(HERMETIC_FILES) as base_url:
+            env[URL_MAP_ENV_VAR] = json.dumps(
+                {
+                    HERMETIC_RAW_PREFIX: f"{base_url}/",
+                    HERMETIC_GIT_PREFIX: f"{git_root.as_uri()}/",
+                }
+            )
+            for label in ("bootstrap.py", "bootstrap.py (re-run, idempotency)"):
+                logging.info(f"  → {label}")
+                try:
+                    result = subprocess.run(
+                        bootstrap_cmd,
+                        cwd=dotfiles,
+                        env=env,
+                        stdin=subprocess.DEVNULL,
+                        capture_output=True,
+                        text=True,
+                        check=False,
+                        timeout=BOOTSTRAP_TIMEOUT_SECS,
+                    )
+                except subprocess.TimeoutExpired as e:
+                    _log_subprocess_failure(
+                        f"{label} timed out after {BOOTSTRAP_TIMEOUT_SECS}s",
+                        _decode_partial(e.stdout),
+                        _decode_partial(e.stderr),
+                    )
+                    return False
+                if result.returncode != 0:
+                    _log_subprocess_failure(
+                        f"{label} failed (exit {result.returncode})", result.stdout, result.stderr
+                    )
+                    return False
+
+        checks = [
+            check_file_contains(f"{home}/.bashrc.ORIGINAL", BACKUP_SENTINEL),
+            *build_native_checks(str(home), str(dotfiles), platform=sys.platform),
+        ]
+        runnable = []
+        for check in checks:
+            missing = sorted(
+                tool for tool in _check_tools(check) if not shutil.which(tool, path=env["PATH"])
+            )
+            if missing:
+                name = getattr(check, "name", check)
+                logging.info(f"  - {name}: skipped, {', '.join(missing)} not installed")
+            else:
+                runnable.append(check)
+        logging.info(f"running {len(runnable)} hermetic checks in {home}")
+        env.pop(URL_MAP_ENV_VAR)
+        exec_fn = _make_timeout_exec_fn(
+            ["env", "-i", *(f"{key}={value}" for key, value in env.items())]
+        )
+        if timing is not None:
+            timing = dataclasses.replace(
+                timing, aliases={str(home): "~", str(dotfiles): "$DOTFILES"}
+            )
+        return run_checks(runnable, exec_fn, timing=timing)
 
 
 def run_shell_syntax_tests() -> bool:
@@ -381,49 +1273,275 @@ def run_shell_syntax_tests() -> bool:
     return all_passed
 
 
-def run_pydotlib_tests(verbose: bool = False) -> bool:
-    loader = unittest.TestLoader()
-    repo_root = Path(__file__).parent
-    suite = loader.discover(
-        start_dir=str(repo_root / "_pydotlib" / "tests"),
-        pattern="test_*.py",
-        top_level_dir=str(repo_root),
+class _TimingTestResult(unittest.TextTestResult):
+    """A `TextTestResult` that also notes each test's duration and outcome."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.durations: list[tuple[str, float, bool]] = []
+        self._started: dict[str, float] = {}
+        self._problems = 0
+
+    def startTest(self, test: unittest.TestCase) -> None:
+        self._started[test.id()] = time.monotonic()
+        self._problems = len(self.failures) + len(self.errors) + len(self.unexpectedSuccesses)
+        super().startTest(test)
+
+    def stopTest(self, test: unittest.TestCase) -> None:
+        super().stopTest(test)
+        started = self._started.pop(test.id(), None)
+        if started is not None:
+            problems = len(self.failures) + len(self.errors) + len(self.unexpectedSuccesses)
+            self.durations.append(
+                (test.id(), time.monotonic() - started, problems == self._problems)
+            )
+
+
+# Assumed duration of a unit test with no recorded history, for sharding.
+UNIT_TEST_DEFAULT_SECS = 0.01
+
+
+def _iter_tests(suite: unittest.TestSuite) -> Iterator[unittest.TestCase]:
+    for item in suite:
+        if isinstance(item, unittest.TestSuite):
+            yield from _iter_tests(item)
+        else:
+            yield item
+
+
+def _discover_unit_tests(tests_dir: Path, top_level_dir: Path) -> unittest.TestSuite:
+    return unittest.TestLoader().discover(
+        start_dir=str(tests_dir), pattern="test_*.py", top_level_dir=str(top_level_dir)
+    )
+
+
+def shard_tests(
+    test_ids: list[str], durations: Mapping[str, float], jobs: int
+) -> list[list[str]]:
+    """Split `test_ids` into at most `jobs` shards of similar total duration.
+
+    Whole TestCase classes are the unit, so class and module fixtures run
+    once per shard that needs them. Classes go, longest first, to the
+    shard with the least work so far; each shard keeps discovery order.
+    Tests without history count as `UNIT_TEST_DEFAULT_SECS`.
+    """
+    classes: dict[str, list[str]] = {}
+    for test_id in test_ids:
+        classes.setdefault(test_id.rpartition(".")[0], []).append(test_id)
+    cost = {
+        name: sum(durations.get(test_id, UNIT_TEST_DEFAULT_SECS) for test_id in ids)
+        for name, ids in classes.items()
+    }
+    loads = [0.0] * max(1, min(jobs, len(classes)))
+    assigned: dict[str, int] = {}
+    for name in sorted(classes, key=lambda name: cost[name], reverse=True):
+        shard = loads.index(min(loads))
+        assigned[name] = shard
+        loads[shard] += cost[name]
+    shards: list[list[str]] = [[] for _ in loads]
+    for name, ids in classes.items():
+        shards[assigned[name]].extend(ids)
+    return [shard for shard in shards if shard]
+
+
+@dataclass
+class UnitShardResult:
+    """What one worker process ran; tracebacks are already formatted."""
+
+    output: str
+    tests_run: int
+    failures: list[tuple[str, str]]
+    errors: list[tuple[str, str]]
+    skipped: list[tuple[str, str]]
+    unexpected_successes: list[str]
+    durations: list[tuple[str, float, bool]]
+
+
+def _init_unit_worker(verbose: bool) -> None:
+    # Same detachment as the serial run: quiet workers drop every handler so
+    # code under test can't bypass the runner's capture; verbose ones log
+    # straight to their own stderr.
+    if verbose:
+        setup_logging(logging.DEBUG)
+    else:
+        logging.getLogger().handlers = []
+
+
+def _run_unit_shard(
+    tests_dir: Path, top_level_dir: Path, test_ids: list[str], verbose: bool
+) -> UnitShardResult:
+    wanted = set(test_ids)
+    suite = unittest.TestSuite(
+        test
+        for test in _iter_tests(_discover_unit_tests(tests_dir, top_level_dir))
+        if test.id() in wanted
+    )
+    stream = io.StringIO()
+    result = _TimingTestResult(
+        unittest.runner._WritelnDecorator(stream),  # type: ignore[attr-defined]
+        True,
+        2 if verbose else 1,
+    )
+    result.buffer = not verbose
+    result.startTestRun()
+    try:
+        suite(result)
+    finally:
+        result.stopTestRun()
+    return UnitShardResult(
+        output=stream.getvalue(),
+        tests_run=result.testsRun,
+        failures=[(test.id(), text) for test, text in result.failures],
+        errors=[(test.id(), text) for test, text in result.errors],
+        skipped=[(test.id(), reason) for test, reason in result.skipped],
+        unexpected_successes=[test.id() for test in result.unexpectedSuccesses],
+        durations=result.durations,
+    )
+
+
+def _run_unit_shards(
+    tests_dir: Path,
+    top_level_dir: Path,
+    shards: list[list[str]],
+    verbose: bool,
+) -> UnitShardResult:
+    """Run `shards` in a process pool and merge them, printing like unittest."""
+    started = time.perf_counter()
+    # spawn, not fork: the parent's logging listener thread doesn't survive
+    # a fork, and the workers need a clean interpreter anyway.
+    with ProcessPoolExecutor(
+        max_workers=len(shards),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_unit_worker,
+        initargs=(verbose,),
+    ) as pool:
+        parts = list(
+            pool.map(
+                _run_unit_shard,
+                *zip(*((tests_dir, top_level_dir, shard, verbose) for shard in shards)),
+            )
+        )
+    elapsed = time.perf_counter() - started
+
+    merged = UnitShardResult(
+        output="".join(part.output for part in parts),
+        tests_run=sum(part.tests_run for part in parts),
+        failures=[item for part in parts for item in part.failures],
+        errors=[item for part in parts for item in part.errors],
+        skipped=[item for part in parts for item in part.skipped],
+        unexpected_successes=[item for part in parts for item in part.unexpected_successes],
+        durations=[item for part in parts for item in part.durations],
     )
 
+    stream = sys.stderr
+    stream.write(merged.output)
+    if not verbose and merged.output:
+        stream.write("\n")
+    for flavour, items in (("ERROR", merged.errors), ("FAIL", merged.failures)):
+        for test_id, text in items:
+            stream.write(f"{'=' * 70}\n{flavour}: {test_id}\n{'-' * 70}\n{text}\n")
+    stream.write(f"{'-' * 70}\nRan {merged.tests_run} tests in {elapsed:.3f}s"
+                 f" ({len(shards)} processes)\n\n")
+    problems = [
+        f"{label}={count}"
+        for label, count in (
+            ("failures", len(merged.failures)),
+            ("errors", len(merged.errors)),
+            ("skipped", len(merged.skipped)),
+            ("unexpected successes", len(merged.unexpected_successes)),
+        )
+        if count
+    ]
+    ok = not (merged.failures or merged.errors or merged.unexpected_successes)
+    stream.write(("OK" if ok else "FAILED") + (f" ({', '.join(problems)})" if problems else "") + "\n")
+    stream.flush()
+    return merged
+
+
+def run_pydotlib_tests(
+    verbose: bool = False,
+    *,
+    recorder: RunRecorder | None = None,
+    jobs: int = 1,
+    durations: Mapping[str, float] | None = None,
+    tests_dir: Path | None = None,
+) -> bool:
+    """Run the `_pydotlib/tests` suite; with `recorder`, record every test's duration.
+
+    With `jobs > 1` the tests are split by `shard_tests`, using `durations`
+    (test id -> seconds, typically recorded medians), and run in that many
+    worker processes; results are merged into the one summary.
+    """
+    repo_root = Path(__file__).parent
+    tests_dir = tests_dir if tests_dir is not None else repo_root / "_pydotlib" / "tests"
+    top_level_dir = repo_root if tests_dir.is_relative_to(repo_root) else tests_dir
+    suite = _discover_unit_tests(tests_dir, top_level_dir)
+
     print()
     print("=" * 70)
     print("Running tests")
     print("=" * 70)
     print()
 
-    # Detach our log handler so that INFO/ERROR records from code under
-    # test don't bypass unittest's stdout/stderr capture. assertLogs adds its
-    # own handler so tests that exercise log assertions still work.
-    root_logger = logging.getLogger()
-    saved_handlers = root_logger.handlers[:]
-    if not verbose:
-        root_logger.handlers = []
+    shards = (
+        shard_tests([test.id() for test in _iter_tests(suite)], durations or {}, jobs)
+        if jobs > 1
+        else []
+    )
+    if len(shards) > 1:
+        sys.stdout.flush()
+        merged = _run_unit_shards(tests_dir, top_level_dir, shards, verbose)
+        tests_run = merged.tests_run
+        failures, errors, skipped = merged.failures, merged.errors, merged.skipped
+        test_durations = merged.durations
+        successful = not (failures or errors or merged.unexpected_successes)
+    else:
+        # Detach our log handler so that INFO/ERROR records from code under
+        # test don't bypass unittest's stdout/stderr capture. assertLogs adds its
+        # own handler so tests that exercise log assertions still work.
+        root_logger = logging.getLogger()
+        saved_handlers = root_logger.handlers[:]
+        if not verbose:
+            root_logger.handlers = []
 
-    try:
-        runner = unittest.TextTestRunner(
-            verbosity=2 if verbose else 1, buffer=not verbose
-        )
-        result = runner.run(suite)
-    finally:
-        root_logger.handlers = saved_handlers
+        try:
+            runner = unittest.TextTestRunner(
+                verbosity=2 if verbose else 1, buffer=not verbose, resultclass=_TimingTestResult
+            )
+            result = cast(_TimingTestResult, runner.run(suite))
+        finally:
+            root_logger.handlers = saved_handlers
+        tests_run = result.testsRun
+        failures, errors, skipped = result.failures, result.errors, result.skipped
+        test_durations = result.durations
+        successful = result.wasSuccessful()
+
+    if recorder is not None:
+        for test_id, seconds, passed in test_durations:
+            recorder.add(KIND_UNIT, test_id, seconds, passed=passed)
 
     print()
     print("=" * 70)
     print("Test Summary")
     print("=" * 70)
-    print(f"Tests run: {result.testsRun}")
-    print(f"Successes: {result.testsRun - len(result.failures) - len(result.errors)}")
-    print(f"Failures: {len(result.failures)}")
-    print(f"Errors: {len(result.errors)}")
-    print(f"Skipped: {len(result.skipped)}")
+    print(f"Tests run: {tests_run}")
+    print(f"Successes: {tests_run - len(failures) - len(errors)}")
+    print(f"Failures: {len(failures)}")
+    print(f"Errors: {len(errors)}")
+    print(f"Skipped: {len(skipped)}")
     print("=" * 70)
 
-    return result.wasSuccessful()
+    return successful
+
+
+def unit_test_durations(timing_db: TimingDB) -> dict[str, float]:
+    """Median recorded duration per unit test id; empty if there's no history."""
+    try:
+        samples = timing_db.samples(kind=KIND_UNIT, passed_only=True)
+    except (sqlite3.Error, OSError) as e:
+        logging.warning(f"cannot read timing history from {timing_db.path}: {e}")
+        return {}
+    return {name: statistics.median(values) for (_, _, name), values in samples.items()}
 
 
 def main() -> int:
@@ -461,34 +1579,146 @@ def main() -> int:
         action="store_true",
         help="Include native host smoke tests (for macOS development)",
     )
+    args_parser.add_argument(
+        "--hermetic",
+        action="store_true",
+        help="Include the offline bootstrap test in a throwaway HOME",
+    )
+    args_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Run up to N container flavors at once, and shard unit tests "
+            "across N processes (default: 1)"
+        ),
+    )
+    args_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Build container images even if their content hash is unchanged",
+    )
+    args_parser.add_argument(
+        "--warm-pool",
+        action="store_true",
+        help=(
+            "Start containers from snapshots and keep one warm per flavor for "
+            "the next run; also checks the first-run state in parallel"
+        ),
+    )
+    args_parser.add_argument(
+        "--log-json",
+        type=Path,
+        metavar="PATH",
+        help="Also append log records to PATH as JSON lines",
+    )
+
+    args_parser.add_argument(
+        "--timings-db",
+        type=Path,
+        metavar="PATH",
+        help="SQLite file of recorded test durations (default: under $XDG_STATE_HOME)",
+    )
+    args_parser.add_argument(
+        "--slowest",
+        type=int,
+        metavar="N",
+        help="Report the N slowest recorded items instead of running tests",
+    )
+    args_parser.add_argument(
+        "--compare",
+        metavar="REF",
+        help=(
+            "Compare recorded durations at REF with HEAD instead of running "
+            "tests; exits 1 if anything got significantly slower"
+        ),
+    )
 
     args = args_parser.parse_args()
+    if args.jobs < 1:
+        args_parser.error("--jobs must be at least 1")
+    if args.slowest is not None and args.slowest < 1:
+        args_parser.error("--slowest must be at least 1")
 
-    log_handler = logging.StreamHandler(sys.stdout)
-    log_handler.setFormatter(ColoredLogFormatter())
+    setup_logging(
+        logging.DEBUG if args.verbose else logging.INFO, json_path=args.log_json
+    )
 
-    logging.getLogger().addHandler(log_handler)
-    logging.getLogger().setLevel(logging.DEBUG if args.verbose else logging.INFO)
+    repo_root = Path(__file__).parent
+    timing_db = TimingDB(args.timings_db)
+    if args.slowest is not None or args.compare is not None:
+        return report_timings(
+            timing_db, repo_root, slowest_count=args.slowest, compare_ref=args.compare
+        )
 
     run_syntax_and_unit = not args.docker_only and not args.native_only
     run_docker = not args.no_docker and not args.native_only
     run_native = args.native or args.native_only
+    run_hermetic = args.hermetic and not args.native_only and not args.docker_only
 
-    if not run_syntax_and_unit and not run_docker and not run_native:
+    if not run_syntax_and_unit and not run_docker and not run_native and not run_hermetic:
         args_parser.error("flag combination results in no tests being selected")
 
-    repo_root = Path(__file__).parent
+    recorder = RunRecorder()
+    try:
+        return _run_tiers(
+            args,
+            repo_root,
+            timing_db,
+            recorder,
+            syntax_and_unit=run_syntax_and_unit,
+            docker=run_docker,
+            native=run_native,
+            hermetic=run_hermetic,
+        )
+    finally:
+        save_timings(timing_db, repo_root, recorder)
 
-    if run_syntax_and_unit:
-        if not run_shell_syntax_tests():
+
+def _run_tiers(
+    args: argparse.Namespace,
+    repo_root: Path,
+    timing_db: TimingDB,
+    recorder: RunRecorder,
+    *,
+    syntax_and_unit: bool,
+    docker: bool,
+    native: bool,
+    hermetic: bool,
+) -> int:
+    """Run the selected test tiers in order, stopping at the first failure."""
+
+    def tier(name: str, run: Callable[[], bool]) -> bool:
+        started = time.monotonic()
+        with log_step(name):
+            passed = run()
+        recorder.add(KIND_PHASE, name, time.monotonic() - started, passed=passed)
+        return passed
+
+    if syntax_and_unit:
+        if not tier("syntax", run_shell_syntax_tests):
             logging.critical("shell syntax tests failed - aborting")
             return 1
 
-        if not run_pydotlib_tests(verbose=args.verbose):
+        durations = unit_test_durations(timing_db) if args.jobs > 1 else {}
+        if not tier(
+            "unit",
+            lambda: run_pydotlib_tests(
+                verbose=args.verbose, recorder=recorder, jobs=args.jobs, durations=durations
+            ),
+        ):
             logging.critical("pydotlib unit tests failed - aborting")
             return 1
 
-    if run_docker:
+    if hermetic:
+        timing = check_timing(timing_db, recorder, f"hermetic-{sys.platform}")
+        if not tier("hermetic", lambda: run_hermetic_test(repo_root, timing=timing)):
+            logging.critical("hermetic bootstrap tests failed - aborting")
+            return 1
+
+    if docker:
         runtime = detect_runtime(args.runtime)
         logging.info(f"using container runtime: {runtime}")
         if not check_runtime(runtime):
@@ -498,15 +1728,32 @@ def main() -> int:
         if not flavors:
             logging.warning(f"no Dockerfiles found under {repo_root / 'tests' / 'docker'}")
 
-        all_passed = True
-        for flavor in flavors:
-            if not run_container_test(runtime, repo_root, flavor):
-                all_passed = False
-        if not all_passed:
+        started = time.monotonic()
+        results = run_flavors(
+            runtime,
+            repo_root,
+            flavors,
+            jobs=args.jobs,
+            run_one=functools.partial(
+                run_container_test, rebuild=args.rebuild, warm=args.warm_pool
+            ),
+        )
+        for result in results:
+            for phase, seconds in result.timings.items():
+                recorder.add(
+                    KIND_PHASE, phase, seconds, flavor=result.flavor, passed=result.passed
+                )
+        if results:
+            logging.info(
+                f"container phases (wall {time.monotonic() - started:.1f}s, "
+                f"jobs={args.jobs}):\n{format_phase_table(results)}"
+            )
+        if not all(result.passed for result in results):
             return 1
 
-    if run_native:
-        if not run_native_test(repo_root):
+    if native:
+        timing = check_timing(timing_db, recorder, f"native-{sys.platform}")
+        if not tier("native", lambda: run_native_test(repo_root, timing=timing)):
             logging.critical("native host tests failed")
             return 1
 
@@ -515,5 +1762,74 @@ def main() -> int:
     return 0
 
 
+def check_timing(timing_db: TimingDB, recorder: RunRecorder, flavor: str) -> CheckTiming:
+    """A `CheckTiming` for `flavor`, with timeouts from its recorded p99s."""
+    try:
+        timeouts = adaptive_timeouts(timing_db, KIND_CHECK, flavor, CHECK_TIMEOUT_SECS)
+    except (sqlite3.Error, OSError) as e:
+        logging.warning(f"cannot read timing history from {timing_db.path}: {e}")
+        timeouts = {}
+    adapted = sum(timeout < CHECK_TIMEOUT_SECS for timeout in timeouts.values())
+    if adapted:
+        logging.debug(f"{adapted} {flavor} checks have timeouts from their history")
+    return CheckTiming(recorder, flavor, timeouts)
+
+
+def save_timings(timing_db: TimingDB, repo_root: Path, recorder: RunRecorder) -> None:
+    """Store the run's timings under the checked-out commit. Never raises."""
+    timings = recorder.timings
+    if not timings:
+        return
+    commit = resolve_commit(repo_root)
+    if commit is None:
+        logging.debug("not a git checkout - timings not recorded")
+        return
+    try:
+        timing_db.save(commit, timings, dirty=is_dirty(repo_root))
+    except (sqlite3.Error, OSError) as e:
+        logging.warning(f"cannot record timings in {timing_db.path}: {e}")
+
+
+def report_timings(
+    timing_db: TimingDB,
+    repo_root: Path,
+    *,
+    slowest_count: int | None = None,
+    compare_ref: str | None = None,
+) -> int:
+    """Print the --slowest and/or --compare reports; 1 if HEAD got slower."""
+    status = 0
+    try:
+        if slowest_count is not None:
+            stats = slowest(timing_db, slowest_count)
+            print(format_slowest(stats) if stats else f"no timings recorded in {timing_db.path}")
+
+        if compare_ref is not None:
+            base = resolve_commit(repo_root, compare_ref)
+            head = resolve_commit(repo_root)
+            if base is None or head is None:
+                logging.error(f"cannot resolve {compare_ref if base is None else 'HEAD'!r}")
+                return 1
+            comparisons = compare(timing_db, base, head)
+            if not comparisons:
+                print(
+                    f"nothing to compare: no item has {COMPARE_MIN_SAMPLES}+ clean runs "
+                    f"at both {base[:12]} and {head[:12]}"
+                )
+            else:
+                print(format_comparison(comparisons))
+                slower = [c for c in comparisons if c.significant]
+                print(
+                    f"{len(slower)} of {len(comparisons)} items significantly slower "
+                    f"at {head[:12]} than {compare_ref} ({base[:12]})"
+                )
+                if slower:
+                    status = 1
+    except (sqlite3.Error, OSError) as e:
+        logging.error(f"cannot read timing history from {timing_db.path}: {e}")
+        return 1
+    return status
+
+
 if __name__ == "__main__":
     sys.exit(main())